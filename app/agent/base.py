@@ -53,6 +53,10 @@ class BaseAgent(BaseModel, ABC):
             self.llm = LLM(config_name=self.name.lower())
         if not isinstance(self.memory, Memory):
             self.memory = Memory()
+        if self.memory.token_budget is None:
+            self.memory.token_budget = self.llm.memory_token_budget
+        if self.memory.token_counter is None:
+            self.memory.token_counter = self.llm.token_counter.count_cached_message
         return self
 
     @asynccontextmanager
@@ -164,26 +168,26 @@ class BaseAgent(BaseModel, ABC):
         """Handle stuck state by adding a prompt to change strategy"""
         stuck_prompt = "\
         Observed duplicate responses. Consider new strategies and avoid repeating ineffective paths already attempted."
-        self.next_step_prompt = f"{stuck_prompt}\n{self.next_step_prompt}"
+        # Avoid stacking the same warning on every stuck step
+        if self.next_step_prompt and stuck_prompt in self.next_step_prompt:
+            return
+        self.next_step_prompt = f"{stuck_prompt}\n{self.next_step_prompt or ''}"
         logger.warning(f"Agent detected stuck state. Added prompt: {stuck_prompt}")
 
     def is_stuck(self) -> bool:
-        """Check if the agent is stuck in a loop by detecting duplicate content"""
+        """Check if the agent is stuck in a loop by detecting duplicate content
+        or the same tool calls repeated with the same arguments.
+
+        Uses the memory's fingerprint index, so the check does not scan history.
+        """
         if len(self.memory.messages) < 2:
             return False
 
         last_message = self.memory.messages[-1]
-        if not last_message.content:
-            return False
-
-        # Count identical content occurrences
-        duplicate_count = sum(
-            1
-            for msg in reversed(self.memory.messages[:-1])
-            if msg.role == "assistant" and msg.content == last_message.content
-        )
+        if self.memory.count_duplicates(last_message) >= self.duplicate_threshold:
+            return True
 
-        return duplicate_count >= self.duplicate_threshold
+        return self.memory.count_repeated_tool_calls() >= self.duplicate_threshold
 
     @property
     def messages(self) -> List[Message]:
@@ -1,10 +1,11 @@
+import asyncio
 from typing import Dict, List, Optional
 
-from pydantic import Field, model_validator
+from pydantic import Field, PrivateAttr, model_validator
 
 from app.agent.browser import BrowserContextHelper
 from app.agent.toolcall import ToolCallAgent
-from app.config import config
+from app.config import MCPServerConfig, config
 from app.logger import logger
 from app.prompt.manus import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.tool import Terminate, ToolCollection
@@ -49,11 +50,16 @@ class Manus(ToolCallAgent):
         default_factory=dict
     )  # server_id -> url/command
     _initialized: bool = False
+    _mcp_connect_tasks: Dict[str, asyncio.Task] = PrivateAttr(default_factory=dict)
+    _mcp_tools_version: int = PrivateAttr(default=-1)  # Last synced tools_version
+    # False when the MCPClients was passed in, e.g. by PlanningFlow clones
+    _owns_mcp_clients: bool = PrivateAttr(default=True)
 
     @model_validator(mode="after")
     def initialize_helper(self) -> "Manus":
         """Initialize basic components synchronously."""
         self.browser_context_helper = BrowserContextHelper(self)
+        self._owns_mcp_clients = "mcp_clients" not in self.model_fields_set
         return self
 
     @classmethod
@@ -65,28 +71,64 @@ class Manus(ToolCallAgent):
         return instance
 
     async def initialize_mcp_servers(self) -> None:
-        """Initialize connections to configured MCP servers."""
-        for server_id, server_config in config.mcp_config.servers.items():
-            try:
-                if server_config.type == "sse":
-                    if server_config.url:
-                        await self.connect_mcp_server(server_config.url, server_id)
-                        logger.info(
-                            f"Connected to MCP server {server_id} at {server_config.url}"
-                        )
-                elif server_config.type == "stdio":
-                    if server_config.command:
-                        await self.connect_mcp_server(
-                            server_config.command,
-                            server_id,
-                            use_stdio=True,
-                            stdio_args=server_config.args,
-                        )
-                        logger.info(
-                            f"Connected to MCP server {server_id} using command {server_config.command}"
-                        )
-            except Exception as e:
-                logger.error(f"Failed to connect to MCP server {server_id}: {e}")
+        """Connect to the configured MCP servers concurrently.
+
+        Returns once the required servers (all of them unless
+        `mcp.required_servers` is set) are connected or have failed. Other
+        servers keep connecting in the background and their tools are added
+        as each one comes up.
+        """
+        settings = config.mcp_config
+        for server_id, server_config in settings.servers.items():
+            # Clones made by PlanningFlow share the connected MCPClients
+            if self.mcp_clients.is_connected(server_id):
+                continue
+            if server_id not in self._mcp_connect_tasks:
+                self._mcp_connect_tasks[server_id] = asyncio.create_task(
+                    self._connect_configured_server(
+                        server_id, server_config, settings.connect_timeout
+                    )
+                )
+
+        required = settings.servers.keys()
+        if settings.required_servers is not None:
+            required = [s for s in settings.required_servers if s in settings.servers]
+            for server_id in set(settings.required_servers) - set(required):
+                logger.warning(f"Required MCP server {server_id} is not configured")
+        tasks = self._mcp_connect_tasks
+        await asyncio.gather(*(tasks[s] for s in required if s in tasks))
+
+    async def _connect_configured_server(
+        self, server_id: str, server_config: MCPServerConfig, timeout: float
+    ) -> None:
+        """Connect to one configured server, logging rather than raising errors."""
+        try:
+            if server_config.type == "sse":
+                if server_config.url:
+                    await self.connect_mcp_server(
+                        server_config.url, server_id, timeout=timeout
+                    )
+                    logger.info(
+                        f"Connected to MCP server {server_id} at {server_config.url}"
+                    )
+            elif server_config.type == "stdio":
+                if server_config.command:
+                    await self.connect_mcp_server(
+                        server_config.command,
+                        server_id,
+                        use_stdio=True,
+                        stdio_args=server_config.args,
+                        timeout=timeout,
+                    )
+                    logger.info(
+                        f"Connected to MCP server {server_id} using command {server_config.command}"
+                    )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Timed out after {timeout}s connecting to MCP server {server_id}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to connect to MCP server {server_id}: {e}")
 
     async def connect_mcp_server(
         self,
@@ -94,22 +136,18 @@ class Manus(ToolCallAgent):
         server_id: str = "",
         use_stdio: bool = False,
         stdio_args: List[str] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """Connect to an MCP server and add its tools."""
+        server_id = server_id or server_url
         if use_stdio:
             await self.mcp_clients.connect_stdio(
-                server_url, stdio_args or [], server_id
+                server_url, stdio_args or [], server_id, timeout=timeout
             )
-            self.connected_servers[server_id or server_url] = server_url
         else:
-            await self.mcp_clients.connect_sse(server_url, server_id)
-            self.connected_servers[server_id or server_url] = server_url
-
-        # Update available tools with only the new tools from this server
-        new_tools = [
-            tool for tool in self.mcp_clients.tools if tool.server_id == server_id
-        ]
-        self.available_tools.add_tools(*new_tools)
+            await self.mcp_clients.connect_sse(server_url, server_id, timeout=timeout)
+        self.connected_servers[server_id] = server_url
+        self._sync_mcp_tools()
 
     async def disconnect_mcp_server(self, server_id: str = "") -> None:
         """Disconnect from an MCP server and remove its tools."""
@@ -119,7 +157,23 @@ class Manus(ToolCallAgent):
         else:
             self.connected_servers.clear()
 
-        # Rebuild available tools without the disconnected server's tools
+        self._sync_mcp_tools()
+
+    def _sync_mcp_tools(self) -> None:
+        """Replace the MCP tools in available_tools if MCPClients changed them.
+
+        MCPClients follows tools/list_changed notifications and drops the
+        tools of servers that went away, bumping tools_version each time.
+        """
+        if self.mcp_clients.tools_version == self._mcp_tools_version:
+            return
+        self._mcp_tools_version = self.mcp_clients.tools_version
+
+        previous = {
+            tool.name
+            for tool in self.available_tools.tools
+            if isinstance(tool, MCPClientTool)
+        }
         base_tools = [
             tool
             for tool in self.available_tools.tools
@@ -128,20 +182,33 @@ class Manus(ToolCallAgent):
         self.available_tools = ToolCollection(*base_tools)
         self.available_tools.add_tools(*self.mcp_clients.tools)
 
+        current = set(self.mcp_clients.tool_map)
+        if current - previous:
+            logger.info(f"Added MCP tools: {sorted(current - previous)}")
+        if previous - current:
+            logger.info(f"Removed MCP tools: {sorted(previous - current)}")
+
     async def cleanup(self):
         """Clean up Manus agent resources."""
         if self.browser_context_helper:
             await self.browser_context_helper.cleanup_browser()
-        # Disconnect from all MCP servers only if we were initialized
-        if self._initialized:
+        for task in self._mcp_connect_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._mcp_connect_tasks.values(), return_exceptions=True)
+        self._mcp_connect_tasks.clear()
+        # Disconnect from all MCP servers only if we were initialized and the
+        # sessions are ours rather than borrowed from another agent
+        if self._initialized and self._owns_mcp_clients:
             await self.disconnect_mcp_server()
-            self._initialized = False
+        self._initialized = False
 
     async def think(self) -> bool:
         """Process current state and decide next actions with appropriate context."""
         if not self._initialized:
             await self.initialize_mcp_servers()
             self._initialized = True
+        # Pick up tools added, changed or removed by the MCP servers
+        self._sync_mcp_tools()
 
         original_prompt = self.next_step_prompt
         recent_messages = self.memory.messages[-3:] if self.memory.messages else []
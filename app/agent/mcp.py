@@ -30,9 +30,9 @@ class MCPAgent(ToolCallAgent):
     max_steps: int = 20
     connection_type: str = "stdio"  # "stdio" or "sse"
 
-    # Track tool schemas to detect changes
-    tool_schemas: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
-    _refresh_tools_interval: int = 5  # Refresh tools every N steps
+    # Track tool schema hashes to detect changes
+    tool_hashes: Dict[str, str] = Field(default_factory=dict)
+    _tools_version: int = -1  # MCPClients.tools_version last seen
 
     # Special tool names that should trigger termination
     special_tool_names: List[str] = Field(default_factory=lambda: ["terminate"])
@@ -85,21 +85,25 @@ class MCPAgent(ToolCallAgent):
         )
 
     async def _refresh_tools(self) -> Tuple[List[str], List[str]]:
-        """Refresh the list of available tools from the MCP server.
+        """Pick up tool changes that MCPClients has synced from the servers.
+
+        The clients follow tools/list_changed notifications, or poll servers
+        that don't send them, so this only compares cached schema hashes.
 
         Returns:
             A tuple of (added_tools, removed_tools)
         """
-        if not self.mcp_clients.sessions:
+        if self.mcp_clients.tools_version == self._tools_version:
             return [], []
+        self._tools_version = self.mcp_clients.tools_version
 
-        # Get current tool schemas directly from the server
-        response = await self.mcp_clients.list_tools()
-        current_tools = {tool.name: tool.inputSchema for tool in response.tools}
+        current_tools = {
+            name: tool.schema_hash for name, tool in self.mcp_clients.tool_map.items()
+        }
 
         # Determine added, removed, and changed tools
         current_names = set(current_tools.keys())
-        previous_names = set(self.tool_schemas.keys())
+        previous_names = set(self.tool_hashes.keys())
 
         added_tools = list(current_names - previous_names)
         removed_tools = list(previous_names - current_names)
@@ -107,11 +111,11 @@ class MCPAgent(ToolCallAgent):
         # Check for schema changes in existing tools
         changed_tools = []
         for name in current_names.intersection(previous_names):
-            if current_tools[name] != self.tool_schemas.get(name):
+            if current_tools[name] != self.tool_hashes.get(name):
                 changed_tools.append(name)
 
-        # Update stored schemas
-        self.tool_schemas = current_tools
+        # Update stored hashes
+        self.tool_hashes = current_tools
 
         # Log and notify about changes
         if added_tools:
@@ -139,14 +143,8 @@ class MCPAgent(ToolCallAgent):
             self.state = AgentState.FINISHED
             return False
 
-        # Refresh tools periodically
-        if self.current_step % self._refresh_tools_interval == 0:
-            await self._refresh_tools()
-            # All tools removed indicates shutdown
-            if not self.mcp_clients.tool_map:
-                logger.info("MCP service has shut down, ending interaction")
-                self.state = AgentState.FINISHED
-                return False
+        # Pick up tool changes; cheap, as it only checks a version counter
+        await self._refresh_tools()
 
         # Use the parent class's think method
         return await super().think()
@@ -1,11 +1,12 @@
 import asyncio
 import json
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from app.agent.react import ReActAgent
-from app.exceptions import TokenLimitExceeded
+from app.config import config
+from app.exceptions import StreamedToolCallError, TokenLimitExceeded
 from app.logger import logger
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import TOOL_CHOICE_TYPE, AgentState, Message, ToolCall, ToolChoice
@@ -32,6 +33,19 @@ class ToolCallAgent(ReActAgent):
 
     tool_calls: List[ToolCall] = Field(default_factory=list)
     _current_base64_image: Optional[str] = None
+    _tool_call_images: Dict[str, str] = PrivateAttr(default_factory=dict)
+
+    # Stream tool calls and start each tool as soon as its arguments are complete
+    # (None follows the `stream_tool_calls` setting of the LLM config)
+    stream_tool_calls: Optional[bool] = None
+    _pending_tool_tasks: Dict[str, asyncio.Task] = PrivateAttr(default_factory=dict)
+    _stream_barrier: bool = PrivateAttr(default=False)
+
+    # Maximum number of parallel-safe tool calls executed concurrently
+    max_parallel_tools: int = Field(
+        default_factory=lambda: config.run_flow_config.max_parallel_tools
+    )
+    _tool_slots: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
 
     max_steps: int = 30
     max_observe: Optional[Union[int, bool]] = None
@@ -40,7 +54,27 @@ class ToolCallAgent(ReActAgent):
         """Process current state and decide next actions using tools"""
         if self.next_step_prompt:
             user_msg = Message.user_message(self.next_step_prompt)
-            self.messages += [user_msg]
+            self.memory.add_message(user_msg)
+
+        # Keep the history within its token budget before sending it
+        await self.memory.compact(self.llm)
+
+        self._cancel_pending_tool_tasks()
+        stream_tool_calls = (
+            self.llm.stream_tool_calls
+            if self.stream_tool_calls is None
+            else self.stream_tool_calls
+        )
+        stream_kwargs = (
+            {
+                "stream": True,
+                "on_tool_call": self._start_tool_call,
+                # Drop tool runs and the barrier left by a failed attempt
+                "on_stream_start": self._cancel_pending_tool_tasks,
+            }
+            if stream_tool_calls and self.tool_choices != ToolChoice.NONE
+            else {}
+        )
 
         try:
             # Get response with tool options
@@ -53,10 +87,25 @@ class ToolCallAgent(ReActAgent):
                 ),
                 tools=self.available_tools.to_params(),
                 tool_choice=self.tool_choices,
+                **stream_kwargs,
             )
         except ValueError:
+            self._cancel_pending_tool_tasks()
             raise
+        except StreamedToolCallError as e:
+            # A dropped stream should not end the run: stop the tools it
+            # started and let the next step ask again
+            await self._await_cancelled_tool_tasks()
+            logger.warning(f"🚨 {self.name}'s tool call stream failed: {e}")
+            self.memory.add_message(
+                Message.assistant_message(
+                    f"Error encountered while processing: {str(e)}. "
+                    "Tool calls started from the failed response were cancelled."
+                )
+            )
+            return False
         except Exception as e:
+            self._cancel_pending_tool_tasks()
             # Check if this is a RetryError containing TokenLimitExceeded
             if hasattr(e, "__cause__") and isinstance(e.__cause__, TokenLimitExceeded):
                 token_limit_error = e.__cause__
@@ -138,11 +187,12 @@ class ToolCallAgent(ReActAgent):
             return self.messages[-1].content or "No content or commands to execute"
 
         results = []
-        for command in self.tool_calls:
-            # Reset base64_image for each tool call
-            self._current_base64_image = None
+        self._current_base64_image = None
+        outputs = await self._execute_tool_calls(self.tool_calls)
 
-            result = await self.execute_tool(command)
+        # Add tool responses to memory in call order to keep tool_call_id pairing
+        for command, result in zip(self.tool_calls, outputs):
+            base64_image = self._tool_call_images.pop(command.id, None)
 
             if self.max_observe:
                 result = result[: self.max_observe]
@@ -151,18 +201,89 @@ class ToolCallAgent(ReActAgent):
                 f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
             )
 
-            # Add tool response to memory
             tool_msg = Message.tool_message(
                 content=result,
                 tool_call_id=command.id,
                 name=command.function.name,
-                base64_image=self._current_base64_image,
+                base64_image=base64_image,
             )
             self.memory.add_message(tool_msg)
             results.append(result)
 
+        # Drop runs started for tool calls that did not make it into the response
+        self._cancel_pending_tool_tasks()
+
         return "\n\n".join(results)
 
+    async def _execute_tool_calls(self, commands: List[ToolCall]) -> List[str]:
+        """Execute tool calls, running consecutive parallel-safe calls concurrently.
+
+        A call to a tool that is not parallel-safe acts as a barrier: it starts
+        after every earlier call has finished and later calls wait for it.
+        """
+        outputs: List[str] = []
+        batch: List[ToolCall] = []
+        for command in commands:
+            if self._is_parallel_safe(command):
+                batch.append(command)
+                continue
+            outputs += await asyncio.gather(*map(self._run_tool_call, batch))
+            batch = []
+            outputs.append(await self._run_tool_call(command))
+        outputs += await asyncio.gather(*map(self._run_tool_call, batch))
+        return outputs
+
+    async def _run_tool_call(self, command: ToolCall) -> str:
+        """Run a tool call, reusing the run started while the response was streaming"""
+        task = self._pending_tool_tasks.pop(command.id, None)
+        if task:
+            return await task
+        return await self._execute_tool_limited(command)
+
+    async def _execute_tool_limited(self, command: ToolCall) -> str:
+        """Execute a tool call within the max_parallel_tools cap"""
+        if self._tool_slots is None:
+            self._tool_slots = asyncio.Semaphore(max(1, self.max_parallel_tools))
+        async with self._tool_slots:
+            return await self.execute_tool(command)
+
+    def _is_parallel_safe(self, command: ToolCall) -> bool:
+        """Check whether a tool call may run alongside other calls"""
+        tool = self.available_tools.get_tool(command.function.name)
+        return tool is None or tool.parallel_safe
+
+    def _start_tool_call(self, command: ToolCall) -> None:
+        """Start executing a streamed tool call before the full response arrives.
+
+        Only the leading run of parallel-safe calls is started early; once a
+        call that is not parallel-safe is seen, the rest wait for act().
+        """
+        if command.id in self._pending_tool_tasks or self._stream_barrier:
+            return
+        if not self._is_parallel_safe(command):
+            self._stream_barrier = True
+            if self._pending_tool_tasks:
+                return
+        logger.info(f"⚡ Starting streamed tool call '{command.function.name}' early")
+        self._pending_tool_tasks[command.id] = asyncio.create_task(
+            self._execute_tool_limited(command)
+        )
+
+    def _cancel_pending_tool_tasks(self) -> None:
+        """Cancel tool runs that were started early and reset per-step run state"""
+        for task in self._pending_tool_tasks.values():
+            if not task.done():
+                task.cancel()
+        self._pending_tool_tasks.clear()
+        self._stream_barrier = False
+        self._tool_slots = None
+
+    async def _await_cancelled_tool_tasks(self) -> None:
+        """Cancel tool runs that were started early and wait for them to stop"""
+        tasks = list(self._pending_tool_tasks.values())
+        self._cancel_pending_tool_tasks()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
         if not command or not command.function or not command.function.name:
@@ -187,6 +308,7 @@ class ToolCallAgent(ReActAgent):
             if hasattr(result, "base64_image") and result.base64_image:
                 # Store the base64_image for later use in tool_message
                 self._current_base64_image = result.base64_image
+                self._tool_call_images[command.id] = result.base64_image
 
             # Format result for display (standard case)
             observation = (
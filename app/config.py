@@ -2,7 +2,7 @@ import json
 import threading
 import tomllib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -28,6 +28,36 @@ class LLMSettings(BaseModel):
     temperature: float = Field(1.0, description="Sampling temperature")
     api_type: str = Field(..., description="Azure, Openai, or Ollama")
     api_version: str = Field(..., description="Azure Openai version if AzureOpenai")
+    requests_per_minute: Optional[int] = Field(
+        None, description="Maximum requests per minute (None for unlimited)"
+    )
+    tokens_per_minute: Optional[int] = Field(
+        None, description="Maximum tokens per minute (None for unlimited)"
+    )
+    max_concurrent_requests: Optional[int] = Field(
+        None, description="Maximum in-flight requests (None for unlimited)"
+    )
+    response_cache: bool = Field(
+        False, description="Cache responses for identical requests"
+    )
+    response_cache_size: int = Field(
+        256, description="Maximum number of responses kept in the in-memory cache"
+    )
+    response_cache_path: Optional[str] = Field(
+        None,
+        description="SQLite file for the on-disk response cache (None for memory only)",
+    )
+    response_cache_max_bytes: int = Field(
+        100 * 1024 * 1024, description="Maximum size of the on-disk response cache"
+    )
+    memory_token_budget: Optional[int] = Field(
+        None,
+        description="Token budget of agent memory before older messages are summarized (None disables compaction)",
+    )
+    stream_tool_calls: bool = Field(
+        False,
+        description="Stream tool calls and start each tool as soon as its arguments are complete",
+    )
 
 
 class ProxySettings(BaseModel):
@@ -58,12 +88,46 @@ class SearchSettings(BaseModel):
         default="us",
         description="Country code for search results (e.g., us, cn, uk)",
     )
+    hedge_delay: Optional[float] = Field(
+        default=None,
+        description="Max seconds to wait on an engine before also starting the next one; measured p50 latencies shorten it (None tries engines one at a time)",
+    )
+    cache_ttl: int = Field(
+        default=600,
+        description="Seconds search results are reused for identical queries (0 disables)",
+    )
+    cache_size: int = Field(
+        default=128, description="Maximum number of queries kept in the search cache"
+    )
+    cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the on-disk search cache (None for memory only)",
+    )
+    content_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds fetched page content is reused per URL (0 disables)",
+    )
+    content_cache_size: int = Field(
+        default=256, description="Maximum number of pages kept in the content cache"
+    )
+    content_cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the on-disk content cache (None for memory only)",
+    )
 
 
 class RunflowSettings(BaseModel):
     use_data_analysis_agent: bool = Field(
         default=False, description="Enable data analysis agent in run flow"
     )
+    max_parallel_steps: int = Field(
+        default=3,
+        description="Maximum number of independent plan steps executed concurrently",
+    )
+    max_parallel_tools: int = Field(
+        default=4,
+        description="Maximum number of parallel-safe tool calls an agent executes concurrently",
+    )
 
 
 class BrowserSettings(BaseModel):
@@ -89,6 +153,51 @@ class BrowserSettings(BaseModel):
     max_content_length: int = Field(
         2000, description="Maximum length for content retrieval operations"
     )
+    load_profile: Literal["full", "text_first"] = Field(
+        "full",
+        description="'text_first' skips images, media and fonts and waits for DOMContentLoaded instead of the full load",
+    )
+    blocked_resource_types: List[str] = Field(
+        default_factory=list,
+        description="Request resource types to block (e.g. image, media, font, stylesheet)",
+    )
+    blocked_domains: List[str] = Field(
+        default_factory=list,
+        description="Domains, including their subdomains, whose requests are blocked",
+    )
+    context_pool_size: int = Field(
+        0,
+        description="Max browser contexts shared by all agents on one browser process (0 gives each tool its own browser)",
+    )
+    context_pool_min_idle: int = Field(
+        1, description="Pre-warmed browser contexts kept ready in the pool"
+    )
+    context_pool_idle_timeout: float = Field(
+        300.0, description="Seconds before idle pooled contexts and the browser close"
+    )
+    chunked_extraction: bool = Field(
+        False,
+        description="Extract from the whole page in concurrent chunks instead of truncating it",
+    )
+    extraction_chunk_tokens: int = Field(
+        4000, description="Token size of each page chunk in chunked extraction"
+    )
+    extraction_max_chunks: int = Field(
+        8, description="Maximum number of page chunks sent for extraction"
+    )
+    screenshot_full_page: bool = Field(
+        False, description="Capture the whole page instead of only the viewport"
+    )
+    screenshot_quality: int = Field(
+        75, ge=1, le=100, description="JPEG quality of state screenshots"
+    )
+    screenshot_max_dimension: Optional[int] = Field(
+        1568, description="Downscale screenshots whose longest side exceeds this"
+    )
+    screenshot_skip_unchanged: bool = Field(
+        True,
+        description="Skip the screenshot when URL, scroll position and elements are unchanged",
+    )
 
 
 class SandboxSettings(BaseModel):
@@ -103,6 +212,12 @@ class SandboxSettings(BaseModel):
     network_enabled: bool = Field(
         False, description="Whether network access is allowed"
     )
+    pool_min_size: int = Field(
+        0, description="Pre-started sandboxes kept warm (0 only reuses released ones)"
+    )
+    pool_max_size: int = Field(
+        0, description="Max idle sandboxes kept for reuse (0 disables pooling)"
+    )
 
 
 class MCPServerConfig(BaseModel):
@@ -125,6 +240,20 @@ class MCPSettings(BaseModel):
     servers: Dict[str, MCPServerConfig] = Field(
         default_factory=dict, description="MCP server configurations"
     )
+    connect_timeout: float = Field(
+        30.0, description="Seconds allowed for each server to connect and list tools"
+    )
+    required_servers: Optional[List[str]] = Field(
+        None,
+        description="Servers that must be connected before the agent's first step (None waits for all)",
+    )
+    tools_poll_interval: float = Field(
+        30.0,
+        description="Seconds between tool list polls for servers without change notifications (0 disables polling)",
+    )
+    tools_poll_max_interval: float = Field(
+        300.0, description="Upper bound for the poll interval as it backs off"
+    )
 
     @classmethod
     def load_server_config(cls) -> Dict[str, MCPServerConfig]:
@@ -224,6 +353,17 @@ class Config:
             "temperature": base_llm.get("temperature", 1.0),
             "api_type": base_llm.get("api_type", ""),
             "api_version": base_llm.get("api_version", ""),
+            "requests_per_minute": base_llm.get("requests_per_minute"),
+            "tokens_per_minute": base_llm.get("tokens_per_minute"),
+            "max_concurrent_requests": base_llm.get("max_concurrent_requests"),
+            "response_cache": base_llm.get("response_cache", False),
+            "response_cache_size": base_llm.get("response_cache_size", 256),
+            "response_cache_path": base_llm.get("response_cache_path"),
+            "response_cache_max_bytes": base_llm.get(
+                "response_cache_max_bytes", 100 * 1024 * 1024
+            ),
+            "memory_token_budget": base_llm.get("memory_token_budget"),
+            "stream_tool_calls": base_llm.get("stream_tool_calls", False),
         }
 
         # handle browser config.
@@ -11,3 +11,7 @@ class OpenManusError(Exception):
 
 class TokenLimitExceeded(OpenManusError):
     """Exception raised when the token limit is exceeded"""
+
+
+class StreamedToolCallError(OpenManusError):
+    """Exception raised when a stream fails after tool calls were handed off"""
@@ -1,16 +1,19 @@
+import asyncio
 import json
+import re
 import time
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import ClassVar, Dict, List, Optional, Set, Union
 
 from pydantic import Field
 
 from app.agent.base import BaseAgent
+from app.config import config
 from app.flow.base import BaseFlow
 from app.llm import LLM
 from app.logger import logger
 from app.schema import AgentState, Message, ToolChoice
-from app.tool import PlanningTool
+from app.tool import PlanningTool, ToolCollection
 
 
 class PlanStepStatus(str, Enum):
@@ -50,6 +53,9 @@ class PlanningFlow(BaseFlow):
     executor_keys: List[str] = Field(default_factory=list)
     active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
     current_step_index: Optional[int] = None
+    max_parallel_steps: int = Field(
+        default_factory=lambda: config.run_flow_config.max_parallel_steps
+    )
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -108,30 +114,100 @@ class PlanningFlow(BaseFlow):
                     )
                     return f"Failed to create plan for: {input_text}"
 
-            result = ""
+            return await self._execute_ready_steps()
+        except Exception as e:
+            logger.error(f"Error in PlanningFlow: {str(e)}")
+            return f"Execution failed: {str(e)}"
+
+    async def _execute_ready_steps(self) -> str:
+        """Run plan steps as their dependencies complete, up to max_parallel_steps at once."""
+        # Agents share the global sandbox client, which each run tears down
+        max_parallel = 1 if config.sandbox.use_sandbox else self.max_parallel_steps
+        # Running step tasks mapped to their step index and executor
+        running: Dict[asyncio.Task, tuple[int, BaseAgent]] = {}
+        result = ""
+
+        try:
             while True:
-                # Get current step to execute
-                self.current_step_index, step_info = await self._get_current_step_info()
+                # Start every ready step while there is capacity
+                running_steps = {index for index, _ in running.values()}
+                for step_index, step_info in self._get_ready_steps(running_steps):
+                    if len(running) >= max(1, max_parallel):
+                        break
+                    await self._mark_step_in_progress(step_index)
+
+                    # Each concurrent step needs an agent with its own memory
+                    executor = self.get_executor(step_info.get("type"))
+                    if any(executor is agent for _, agent in running.values()):
+                        executor = self._clone_executor(executor)
+
+                    self.current_step_index = step_index
+                    task = asyncio.create_task(self._execute_step(executor, step_info))
+                    running[task] = (step_index, executor)
 
                 # Exit if no more steps or plan completed
-                if self.current_step_index is None:
+                if not running:
+                    self.current_step_index = None
                     result += await self._finalize_plan()
                     break
 
-                # Execute current step with appropriate agent
-                step_type = step_info.get("type") if step_info else None
-                executor = self.get_executor(step_type)
-                step_result = await self._execute_step(executor, step_info)
-                result += step_result + "\n"
-
-                # Check if agent wants to terminate
-                if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                finished = False
+                for task in sorted(done, key=lambda t: running[t][0]):
+                    _, executor = running.pop(task)
+                    result += task.result() + "\n"
+
+                    # Check if agent wants to terminate
+                    if (
+                        hasattr(executor, "state")
+                        and executor.state == AgentState.FINISHED
+                    ):
+                        finished = True
+                if finished:
                     break
+        finally:
+            # Let cancelled steps finish their cleanup before the flow returns
+            for task in running:
+                task.cancel()
+            if running:
+                logger.info(
+                    f"Cancelled unfinished steps {sorted(i for i, _ in running.values())}"
+                )
+                await asyncio.gather(*running, return_exceptions=True)
 
-            return result
-        except Exception as e:
-            logger.error(f"Error in PlanningFlow: {str(e)}")
-            return f"Execution failed: {str(e)}"
+        return result
+
+    # Agent fields holding the progress of a run rather than configuration
+    _RUN_FIELDS: ClassVar[Set[str]] = {"memory", "state", "current_step", "tool_calls"}
+
+    def _clone_executor(self, executor: BaseAgent) -> BaseAgent:
+        """Create an executor with the same configuration and its own memory and tools.
+
+        The clone is built through the constructor so the agent's validators
+        run again, and shares the LLM and connection holders such as
+        MCPClients. Plain tool collections are copied tool by tool.
+        """
+        fields = {
+            name: getattr(executor, name)
+            for name in type(executor).model_fields
+            if name not in self._RUN_FIELDS
+        }
+        memory = executor.memory
+        fields["memory"] = type(memory)(
+            **{
+                name: getattr(memory, name)
+                for name in type(memory).model_fields
+                if name != "messages"
+            }
+        )
+        tools = getattr(executor, "available_tools", None)
+        if type(tools) is ToolCollection:
+            fields["available_tools"] = ToolCollection(
+                *(tool.clone() for tool in tools)
+            )
+        return type(executor)(**fields)
 
     async def _create_initial_plan(self, request: str) -> None:
         """Create an initial plan based on the request using the flow's LLM and PlanningTool."""
@@ -140,7 +216,9 @@ class PlanningFlow(BaseFlow):
         system_message_content = (
             "You are a planning assistant. Create a concise, actionable plan with clear steps. "
             "Focus on key milestones rather than detailed sub-steps. "
-            "Optimize for clarity and efficiency."
+            "Optimize for clarity and efficiency. "
+            "If some steps do not depend on each other, set `step_dependencies` "
+            "so they can be executed in parallel."
         )
         agents_description = []
         for key in self.executor_keys:
@@ -210,75 +288,91 @@ class PlanningFlow(BaseFlow):
             }
         )
 
-    async def _get_current_step_info(self) -> tuple[Optional[int], Optional[dict]]:
+    def _get_ready_steps(self, running: Set[int]) -> List[tuple[int, dict]]:
         """
-        Parse the current plan to identify the first non-completed step's index and info.
-        Returns (None, None) if no active step is found.
+        Find the active steps whose dependencies are all completed.
+        Plans without dependencies run in order, so only the first active step is ready.
+        Steps in `running` are skipped.
         """
         if (
             not self.active_plan_id
             or self.active_plan_id not in self.planning_tool.plans
         ):
             logger.error(f"Plan with ID {self.active_plan_id} not found")
-            return None, None
+            return []
 
         try:
             # Direct access to plan data from planning tool storage
             plan_data = self.planning_tool.plans[self.active_plan_id]
             steps = plan_data.get("steps", [])
             step_statuses = plan_data.get("step_statuses", [])
+            dependencies = plan_data.get("step_dependencies")
 
-            # Find first non-completed step
+            def status_of(index: int) -> str:
+                if index >= len(step_statuses):
+                    return PlanStepStatus.NOT_STARTED.value
+                return step_statuses[index]
+
+            ready = []
             for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
-
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
-
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
-
-                    # Mark current step as in_progress
-                    try:
-                        await self.planning_tool.execute(
-                            command="mark_step",
-                            plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
-
-                    return i, step_info
-
-            return None, None  # No active step found
+                if status_of(i) not in PlanStepStatus.get_active_statuses():
+                    continue
+
+                if dependencies is None:
+                    # Sequential plan: wait for the first active step to finish
+                    if running:
+                        break
+                    return [(i, self._build_step_info(i, step))]
+
+                if i in running:
+                    continue
+                step_dependencies = dependencies[i] if i < len(dependencies) else []
+                if all(
+                    status_of(dep) == PlanStepStatus.COMPLETED.value
+                    for dep in step_dependencies
+                ):
+                    ready.append((i, self._build_step_info(i, step)))
+
+            return ready
 
         except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
-            return None, None
+            logger.warning(f"Error finding ready steps: {e}")
+            return []
+
+    @staticmethod
+    def _build_step_info(index: int, step: str) -> dict:
+        """Build step info, extracting the step type from text like [SEARCH] or [CODE]."""
+        step_info = {"index": index, "text": step}
+        type_match = re.search(r"\[([A-Z_]+)\]", step)
+        if type_match:
+            step_info["type"] = type_match.group(1).lower()
+        return step_info
+
+    async def _mark_step_in_progress(self, step_index: int) -> None:
+        """Mark a step as in_progress."""
+        try:
+            await self.planning_tool.execute(
+                command="mark_step",
+                plan_id=self.active_plan_id,
+                step_index=step_index,
+                step_status=PlanStepStatus.IN_PROGRESS.value,
+            )
+        except Exception as e:
+            logger.warning(f"Error marking step as in_progress: {e}")
+            # Update step status directly if needed
+            plan_data = self.planning_tool.plans[self.active_plan_id]
+            step_statuses = plan_data.get("step_statuses", [])
+            while len(step_statuses) <= step_index:
+                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
+            step_statuses[step_index] = PlanStepStatus.IN_PROGRESS.value
+            plan_data["step_statuses"] = step_statuses
 
     async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
         """Execute the current step with the specified agent using agent.run()."""
         # Prepare context for the agent with current plan status
         plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        step_index = step_info.get("index", self.current_step_index)
+        step_text = step_info.get("text", f"Step {step_index}")
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
@@ -286,7 +380,7 @@ class PlanningFlow(BaseFlow):
         {plan_status}
 
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
         Please only execute this current step using the appropriate tools. When you're done, provide a summary of what you accomplished.
         """
@@ -296,16 +390,40 @@ class PlanningFlow(BaseFlow):
             step_result = await executor.run(step_prompt)
 
             # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            await self._mark_step_completed(step_index)
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
+            logger.error(f"Error executing step {step_index}: {e}")
+            # Block the step so it is not scheduled again, nor its dependents
+            await self._mark_step_blocked(step_index, f"Failed: {e}")
+            return f"Error executing step {step_index}: {str(e)}"
+
+    async def _mark_step_blocked(self, step_index: int, notes: str) -> None:
+        """Mark a step as blocked, e.g. after its execution raised."""
+        try:
+            await self.planning_tool.execute(
+                command="mark_step",
+                plan_id=self.active_plan_id,
+                step_index=step_index,
+                step_status=PlanStepStatus.BLOCKED.value,
+                step_notes=notes,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to mark step {step_index} as blocked: {e}")
+            plan_data = self.planning_tool.plans.get(self.active_plan_id)
+            if plan_data is not None:
+                step_statuses = plan_data.get("step_statuses", [])
+                while len(step_statuses) <= step_index:
+                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
+                step_statuses[step_index] = PlanStepStatus.BLOCKED.value
+                plan_data["step_statuses"] = step_statuses
 
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
+    async def _mark_step_completed(self, step_index: Optional[int] = None) -> None:
+        """Mark the given step (default: the current step) as completed."""
+        if step_index is None:
+            step_index = self.current_step_index
+        if step_index is None:
             return
 
         try:
@@ -313,11 +431,11 @@ class PlanningFlow(BaseFlow):
             await self.planning_tool.execute(
                 command="mark_step",
                 plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
+                step_index=step_index,
                 step_status=PlanStepStatus.COMPLETED.value,
             )
             logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
+                f"Marked step {step_index} as completed in plan {self.active_plan_id}"
             )
         except Exception as e:
             logger.warning(f"Failed to update plan status: {e}")
@@ -327,11 +445,11 @@ class PlanningFlow(BaseFlow):
                 step_statuses = plan_data.get("step_statuses", [])
 
                 # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
+                while len(step_statuses) <= step_index:
                     step_statuses.append(PlanStepStatus.NOT_STARTED.value)
 
                 # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
+                step_statuses[step_index] = PlanStepStatus.COMPLETED.value
                 plan_data["step_statuses"] = step_statuses
 
     async def _get_plan_text(self) -> str:
@@ -1,5 +1,8 @@
+import hashlib
+import json
 import math
-from typing import Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Union
 
 import tiktoken
 from openai import (
@@ -10,18 +13,26 @@ from openai import (
     OpenAIError,
     RateLimitError,
 )
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
 from tenacity import (
     retry,
     retry_if_exception_type,
+    retry_if_not_exception_type,
     stop_after_attempt,
     wait_random_exponential,
 )
 
 from app.bedrock import BedrockClient
-from app.config import LLMSettings, config
-from app.exceptions import TokenLimitExceeded
+from app.cache import TieredCache, make_cache_key
+from app.config import PROJECT_ROOT, LLMSettings, config
+from app.exceptions import StreamedToolCallError, TokenLimitExceeded
 from app.logger import logger  # Assuming a logger is set up in your app
+from app.rate_limiter import RateLimiter, parse_reset_duration
 from app.schema import (
     ROLE_VALUES,
     TOOL_CHOICE_TYPE,
@@ -54,8 +65,14 @@ class TokenCounter:
     HIGH_DETAIL_TARGET_SHORT_SIDE = 768
     TILE_SIZE = 512
 
+    # Per-message token cache size
+    MESSAGE_CACHE_SIZE = 4096
+
     def __init__(self, tokenizer):
         self.tokenizer = tokenizer
+        self._message_cache: "OrderedDict[str, int]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def count_text(self, text: str) -> int:
         """Calculate tokens for a text string"""
@@ -144,32 +161,67 @@ class TokenCounter:
                 token_count += self.count_text(function.get("arguments", ""))
         return token_count
 
-    def count_message_tokens(self, messages: List[dict]) -> int:
-        """Calculate the total number of tokens in a message list"""
-        total_tokens = self.FORMAT_TOKENS  # Base format tokens
+    def count_single_message(self, message: dict) -> int:
+        """Calculate tokens for a single formatted message (without format tokens)"""
+        tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
 
-        for message in messages:
-            tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+        # Add role tokens
+        tokens += self.count_text(message.get("role", ""))
+
+        # Add content tokens
+        if "content" in message:
+            tokens += self.count_content(message["content"])
 
-            # Add role tokens
-            tokens += self.count_text(message.get("role", ""))
+        # Add tool calls tokens
+        if "tool_calls" in message:
+            tokens += self.count_tool_calls(message["tool_calls"])
 
-            # Add content tokens
-            if "content" in message:
-                tokens += self.count_content(message["content"])
+        # Add name and tool_call_id tokens
+        tokens += self.count_text(message.get("name", ""))
+        tokens += self.count_text(message.get("tool_call_id", ""))
 
-            # Add tool calls tokens
-            if "tool_calls" in message:
-                tokens += self.count_tool_calls(message["tool_calls"])
+        return tokens
 
-            # Add name and tool_call_id tokens
-            tokens += self.count_text(message.get("name", ""))
-            tokens += self.count_text(message.get("tool_call_id", ""))
+    @staticmethod
+    def _message_cache_key(message: dict) -> str:
+        """Build a content hash for a formatted message"""
+        payload = json.dumps(message, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def count_message_tokens(self, messages: List[dict]) -> int:
+        """Calculate the total number of tokens in a message list
 
-            total_tokens += tokens
+        Per-message counts are cached by content hash, so repeated calls over a
+        growing history only tokenize the messages that were not seen before.
+        """
+        total_tokens = self.FORMAT_TOKENS  # Base format tokens
+
+        for message in messages:
+            total_tokens += self.count_cached_message(message)
 
         return total_tokens
 
+    def count_cached_message(self, message: dict) -> int:
+        """Calculate tokens for a single message, using the content hash cache"""
+        key = self._message_cache_key(message)
+        tokens = self._message_cache.get(key)
+        if tokens is None:
+            self.cache_misses += 1
+            tokens = self.count_single_message(message)
+            self._message_cache[key] = tokens
+            if len(self._message_cache) > self.MESSAGE_CACHE_SIZE:
+                self._message_cache.popitem(last=False)
+        else:
+            self.cache_hits += 1
+            self._message_cache.move_to_end(key)
+        return tokens
+
+    def clear_cache(self) -> None:
+        """Clear the per-message token cache"""
+        self._message_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
 
 class LLM:
     _instances: Dict[str, "LLM"] = {}
@@ -205,6 +257,10 @@ class LLM:
                 if hasattr(llm_config, "max_input_tokens")
                 else None
             )
+            # Token budget for agent memory using this LLM
+            self.memory_token_budget = getattr(llm_config, "memory_token_budget", None)
+            # Default for agents that leave stream_tool_calls unset
+            self.stream_tool_calls = getattr(llm_config, "stream_tool_calls", False)
 
             # Initialize tokenizer
             try:
@@ -226,6 +282,25 @@ class LLM:
 
             self.token_counter = TokenCounter(self.tokenizer)
 
+            # Shared limiter for every caller of this config
+            self.rate_limiter = RateLimiter(
+                requests_per_minute=getattr(llm_config, "requests_per_minute", None),
+                tokens_per_minute=getattr(llm_config, "tokens_per_minute", None),
+                max_concurrency=getattr(llm_config, "max_concurrent_requests", None),
+            )
+
+            # Optional response cache for identical requests
+            self.response_cache: Optional[TieredCache] = None
+            if getattr(llm_config, "response_cache", False):
+                cache_path = llm_config.response_cache_path
+                if cache_path:
+                    cache_path = PROJECT_ROOT / cache_path
+                self.response_cache = TieredCache.create(
+                    max_entries=llm_config.response_cache_size,
+                    path=cache_path,
+                    max_bytes=llm_config.response_cache_max_bytes,
+                )
+
     def count_tokens(self, text: str) -> int:
         """Calculate the number of tokens in a text"""
         if not text:
@@ -235,11 +310,94 @@ class LLM:
     def count_message_tokens(self, messages: List[dict]) -> int:
         return self.token_counter.count_message_tokens(messages)
 
+    def count_tools_tokens(self, tools: Optional[List[dict]]) -> int:
+        """Calculate the token cost of tool schemas
+
+        Lists from `ToolCollection.to_params` carry their cost per tokenizer,
+        so it is only computed once per tool set and tokenizer.
+        """
+        if not tools:
+            return 0
+        token_counts = getattr(tools, "token_counts", None)
+        if token_counts is None:
+            return sum(self.count_tokens(str(tool)) for tool in tools)
+
+        tokenizer_name = getattr(self.tokenizer, "name", self.model)
+        tokens = token_counts.get(tokenizer_name)
+        if tokens is None:
+            tokens = sum(self.count_tokens(str(tool)) for tool in tools)
+            token_counts[tokenizer_name] = tokens
+        return tokens
+
+    def _response_cache_key(self, kind: str, params: dict) -> Optional[str]:
+        """Build a response cache key from the request parameters"""
+        if self.response_cache is None:
+            return None
+        return make_cache_key(
+            kind,
+            params.get("model"),
+            params.get("messages"),
+            params.get("tools"),
+            params.get("tool_choice"),
+            params.get("temperature"),
+        )
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Return response cache hit/miss counters"""
+        return self.response_cache.stats() if self.response_cache else {}
+
+    async def _create_completion(self, input_tokens: int, **params):
+        """Create a chat completion once the rate limiter admits the request.
+
+        The in-flight slot is held until a streamed response is fully consumed.
+        Provider rate limit headers are fed back into the limiter.
+        """
+        await self.rate_limiter.acquire(input_tokens)
+        try:
+            completions = self.client.chat.completions
+            if hasattr(completions, "with_raw_response"):
+                raw_response = await completions.with_raw_response.create(**params)
+                self.rate_limiter.update_from_headers(raw_response.headers)
+                response = raw_response.parse()
+            else:
+                response = await completions.create(**params)
+        except RateLimitError as e:
+            retry_after = parse_reset_duration(e.response.headers.get("retry-after"))
+            self.rate_limiter.pause(retry_after or 1.0)
+            self.rate_limiter.release()
+            raise
+        except BaseException:
+            self.rate_limiter.release()
+            raise
+
+        if params.get("stream") and hasattr(response, "__aiter__"):
+            return self._release_after_stream(response)
+        self.rate_limiter.release()
+        return response
+
+    async def _release_after_stream(self, response):
+        """Yield streamed chunks and free the rate limiter slot when done.
+
+        Consumers that may stop early must `aclose()` the generator so the
+        HTTP response is closed and the slot freed right away rather than at
+        garbage collection.
+        """
+        try:
+            async for chunk in response:
+                yield chunk
+        finally:
+            try:
+                if hasattr(response, "close"):
+                    await response.close()
+            finally:
+                self.rate_limiter.release()
+
     def update_token_count(self, input_tokens: int, completion_tokens: int = 0) -> None:
         """Update token counts"""
         # Only track tokens if max_input_tokens is set
         self.total_input_tokens += input_tokens
         self.total_completion_tokens += completion_tokens
+        self.rate_limiter.record_tokens(completion_tokens)
         logger.info(
             f"Token usage: Input={input_tokens}, Completion={completion_tokens}, "
             f"Cumulative Input={self.total_input_tokens}, Cumulative Completion={self.total_completion_tokens}, "
@@ -416,10 +574,17 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
+            cache_key = self._response_cache_key("ask", params)
+            if cache_key:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Response cache hit for ask")
+                    return cached
+
             if not stream:
                 # Non-streaming request
-                response = await self.client.chat.completions.create(
-                    **params, stream=False
+                response = await self._create_completion(
+                    input_tokens, **params, stream=False
                 )
 
                 if not response.choices or not response.choices[0].message.content:
@@ -430,20 +595,29 @@ class LLM:
                     response.usage.prompt_tokens, response.usage.completion_tokens
                 )
 
+                if cache_key:
+                    self.response_cache.set(
+                        cache_key, response.choices[0].message.content
+                    )
                 return response.choices[0].message.content
 
             # Streaming request, For streaming, update estimated token count before making the request
             self.update_token_count(input_tokens)
 
-            response = await self.client.chat.completions.create(**params, stream=True)
+            response = await self._create_completion(
+                input_tokens, **params, stream=True
+            )
 
             collected_messages = []
             completion_text = ""
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
+            try:
+                async for chunk in response:
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    completion_text += chunk_message
+                    print(chunk_message, end="", flush=True)
+            finally:
+                await response.aclose()
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
@@ -455,8 +629,10 @@ class LLM:
             logger.info(
                 f"Estimated completion tokens for streaming response: {completion_tokens}"
             )
-            self.total_completion_tokens += completion_tokens
+            self.update_token_count(0, completion_tokens)
 
+            if cache_key:
+                self.response_cache.set(cache_key, full_response)
             return full_response
 
         except TokenLimitExceeded:
@@ -588,25 +764,43 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
+            cache_key = self._response_cache_key("ask_with_images", params)
+            if cache_key:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Response cache hit for ask_with_images")
+                    return cached
+
             # Handle non-streaming request
             if not stream:
-                response = await self.client.chat.completions.create(**params)
+                response = await self._create_completion(input_tokens, **params)
 
                 if not response.choices or not response.choices[0].message.content:
                     raise ValueError("Empty or invalid response from LLM")
 
-                self.update_token_count(response.usage.prompt_tokens)
+                self.update_token_count(
+                    response.usage.prompt_tokens, response.usage.completion_tokens
+                )
+                if cache_key:
+                    self.response_cache.set(
+                        cache_key, response.choices[0].message.content
+                    )
                 return response.choices[0].message.content
 
             # Handle streaming request
             self.update_token_count(input_tokens)
-            response = await self.client.chat.completions.create(**params)
+            response = await self._create_completion(input_tokens, **params)
 
             collected_messages = []
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
+            completion_text = ""
+            try:
+                async for chunk in response:
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    completion_text += chunk_message
+                    print(chunk_message, end="", flush=True)
+            finally:
+                await response.aclose()
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
@@ -614,6 +808,15 @@ class LLM:
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
 
+            # estimate completion tokens for streaming response
+            completion_tokens = self.count_tokens(completion_text)
+            logger.info(
+                f"Estimated completion tokens for streaming response: {completion_tokens}"
+            )
+            self.update_token_count(0, completion_tokens)
+
+            if cache_key:
+                self.response_cache.set(cache_key, full_response)
             return full_response
 
         except TokenLimitExceeded:
@@ -637,9 +840,9 @@ class LLM:
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
-        retry=retry_if_exception_type(
-            (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
+        retry=retry_if_exception_type((OpenAIError, Exception, ValueError))
+        # Tools started from a failed stream must not be started again
+        & retry_if_not_exception_type(StreamedToolCallError),
     )
     async def ask_tool(
         self,
@@ -649,6 +852,9 @@ class LLM:
         tools: Optional[List[dict]] = None,
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
         temperature: Optional[float] = None,
+        stream: bool = False,
+        on_tool_call: Optional[Callable[[ChatCompletionMessageToolCall], None]] = None,
+        on_stream_start: Optional[Callable[[], None]] = None,
         **kwargs,
     ) -> ChatCompletionMessage | None:
         """
@@ -661,6 +867,12 @@ class LLM:
             tools: List of tools to use
             tool_choice: Tool choice strategy
             temperature: Sampling temperature for the response
+            stream: Whether to stream the response and assemble tool calls incrementally
+            on_tool_call: Optional callback fired as soon as each streamed tool
+                call's arguments are complete. Not fired for cached or
+                non-streamed responses, and once fired the request is not retried
+            on_stream_start: Optional callback fired before each streaming attempt,
+                so callers can drop state left by a failed attempt
             **kwargs: Additional completion arguments
 
         Returns:
@@ -668,6 +880,7 @@ class LLM:
 
         Raises:
             TokenLimitExceeded: If token limits are exceeded
+            StreamedToolCallError: If a stream fails after on_tool_call was fired
             ValueError: If tools, tool_choice, or messages are invalid
             OpenAIError: If API call fails after retries
             Exception: For unexpected errors
@@ -691,10 +904,7 @@ class LLM:
             input_tokens = self.count_message_tokens(messages)
 
             # If there are tools, calculate token count for tool descriptions
-            tools_tokens = 0
-            if tools:
-                for tool in tools:
-                    tools_tokens += self.count_tokens(str(tool))
+            tools_tokens = self.count_tools_tokens(tools)
 
             input_tokens += tools_tokens
 
@@ -728,9 +938,27 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
-            params["stream"] = False  # Always use non-streaming for tool requests
-            response: ChatCompletion = await self.client.chat.completions.create(
-                **params
+            cache_key = self._response_cache_key("ask_tool", params)
+            if cache_key:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Response cache hit for ask_tool")
+                    return ChatCompletionMessage.model_validate(cached)
+
+            # Bedrock client does not yield incremental chunks, keep it non-streaming
+            if stream and self.api_type != "aws":
+                if on_stream_start:
+                    on_stream_start()
+                message = await self._ask_tool_stream(
+                    params, input_tokens, on_tool_call
+                )
+                if cache_key:
+                    self.response_cache.set(cache_key, message.model_dump(mode="json"))
+                return message
+
+            params["stream"] = False
+            response: ChatCompletion = await self._create_completion(
+                input_tokens, **params
             )
 
             # Check if response is valid
@@ -744,7 +972,12 @@ class LLM:
                 response.usage.prompt_tokens, response.usage.completion_tokens
             )
 
-            return response.choices[0].message
+            message = response.choices[0].message
+            # Bedrock returns its own response objects, only cache OpenAI messages
+            if cache_key and isinstance(message, ChatCompletionMessage):
+                self.response_cache.set(cache_key, message.model_dump(mode="json"))
+
+            return message
 
         except TokenLimitExceeded:
             # Re-raise token limit errors without logging
@@ -764,3 +997,123 @@ class LLM:
         except Exception as e:
             logger.error(f"Unexpected error in ask_tool: {e}")
             raise
+
+    @staticmethod
+    def _is_complete_arguments(arguments: str) -> bool:
+        """Check whether streamed tool arguments form a complete JSON object"""
+        if not arguments.rstrip().endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads(arguments), dict)
+        except json.JSONDecodeError:
+            return False
+
+    async def _ask_tool_stream(
+        self,
+        params: dict,
+        input_tokens: int,
+        on_tool_call: Optional[Callable[[ChatCompletionMessageToolCall], None]] = None,
+    ) -> ChatCompletionMessage:
+        """
+        Stream a tool request and assemble the deltas into a single message.
+
+        Tool call deltas arrive ordered by index. A call is complete once its
+        arguments parse as a JSON object, the stream moves on to a later index,
+        or the stream ends, at which point `on_tool_call` is fired with the
+        finished call.
+
+        Args:
+            params: Completion request parameters
+            input_tokens: Estimated input tokens of the request
+            on_tool_call: Optional callback for each completed tool call
+
+        Returns:
+            ChatCompletionMessage: The assembled response, same shape as non-streaming
+        """
+        # For streaming, update estimated token count before making the request
+        self.update_token_count(input_tokens)
+
+        params["stream"] = True
+        response = await self._create_completion(input_tokens, **params)
+
+        content_parts: List[str] = []
+        partial_calls: Dict[int, dict] = {}
+        completed: Dict[int, ChatCompletionMessageToolCall] = {}
+        current_index: Optional[int] = None
+
+        def complete(index: int) -> None:
+            call = partial_calls[index]
+            tool_call = ChatCompletionMessageToolCall(
+                id=call["id"],
+                type="function",
+                function=Function(name=call["name"], arguments=call["arguments"]),
+            )
+            completed[index] = tool_call
+            if on_tool_call:
+                on_tool_call(tool_call)
+
+        try:
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+
+                for tool_call_delta in delta.tool_calls or []:
+                    index = tool_call_delta.index
+                    if current_index is not None and index != current_index:
+                        if current_index not in completed:
+                            complete(current_index)
+                    current_index = index
+
+                    call = partial_calls.setdefault(
+                        index, {"id": "", "name": "", "arguments": ""}
+                    )
+                    if tool_call_delta.id:
+                        call["id"] = tool_call_delta.id
+                    function = tool_call_delta.function
+                    if function:
+                        if function.name and not call["name"]:
+                            call["name"] = function.name
+                        if function.arguments:
+                            call["arguments"] += function.arguments
+                            if (
+                                index not in completed
+                                and call["id"]
+                                and self._is_complete_arguments(call["arguments"])
+                            ):
+                                complete(index)
+
+            for index in sorted(partial_calls):
+                if index not in completed:
+                    complete(index)
+        except Exception as e:
+            # The caller has already started tools for the completed calls
+            if completed and on_tool_call:
+                raise StreamedToolCallError(
+                    f"Stream failed after {len(completed)} tool call(s) were started: {e}"
+                ) from e
+            raise
+        finally:
+            # Free the rate limiter slot now if on_tool_call raised or we were
+            # cancelled mid-stream
+            await response.aclose()
+
+        content = "".join(content_parts)
+        tool_calls = [completed[index] for index in sorted(completed)]
+
+        # estimate completion tokens for streaming response
+        completion_tokens = self.count_tokens(content) + sum(
+            self.count_tokens(call.function.name)
+            + self.count_tokens(call.function.arguments)
+            for call in tool_calls
+        )
+        logger.info(
+            f"Estimated completion tokens for streaming response: {completion_tokens}"
+        )
+        self.update_token_count(0, completion_tokens)
+
+        return ChatCompletionMessage(
+            role="assistant", content=content or None, tool_calls=tool_calls or None
+        )
@@ -0,0 +1,9 @@
+SUMMARY_SYSTEM_PROMPT = """You compress the earlier part of an agent's conversation so the agent can continue its task with less context.
+Keep the task, decisions made, facts and results discovered, file paths, URLs, identifiers and unresolved problems.
+Drop pleasantries, repeated attempts and raw tool output that has already been interpreted."""
+
+SUMMARY_PROMPT = """Summarize the following conversation span concisely:
+
+{transcript}"""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
@@ -0,0 +1,185 @@
+"""Async token-bucket rate limiting for LLM clients."""
+import asyncio
+import re
+import time
+from typing import Mapping, Optional
+
+from app.logger import logger
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate limit reset values such as "1s", "6m0s", "20ms" or "0.5" into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """A token bucket refilled continuously over a one minute window."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be consumed (amount is capped at capacity)"""
+        self.refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount: float) -> None:
+        """Consume tokens; the balance may go negative to account for overruns"""
+        self.refill()
+        self.tokens -= amount
+
+    def set_capacity(self, per_minute: float) -> None:
+        self.refill()
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+
+class RateLimiter:
+    """Request/token rate limiter and concurrency governor for one LLM config.
+
+    Requests are admitted once the requests-per-minute and tokens-per-minute
+    buckets can cover them and an in-flight slot is free. Provider
+    `x-ratelimit-*` headers tighten the buckets, and a 429 pauses admission
+    until the provider's reset time.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        )
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_primitives(self) -> None:
+        """(Re)create asyncio primitives for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = (
+                asyncio.Semaphore(self.max_concurrency)
+                if self.max_concurrency
+                else None
+            )
+            self.in_flight = 0
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = max(0.0, self.paused_until - time.monotonic())
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.wait_time(1))
+        if self.token_bucket:
+            wait = max(wait, self.token_bucket.wait_time(tokens))
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until a request estimated at `tokens` input tokens may be sent"""
+        self._ensure_primitives()
+        if self._slots:
+            await self._slots.acquire()
+        try:
+            # Serialize admission so waiters are served in arrival order
+            async with self._lock:
+                while (wait := self._wait_time(tokens)) > 0:
+                    logger.debug(f"Rate limiter delaying request by {wait:.2f}s")
+                    await asyncio.sleep(wait)
+                if self.request_bucket:
+                    self.request_bucket.consume(1)
+                if self.token_bucket:
+                    self.token_bucket.consume(tokens)
+        except BaseException:
+            if self._slots:
+                self._slots.release()
+            raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        """Free the in-flight slot taken by `acquire`"""
+        self.in_flight = max(0, self.in_flight - 1)
+        if self._slots:
+            self._slots.release()
+
+    def record_tokens(self, tokens: int) -> None:
+        """Charge tokens that were not known at admission time (e.g. completion)"""
+        if self.token_bucket and tokens > 0:
+            self.token_bucket.consume(tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting requests for `seconds`"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limiter paused for {seconds:.2f}s")
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Adapt buckets to the provider's x-ratelimit-* response headers"""
+        for kind, bucket_attr in (
+            ("requests", "request_bucket"),
+            ("tokens", "token_bucket"),
+        ):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            try:
+                limit = int(limit) if limit is not None else None
+                remaining = int(remaining) if remaining is not None else None
+            except ValueError:
+                continue
+
+            bucket: Optional[TokenBucket] = getattr(self, bucket_attr)
+            if limit:
+                if bucket is None:
+                    bucket = TokenBucket(limit)
+                    setattr(self, bucket_attr, bucket)
+                elif limit < bucket.capacity:
+                    bucket.set_capacity(limit)
+            if bucket is not None and remaining is not None:
+                bucket.refill()
+                bucket.tokens = min(bucket.tokens, float(remaining))
+            if remaining == 0 and reset:
+                self.pause(reset)
+
+    def stats(self) -> dict:
+        """Return the current limiter state"""
+        return {
+            "in_flight": self.in_flight,
+            "request_tokens": (
+                self.request_bucket.tokens if self.request_bucket else None
+            ),
+            "token_tokens": self.token_bucket.tokens if self.token_bucket else None,
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+        }
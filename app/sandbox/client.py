@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional, Protocol
 
-from app.config import SandboxSettings
+from app.config import SandboxSettings, config
+from app.sandbox.core.pool import SandboxPool
 from app.sandbox.core.sandbox import DockerSandbox
+from app.sandbox.core.terminal import ExecResult
 
 
 class SandboxFileOperations(Protocol):
@@ -62,6 +64,12 @@ class BaseSandboxClient(ABC):
     async def run_command(self, command: str, timeout: Optional[int] = None) -> str:
         """Executes command."""
 
+    @abstractmethod
+    async def exec_command(
+        self, command: str, timeout: Optional[int] = None
+    ) -> ExecResult:
+        """Executes command and returns exit code, stdout and stderr."""
+
     @abstractmethod
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container."""
@@ -78,17 +86,31 @@ class BaseSandboxClient(ABC):
     async def write_file(self, path: str, content: str) -> None:
         """Writes file."""
 
+    @abstractmethod
+    async def warm(self) -> None:
+        """Pre-starts sandboxes ahead of the first `create`."""
+
     @abstractmethod
     async def cleanup(self) -> None:
         """Cleans up resources."""
 
+    @abstractmethod
+    async def shutdown(self) -> None:
+        """Cleans up resources, including any shared between agents."""
+
 
 class LocalSandboxClient(BaseSandboxClient):
     """Local sandbox client implementation."""
 
-    def __init__(self):
-        """Initializes local sandbox client."""
+    def __init__(self, pool: Optional[SandboxPool] = None):
+        """Initializes local sandbox client.
+
+        Args:
+            pool: Optional warm pool to take sandboxes from.
+        """
         self.sandbox: Optional[DockerSandbox] = None
+        self.pool = pool
+        self._pooled = False
 
     async def create(
         self,
@@ -104,6 +126,12 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox creation fails.
         """
+        # Sandboxes with volume bindings are tied to the caller, never pooled
+        if self.pool and not volume_bindings:
+            self.sandbox = await self.pool.acquire(config)
+            self._pooled = True
+            return
+
         self.sandbox = DockerSandbox(config, volume_bindings)
         await self.sandbox.create()
 
@@ -124,6 +152,25 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         return await self.sandbox.run_command(command, timeout)
 
+    async def exec_command(
+        self, command: str, timeout: Optional[int] = None
+    ) -> ExecResult:
+        """Runs command in sandbox and returns a structured result.
+
+        Args:
+            command: Command to execute.
+            timeout: Execution timeout in seconds.
+
+        Returns:
+            ExecResult with exit code, stdout, stderr and duration.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        return await self.sandbox.exec_command(command, timeout)
+
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container to local.
 
@@ -182,20 +229,52 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         await self.sandbox.write_file(path, content)
 
+    async def warm(self) -> None:
+        """Fills the pool up to `min_size` so the first `create` is a hit.
+
+        Does nothing without a pool or when `min_size` is 0.
+        """
+        if self.pool and self.pool.min_size > 0:
+            await self.pool.warm()
+
     async def cleanup(self) -> None:
-        """Cleans up resources."""
+        """Cleans up resources, returning pooled sandboxes to the pool."""
         if self.sandbox:
-            await self.sandbox.cleanup()
+            if self._pooled:
+                await self.pool.release(self.sandbox)
+            else:
+                await self.sandbox.cleanup()
             self.sandbox = None
+            self._pooled = False
 
+    async def shutdown(self) -> None:
+        """Cleans up the sandbox and destroys all pooled sandboxes.
 
-def create_sandbox_client() -> LocalSandboxClient:
+        Call this once when the process is done with sandboxes; pooled
+        containers otherwise keep running after it exits.
+        """
+        await self.cleanup()
+        if self.pool:
+            await self.pool.cleanup()
+
+
+def create_sandbox_client(pool: Optional[SandboxPool] = None) -> LocalSandboxClient:
     """Creates a sandbox client.
 
+    Args:
+        pool: Optional warm pool. Defaults to one built from the sandbox
+            config when `pool_max_size` is set.
+
     Returns:
         LocalSandboxClient: Sandbox client instance.
     """
-    return LocalSandboxClient()
+    sandbox_config = config.sandbox
+    if pool is None and sandbox_config and sandbox_config.pool_max_size > 0:
+        pool = SandboxPool(
+            min_size=sandbox_config.pool_min_size,
+            max_size=sandbox_config.pool_max_size,
+        )
+    return LocalSandboxClient(pool)
 
 
 SANDBOX_CLIENT = create_sandbox_client()
@@ -8,6 +8,7 @@ from docker.errors import APIError, ImageNotFound
 
 from app.config import SandboxSettings
 from app.logger import logger
+from app.sandbox.core.pool import SandboxPool
 from app.sandbox.core.sandbox import DockerSandbox
 
 
@@ -22,6 +23,7 @@ class SandboxManager:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        pool: Optional warm pool that sandboxes are taken from and returned to.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
     """
@@ -31,6 +33,7 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        pool: Optional[SandboxPool] = None,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +41,12 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            pool: Optional warm pool, owned and cleaned up by the manager.
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.pool = pool
 
         # Docker client
         self._client = docker.from_env()
@@ -54,6 +59,7 @@ class SandboxManager:
         self._locks: Dict[str, asyncio.Lock] = {}
         self._global_lock = asyncio.Lock()
         self._active_operations: Set[str] = set()
+        self._pooled: Set[str] = set()
 
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -140,8 +146,13 @@ class SandboxManager:
 
             sandbox_id = str(uuid.uuid4())
             try:
-                sandbox = DockerSandbox(config, volume_bindings)
-                await sandbox.create()
+                # Sandboxes with volume bindings are never taken from the pool
+                if self.pool and not volume_bindings:
+                    sandbox = await self.pool.acquire(config)
+                    self._pooled.add(sandbox_id)
+                else:
+                    sandbox = DockerSandbox(config, volume_bindings)
+                    await sandbox.create()
 
                 self._sandboxes[sandbox_id] = sandbox
                 self._last_used[sandbox_id] = asyncio.get_event_loop().time()
@@ -238,6 +249,10 @@ class SandboxManager:
         self._last_used.clear()
         self._locks.clear()
         self._active_operations.clear()
+        self._pooled.clear()
+
+        if self.pool:
+            await self.pool.cleanup()
 
         logger.info("Manager cleanup completed")
 
@@ -264,13 +279,17 @@ class SandboxManager:
             # Get reference to sandbox object
             sandbox = self._sandboxes.get(sandbox_id)
             if sandbox:
-                await sandbox.cleanup()
+                if sandbox_id in self._pooled and not self._is_shutting_down:
+                    await self.pool.release(sandbox)
+                else:
+                    await sandbox.cleanup()
 
                 # Remove sandbox record from manager
                 async with self._global_lock:
                     self._sandboxes.pop(sandbox_id, None)
                     self._last_used.pop(sandbox_id, None)
                     self._locks.pop(sandbox_id, None)
+                    self._pooled.discard(sandbox_id)
                     logger.info(f"Deleted sandbox {sandbox_id}")
         except Exception as e:
             logger.error(f"Error during cleanup of sandbox {sandbox_id}: {e}")
@@ -303,7 +322,7 @@ class SandboxManager:
         Returns:
             Dict: Statistics information.
         """
-        return {
+        stats = {
             "total_sandboxes": len(self._sandboxes),
             "active_operations": len(self._active_operations),
             "max_sandboxes": self.max_sandboxes,
@@ -311,3 +330,6 @@ class SandboxManager:
             "cleanup_interval": self.cleanup_interval,
             "is_shutting_down": self._is_shutting_down,
         }
+        if self.pool:
+            stats.update(self.pool.get_stats())
+        return stats
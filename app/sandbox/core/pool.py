@@ -0,0 +1,226 @@
+import asyncio
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from app.config import SandboxSettings
+from app.logger import logger
+from app.sandbox.core.sandbox import DockerSandbox
+
+
+class SandboxPool:
+    """Pool of pre-started Docker sandboxes.
+
+    Keeps started containers with open terminal sessions per SandboxSettings
+    profile so that acquiring a sandbox does not pay container creation,
+    startup and terminal initialization. Released sandboxes are reset by
+    restarting their shell and wiping their working directory and /tmp, then
+    returned to the pool. Other changes made in the container, such as
+    installed packages or leftover background processes, carry over to the
+    next user, so pooled sandboxes are less isolated than fresh ones.
+
+    Attributes:
+        min_size: Number of idle sandboxes kept warm per profile.
+        max_size: Maximum number of idle sandboxes retained per profile.
+    """
+
+    # Settings that configure the pool itself rather than the container
+    _POOL_FIELDS = {"pool_min_size", "pool_max_size"}
+
+    def __init__(self, min_size: int = 1, max_size: int = 4):
+        """Initializes the sandbox pool.
+
+        Args:
+            min_size: Idle sandboxes to keep warm per profile.
+            max_size: Maximum idle sandboxes retained per profile.
+        """
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+
+        self._idle: Dict[str, Deque[DockerSandbox]] = defaultdict(deque)
+        self._configs: Dict[str, SandboxSettings] = {}
+        self._creating: Dict[str, int] = defaultdict(int)
+        self._refill_tasks: Dict[str, asyncio.Task] = {}
+        self._is_closing = False
+
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._total_wait = 0.0
+        self._recycled = 0
+        self._discarded = 0
+
+    @classmethod
+    def profile_key(cls, config: SandboxSettings) -> str:
+        """Builds the pool key for a sandbox configuration.
+
+        Args:
+            config: Sandbox configuration.
+
+        Returns:
+            str: Key identifying sandboxes that are interchangeable.
+        """
+        return config.model_dump_json(exclude=cls._POOL_FIELDS)
+
+    async def acquire(self, config: Optional[SandboxSettings] = None) -> DockerSandbox:
+        """Takes a started sandbox from the pool, creating one if none is idle.
+
+        Args:
+            config: Sandbox configuration.
+
+        Returns:
+            DockerSandbox: Started sandbox with an initialized terminal.
+
+        Raises:
+            RuntimeError: If sandbox creation fails.
+        """
+        config = config or SandboxSettings()
+        key = self.profile_key(config)
+        self._configs[key] = config
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        idle = self._idle[key]
+        if idle:
+            self._hits += 1
+            sandbox = idle.popleft()
+        else:
+            self._misses += 1
+            sandbox = await DockerSandbox(config).create()
+        self._total_wait += loop.time() - start
+
+        self._schedule_refill(key)
+        return sandbox
+
+    async def release(self, sandbox: DockerSandbox) -> None:
+        """Resets a sandbox and returns it to the pool, or destroys it.
+
+        Args:
+            sandbox: Sandbox previously obtained from `acquire`.
+        """
+        key = self.profile_key(sandbox.config)
+        idle = self._idle[key]
+
+        if (
+            self._is_closing
+            or len(idle) >= self.max_size
+            or not await self._reset(sandbox)
+        ):
+            self._discarded += 1
+            await sandbox.cleanup()
+            return
+
+        self._recycled += 1
+        idle.append(sandbox)
+
+    async def _reset(self, sandbox: DockerSandbox) -> bool:
+        """Restarts the shell and wipes the working directory and /tmp.
+
+        A new shell session drops the previous user's cwd, exported
+        variables, functions and aliases.
+
+        Args:
+            sandbox: Sandbox to reset.
+
+        Returns:
+            bool: Whether the sandbox can be reused.
+        """
+        if not sandbox.terminal or not sandbox.terminal.session:
+            return False
+
+        try:
+            await sandbox.terminal.close()
+            await sandbox.terminal.init()
+            result = await sandbox.exec_command(
+                f"find {sandbox.config.work_dir} /tmp -mindepth 1 -delete", timeout=30
+            )
+            if result.exit_code != 0:
+                logger.warning(f"Failed to wipe sandbox: {result.output}")
+                return False
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset sandbox for reuse: {e}")
+            return False
+
+    def _schedule_refill(self, key: str) -> None:
+        """Starts a background refill for a profile if one is not running."""
+        loop = asyncio.get_running_loop()
+        task = self._refill_tasks.get(key)
+        if task and not task.done() and task.get_loop() is loop:
+            return
+        self._refill_tasks[key] = loop.create_task(self._refill(key))
+
+    async def _refill(self, key: str) -> None:
+        """Creates sandboxes until the profile has `min_size` idle ones."""
+        config = self._configs[key]
+        while (
+            not self._is_closing
+            and len(self._idle[key]) + self._creating[key] < self.min_size
+        ):
+            self._creating[key] += 1
+            sandbox = DockerSandbox(config)
+            try:
+                await sandbox.create()
+            except asyncio.CancelledError:
+                # Cancelled by cleanup mid-creation; don't leak the container
+                await sandbox.cleanup()
+                raise
+            except Exception as e:
+                logger.error(f"Failed to pre-warm sandbox: {e}")
+                return
+            finally:
+                self._creating[key] -= 1
+
+            if self._is_closing:
+                await sandbox.cleanup()
+                return
+            self._idle[key].append(sandbox)
+
+    async def warm(self, config: Optional[SandboxSettings] = None) -> None:
+        """Fills the pool for a profile up to `min_size` and waits for it.
+
+        Args:
+            config: Sandbox configuration.
+        """
+        config = config or SandboxSettings()
+        key = self.profile_key(config)
+        self._configs[key] = config
+        self._schedule_refill(key)
+        await self._refill_tasks[key]
+
+    async def cleanup(self) -> None:
+        """Stops background refills and destroys all idle sandboxes."""
+        self._is_closing = True
+
+        loop = asyncio.get_running_loop()
+        tasks = [t for t in self._refill_tasks.values() if t.get_loop() is loop]
+        self._refill_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        # Let cancelled refills remove the containers they were creating
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        idle = [sandbox for queue in self._idle.values() for sandbox in queue]
+        self._idle.clear()
+        if idle:
+            await asyncio.gather(
+                *(sandbox.cleanup() for sandbox in idle), return_exceptions=True
+            )
+
+    def get_stats(self) -> Dict:
+        """Gets pool statistics.
+
+        Returns:
+            Dict: Statistics information.
+        """
+        acquisitions = self._hits + self._misses
+        return {
+            "pool_idle": sum(len(queue) for queue in self._idle.values()),
+            "pool_min_size": self.min_size,
+            "pool_max_size": self.max_size,
+            "pool_hits": self._hits,
+            "pool_misses": self._misses,
+            "pool_hit_rate": self._hits / acquisitions if acquisitions else 0.0,
+            "pool_avg_wait": self._total_wait / acquisitions if acquisitions else 0.0,
+            "pool_recycled": self._recycled,
+            "pool_discarded": self._discarded,
+        }
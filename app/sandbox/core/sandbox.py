@@ -12,7 +12,7 @@ from docker.models.containers import Container
 
 from app.config import SandboxSettings
 from app.sandbox.core.exceptions import SandboxTimeoutError
-from app.sandbox.core.terminal import AsyncDockerizedTerminal
+from app.sandbox.core.terminal import AsyncDockerizedTerminal, ExecResult
 
 
 class DockerSandbox:
@@ -163,6 +163,32 @@ class DockerSandbox:
                 f"Command execution timed out after {timeout or self.config.timeout} seconds"
             )
 
+    async def exec_command(self, cmd: str, timeout: Optional[int] = None) -> ExecResult:
+        """Runs a command in the sandbox and returns a structured result.
+
+        Args:
+            cmd: Command to execute.
+            timeout: Timeout in seconds.
+
+        Returns:
+            ExecResult with exit code, stdout, stderr and duration.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or command execution fails.
+            TimeoutError: If command execution times out.
+        """
+        if not self.terminal:
+            raise RuntimeError("Sandbox not initialized")
+
+        try:
+            return await self.terminal.exec_command(
+                cmd, timeout=timeout or self.config.timeout
+            )
+        except TimeoutError:
+            raise SandboxTimeoutError(
+                f"Command execution timed out after {timeout or self.config.timeout} seconds"
+            )
+
     async def read_file(self, path: str) -> str:
         """Reads a file from the container.
 
@@ -364,9 +390,8 @@ class DockerSandbox:
                 )
 
                 # Verify file was created successfully
-                try:
-                    await self.run_command(f"test -e {resolved_dst}")
-                except Exception:
+                result = await self.exec_command(f"test -e {resolved_dst}")
+                if result.exit_code != 0:
                     raise RuntimeError(f"Failed to verify file creation: {dst_path}")
 
         except FileNotFoundError:
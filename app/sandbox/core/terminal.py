@@ -8,15 +8,35 @@ allowing interactive command execution with timeout control.
 import asyncio
 import re
 import socket
+import uuid
 from typing import Dict, Optional, Tuple, Union
 
 import docker
 from docker import APIClient
 from docker.errors import APIError
 from docker.models.containers import Container
+from pydantic import BaseModel, Field
+
+
+class ExecResult(BaseModel):
+    """Result of a command executed in a terminal session."""
+
+    exit_code: int = Field(..., description="Exit status of the command")
+    stdout: str = Field("", description="Standard output")
+    stderr: str = Field("", description="Standard error")
+    duration: float = Field(0.0, description="Execution time in seconds")
+
+    @property
+    def output(self) -> str:
+        """Combined stdout and stderr, as an interactive terminal shows them."""
+        parts = [part.rstrip("\n") for part in (self.stdout, self.stderr) if part]
+        return "\n".join(parts)
 
 
 class DockerSession:
+    # Prefix of the per-command sentinels framing output in the terminal
+    SENTINEL = "__OPENMANUS_"
+
     def __init__(self, container_id: str) -> None:
         """Initializes a Docker session.
 
@@ -114,6 +134,17 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
+    async def _recv(self) -> bytes:
+        """Waits until the socket is readable and receives available data.
+
+        Returns:
+            Received bytes, empty if the connection was closed.
+
+        Raises:
+            socket.error: If socket communication fails.
+        """
+        return await asyncio.get_running_loop().sock_recv(self.socket, 4096)
+
     async def _read_until_prompt(self) -> str:
         """Reads output until prompt is found.
 
@@ -122,18 +153,14 @@ class DockerSession:
 
         Raises:
             socket.error: If socket communication fails.
+            ConnectionError: If the session closes before the prompt appears.
         """
-        buffer = b""
+        buffer = bytearray()
         while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
+            chunk = await self._recv()
+            if not chunk:
+                raise ConnectionError("Session closed before prompt was received")
+            buffer += chunk
         return buffer.decode("utf-8")
 
     async def execute(self, command: str, timeout: Optional[int] = None) -> str:
@@ -150,71 +177,119 @@ class DockerSession:
             RuntimeError: If session not initialized or execution fails.
             TimeoutError: If command execution exceeds timeout.
         """
-        if not self.socket:
-            raise RuntimeError("Session not initialized")
-
-        try:
-            # Sanitize command to prevent shell injection
-            sanitized_command = self._sanitize_command(command)
-            full_command = f"{sanitized_command}\necho $?\n"
-            self.socket.sendall(full_command.encode())
-
-            async def read_output() -> str:
-                buffer = b""
-                result_lines = []
-                command_sent = False
-
-                while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
+        result = await self.exec_command(command, timeout)
+        return result.output.strip()
 
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
+    async def exec_command(
+        self, command: str, timeout: Optional[int] = None
+    ) -> ExecResult:
+        """Executes a command and returns its exit code, stdout and stderr.
 
-                        buffer = lines[-1]
-                        lines = lines[:-1]
+        The command runs in the session shell, so state such as the working
+        directory persists. Its output is framed by sentinels unique to this
+        call, and stderr is redirected to a temporary file that is printed
+        after the exit code.
 
-                        for line in lines:
-                            line = line.rstrip(b"\r")
+        Args:
+            command: Shell command to execute.
+            timeout: Maximum execution time in seconds.
 
-                            if not command_sent:
-                                command_sent = True
-                                continue
+        Returns:
+            ExecResult with exit code, separated output and duration.
 
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
+        Raises:
+            RuntimeError: If session not initialized or execution fails.
+            TimeoutError: If command execution exceeds timeout.
+        """
+        if not self.socket:
+            raise RuntimeError("Session not initialized")
 
-                            if line.strip():
-                                result_lines.append(line)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            # Sanitize command to prevent shell injection
+            sanitized_command = self._sanitize_command(command)
 
-                        if buffer.endswith(b"$ "):
-                            break
+            token = f"{self.SENTINEL}{uuid.uuid4().hex}"
+            stderr_file = f"/tmp/.stderr_{token}"
+            # Sentinels are assembled by printf, so the echoed input line
+            # never contains them verbatim
+            parts = f"'{token[:8]}' '{token[8:]}'"
+            full_command = (
+                f"printf '%s%s_START\\n' {parts}; {{ {sanitized_command}\n}} "
+                f"2>{stderr_file}; printf '\\n%s%s_EXIT:%d\\n' {parts} $?; "
+                f"cat {stderr_file} 2>/dev/null; rm -f {stderr_file}; "
+                f"printf '\\n%s%s_END\\n' {parts}\n"
+            )
+            self.socket.sendall(full_command.encode())
 
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
+            async def read_output() -> bytes:
+                end_marker = f"{token}_END".encode()
+                buffer = bytearray()
+                end = -1
+                scanned = 0
 
-                output = b"\n".join(result_lines).decode("utf-8")
-                output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
+                while end == -1 or b"$ " not in buffer[end:]:
+                    chunk = await self._recv()
+                    if not chunk:
+                        raise ConnectionError("Session closed during execution")
+                    buffer += chunk
+                    if end == -1:
+                        end = buffer.find(end_marker, max(0, scanned - len(end_marker)))
+                        scanned = len(buffer)
 
-                return output
+                return bytes(buffer[:end])
 
-            if timeout:
-                result = await asyncio.wait_for(read_output(), timeout)
-            else:
-                result = await read_output()
+            try:
+                if timeout:
+                    raw = await asyncio.wait_for(read_output(), timeout)
+                else:
+                    raw = await read_output()
+            except asyncio.TimeoutError:
+                # Interrupt the command so the session stays usable; its
+                # leftover output is skipped by the next call's sentinels
+                self.socket.sendall(b"\x03")
+                raise
 
-            return result.strip()
+            return self._parse_output(raw, token, loop.time() - started)
 
         except asyncio.TimeoutError:
             raise TimeoutError(f"Command execution timed out after {timeout} seconds")
         except Exception as e:
             raise RuntimeError(f"Failed to execute command: {e}")
 
+    @staticmethod
+    def _parse_output(raw: bytes, token: str, duration: float) -> ExecResult:
+        """Splits sentinel-framed terminal output into an ExecResult.
+
+        Args:
+            raw: Terminal output up to the end sentinel.
+            token: Sentinel token of the command.
+            duration: Execution time in seconds.
+
+        Returns:
+            Parsed ExecResult.
+
+        Raises:
+            ValueError: If the sentinels are missing.
+        """
+        text = raw.decode("utf-8", errors="replace").replace("\r\n", "\n")
+        start_marker = f"{token}_START\n"
+        start = text.find(start_marker)
+        status = re.search(rf"\n{token}_EXIT:(-?\d+)\n", text)
+        if start == -1 or not status:
+            raise ValueError("Malformed command output")
+
+        # The newline printed before the exit sentinel is part of the match;
+        # drop the one printed before the end sentinel
+        stderr = text[status.end() :]
+        return ExecResult(
+            exit_code=int(status.group(1)),
+            stdout=text[start + len(start_marker) : status.start()],
+            stderr=stderr[:-1] if stderr.endswith("\n") else stderr,
+            duration=duration,
+        )
+
     def _sanitize_command(self, command: str) -> str:
         """Sanitizes the command string to prevent shell injection.
 
@@ -331,6 +406,26 @@ class AsyncDockerizedTerminal:
 
         return await self.session.execute(cmd, timeout=timeout or self.default_timeout)
 
+    async def exec_command(self, cmd: str, timeout: Optional[int] = None) -> ExecResult:
+        """Runs a command in the container and returns a structured result.
+
+        Args:
+            cmd: Shell command to execute.
+            timeout: Maximum execution time in seconds.
+
+        Returns:
+            ExecResult with exit code, stdout, stderr and duration.
+
+        Raises:
+            RuntimeError: If terminal not initialized.
+        """
+        if not self.session:
+            raise RuntimeError("Terminal not initialized")
+
+        return await self.session.exec_command(
+            cmd, timeout=timeout or self.default_timeout
+        )
+
     async def close(self) -> None:
         """Closes the terminal session."""
         if self.session:
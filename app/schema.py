@@ -1,7 +1,36 @@
+import asyncio
+import json
+from collections import Counter, deque
+from collections.abc import MutableSequence
 from enum import Enum
-from typing import Any, List, Literal, Optional, Union
-
-from pydantic import BaseModel, Field
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import (
+    BaseModel,
+    Field,
+    field_serializer,
+    field_validator,
+    model_validator,
+)
+
+from app.logger import logger
+from app.prompt.memory import SUMMARY_PREFIX, SUMMARY_PROMPT, SUMMARY_SYSTEM_PROMPT
+
+
+if TYPE_CHECKING:
+    from app.llm import LLM
 
 
 class Role(str, Enum):
@@ -156,23 +185,251 @@ class Message(BaseModel):
         )
 
 
+def _normalize_arguments(arguments: str) -> str:
+    """Canonical form of tool call arguments, ignoring whitespace and key order"""
+    try:
+        return json.dumps(json.loads(arguments), sort_keys=True)
+    except (TypeError, ValueError):
+        return arguments
+
+
+def message_fingerprints(message: Message) -> List[tuple]:
+    """Keys identifying repeated assistant output: its content and its tool calls"""
+    if message.role != Role.ASSISTANT:
+        return []
+    keys = []
+    if message.content:
+        keys.append(("content", message.content))
+    tool_calls_key = tool_calls_fingerprint(message)
+    if tool_calls_key is not None:
+        keys.append(tool_calls_key)
+    return keys
+
+
+def tool_calls_fingerprint(message: Message) -> Optional[tuple]:
+    """Key identifying an assistant message's tool calls and their arguments"""
+    if message.role != Role.ASSISTANT or not message.tool_calls:
+        return None
+    return (
+        "tool_calls",
+        tuple(
+            (call.function.name, _normalize_arguments(call.function.arguments))
+            for call in message.tool_calls
+        ),
+    )
+
+
+class MessageBuffer(MutableSequence):
+    """Bounded sequence of messages with O(1) append and eviction.
+
+    Backed by a deque that drops the oldest messages once `maxlen` is
+    reached. Supports the list operations used on agent memory (indexing,
+    slicing, `+`, `+=`, comparison with lists), and can keep a running total
+    of per-message weights such as token counts.
+
+    Assistant messages are also indexed by content and tool calls, and the
+    length of the trailing run of assistant turns making the same tool calls
+    is tracked, so repetition can be counted without scanning the history.
+    """
+
+    def __init__(self, messages: Iterable[Message] = (), maxlen: Optional[int] = None):
+        self._items: Deque[Message] = deque(maxlen=maxlen)
+        self._weights: Deque[int] = deque()
+        self.weigh: Optional[Callable[[Message], int]] = None
+        self.weight = 0
+        self.fingerprints: Counter = Counter()
+        self.last_assistant: Optional[Message] = None
+        # Consecutive assistant turns, up to the latest, with the same tool calls
+        self.tool_call_run = 0
+        self._run_key: Optional[tuple] = None
+        self.extend(messages)
+
+    @property
+    def maxlen(self) -> Optional[int]:
+        return self._items.maxlen
+
+    def set_weigher(self, weigh: Callable[[Message], int]) -> None:
+        """Start tracking the total weight of the stored messages"""
+        self.weigh = weigh
+        self._reweigh()
+
+    def weight_between(self, start: int, end: int) -> int:
+        """Total weight of the messages in [start, end)"""
+        return sum(islice(self._weights, start, end))
+
+    def _reweigh(self) -> None:
+        if self.weigh is None:
+            return
+        self._weights = deque(self.weigh(message) for message in self._items)
+        self.weight = sum(self._weights)
+
+    def _reindex(self) -> None:
+        """Rebuild weights and fingerprints after an arbitrary change"""
+        self._reweigh()
+        self.fingerprints = Counter(
+            key for message in self._items for key in message_fingerprints(message)
+        )
+        self.last_assistant = next(
+            (m for m in reversed(self._items) if m.role == Role.ASSISTANT), None
+        )
+        self.tool_call_run = 0
+        self._run_key = None
+        if self.last_assistant is not None:
+            self._run_key = tool_calls_fingerprint(self.last_assistant)
+        if self._run_key is not None:
+            for message in reversed(self._items):
+                if message.role != Role.ASSISTANT:
+                    continue
+                if tool_calls_fingerprint(message) != self._run_key:
+                    break
+                self.tool_call_run += 1
+
+    def resize(self, maxlen: Optional[int]) -> None:
+        """Change the capacity, keeping the most recent messages"""
+        if maxlen != self.maxlen:
+            self._items = deque(self._items, maxlen=maxlen)
+            self._reindex()
+
+    def append(self, message: Message) -> None:
+        if self.maxlen is not None and len(self._items) == self.maxlen:
+            evicted = self._items[0]
+            if self.weigh is not None:
+                self.weight -= self._weights.popleft()
+            for key in message_fingerprints(evicted):
+                self.fingerprints[key] -= 1
+                if self.fingerprints[key] <= 0:
+                    del self.fingerprints[key]
+            if evicted is self.last_assistant:
+                self.last_assistant = None
+            if self._run_key is not None:
+                # The run can't be longer than the matching turns still stored
+                self.tool_call_run = min(
+                    self.tool_call_run, self.fingerprints[self._run_key]
+                )
+        if self.weigh is not None:
+            weight = self.weigh(message)
+            self._weights.append(weight)
+            self.weight += weight
+        self.fingerprints.update(message_fingerprints(message))
+        if message.role == Role.ASSISTANT:
+            self.last_assistant = message
+            key = tool_calls_fingerprint(message)
+            if key is not None and key == self._run_key:
+                self.tool_call_run += 1
+            else:
+                self.tool_call_run = 1 if key is not None else 0
+            self._run_key = key
+        self._items.append(message)
+
+    def insert(self, index: int, message: Message) -> None:
+        if self.maxlen is not None and len(self._items) == self.maxlen:
+            self._items.popleft()
+            index = max(index - 1, 0)
+        self._items.insert(index, message)
+        self._reindex()
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._weights.clear()
+        self.weight = 0
+        self.fingerprints.clear()
+        self.last_assistant = None
+        self.tool_call_run = 0
+        self._run_key = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            if step == 1:
+                return list(islice(self._items, start, stop))
+            return list(self._items)[index]
+        return self._items[index]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            items = list(self._items)
+            items[index] = value
+            self._items = deque(items, maxlen=self.maxlen)
+        else:
+            self._items[index] = value
+        self._reindex()
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            items = list(self._items)
+            del items[index]
+            self._items = deque(items, maxlen=self.maxlen)
+        else:
+            del self._items[index]
+        self._reindex()
+
+    def __add__(self, other) -> List[Message]:
+        return list(self._items) + list(other)
+
+    def __radd__(self, other) -> List[Message]:
+        return list(other) + list(self._items)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MessageBuffer, list)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageBuffer({list(self._items)!r}, maxlen={self.maxlen})"
+
+
 class Memory(BaseModel):
-    messages: List[Message] = Field(default_factory=list)
+    messages: MessageBuffer = Field(default_factory=MessageBuffer)
     max_messages: int = Field(default=100)
 
+    # Token budget mode: once the stored messages exceed `token_budget`,
+    # `compact` replaces older spans with an LLM-written summary
+    token_budget: Optional[int] = Field(default=None)
+    keep_recent: int = Field(
+        default=6, description="Most recent messages always kept verbatim"
+    )
+    token_counter: Optional[Callable[[dict], int]] = Field(default=None, exclude=True)
+
+    class Config:
+        arbitrary_types_allowed = True
+        # Lists assigned to `messages` are converted to a MessageBuffer
+        validate_assignment = True
+
+    @field_validator("messages", mode="before")
+    @classmethod
+    def _to_buffer(cls, value: Any) -> MessageBuffer:
+        if isinstance(value, MessageBuffer):
+            return value
+        return MessageBuffer(
+            Message.model_validate(message) if isinstance(message, dict) else message
+            for message in value
+        )
+
+    @model_validator(mode="after")
+    def _bound_buffer(self) -> "Memory":
+        self.messages.resize(self.max_messages)
+        return self
+
+    @field_serializer("messages")
+    def _serialize_messages(self, messages: MessageBuffer) -> List[dict]:
+        return [message.model_dump() for message in messages]
+
     def add_message(self, message: Message) -> None:
-        """Add a message to memory"""
+        """Add a message to memory, evicting the oldest beyond max_messages"""
         self.messages.append(message)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
         self.messages.extend(messages)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
 
     def clear(self) -> None:
         """Clear all messages"""
@@ -185,3 +442,127 @@ class Memory(BaseModel):
     def to_dict_list(self) -> List[dict]:
         """Convert messages to list of dicts"""
         return [msg.to_dict() for msg in self.messages]
+
+    def count_duplicates(self, message: Message) -> int:
+        """Count other stored assistant messages with the same content as `message`"""
+        if not message.content:
+            return 0
+        count = self.messages.fingerprints[("content", message.content)]
+        if message.role == Role.ASSISTANT:
+            count -= 1  # The stored message itself
+        return max(count, 0)
+
+    def count_repeated_tool_calls(self) -> int:
+        """Count the assistant turns directly before the latest one that made the same tool calls with the same arguments"""
+        return max(self.messages.tool_call_run - 1, 0)
+
+    @property
+    def token_count(self) -> int:
+        """Running token total of the stored messages (0 without a token counter)"""
+        if self.token_counter is None:
+            return 0
+        # A replaced buffer starts untracked
+        if self.messages.weigh is None:
+            self.messages.set_weigher(
+                lambda message: self.token_counter(message.to_dict())
+            )
+        return self.messages.weight
+
+    def _compaction_split(self) -> Tuple[int, int]:
+        """Return the [start, end) span of messages that may be summarized"""
+        start = 0
+        while start < len(self.messages) and self.messages[start].role == Role.SYSTEM:
+            start += 1
+        end = max(start, len(self.messages) - self.keep_recent)
+        # Never separate tool results from the assistant message that called them
+        while end > start and end < len(self.messages):
+            if self.messages[end].role != Role.TOOL:
+                break
+            end -= 1
+        return start, end
+
+    def _transcript_chunks(
+        self, messages: List[Message], max_chars: int = 4000
+    ) -> List[str]:
+        """Render messages as text, split into chunks that fit the token budget"""
+        chunk_tokens = max(self.token_budget // 2, 1)
+        chunks, lines, tokens = [], [], 0
+        for message in messages:
+            text = message.content or ""
+            if message.tool_calls:
+                calls = ", ".join(
+                    f"{call.function.name}({call.function.arguments})"
+                    for call in message.tool_calls
+                )
+                text = f"{text}\n[tool calls] {calls}".strip()
+            if len(text) > max_chars:
+                text = text[:max_chars] + "...[truncated]"
+            label = f"{message.role} ({message.name})" if message.name else message.role
+            line = f"{label}: {text}"
+
+            size = self.token_counter(message.to_dict()) if self.token_counter else 0
+            if lines and tokens + size > chunk_tokens:
+                chunks.append("\n\n".join(lines))
+                lines, tokens = [], 0
+            lines.append(line)
+            tokens += size
+        if lines:
+            chunks.append("\n\n".join(lines))
+        return chunks
+
+    async def compact(self, llm: "LLM") -> bool:
+        """Summarize older messages if the token budget is exceeded.
+
+        Leading system messages and the `keep_recent` most recent messages are
+        kept verbatim, and tool results stay with the assistant message that
+        requested them.
+
+        Args:
+            llm: LLM used to write the summary.
+
+        Returns:
+            bool: Whether the memory was compacted.
+        """
+        if not self.token_budget or self.token_count <= self.token_budget:
+            return False
+
+        start, end = self._compaction_split()
+        if end - start < 2:
+            return False
+
+        # A new summary restates the previous one, so expect it to be at
+        # least as long; skip when the recent messages alone are over budget
+        first = self.messages[start]
+        summary_tokens = (
+            self.messages.weight_between(start, start + 1)
+            if first.role == Role.USER
+            and (first.content or "").startswith(SUMMARY_PREFIX)
+            else 0
+        )
+        span_tokens = self.messages.weight_between(start, end)
+        if self.token_count - span_tokens + summary_tokens > self.token_budget:
+            return False
+
+        try:
+            summaries = await asyncio.gather(
+                *(
+                    llm.ask(
+                        [Message.user_message(SUMMARY_PROMPT.format(transcript=chunk))],
+                        system_msgs=[Message.system_message(SUMMARY_SYSTEM_PROMPT)],
+                        stream=False,
+                    )
+                    for chunk in self._transcript_chunks(self.messages[start:end])
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Memory compaction failed, keeping full history: {e}")
+            return False
+
+        before = self.token_count
+        summary = Message.user_message(SUMMARY_PREFIX + "\n\n".join(summaries))
+        self.messages = self.messages[:start] + [summary] + self.messages[end:]
+        logger.info(
+            f"Compacted {end - start} messages into a summary "
+            f"({before} -> {self.token_count} tokens)"
+        )
+        return True
@@ -16,6 +16,7 @@ class AskHuman(BaseTool):
         },
         "required": ["inquire"],
     }
+    parallel_safe: bool = False  # Prompts must not interleave on stdin
 
     async def execute(self, inquire: str) -> str:
         return input(f"""Bot: {inquire}\n\nYou: """).strip()
@@ -8,6 +8,8 @@ class BaseTool(ABC, BaseModel):
     name: str
     description: str
     parameters: Optional[dict] = None
+    # Whether calls may run concurrently with other calls in the same turn
+    parallel_safe: bool = True
 
     class Config:
         arbitrary_types_allowed = True
@@ -20,6 +22,16 @@ class BaseTool(ABC, BaseModel):
     async def execute(self, **kwargs) -> Any:
         """Execute the tool with given parameters."""
 
+    def clone(self) -> "BaseTool":
+        """Copy this tool for another agent.
+
+        Configured fields are kept and private state, such as a shell
+        session, starts fresh. Tools keeping per-agent state in public fields
+        override this.
+        """
+        fields = {name: getattr(self, name) for name in self.model_fields_set}
+        return type(self)(**fields)
+
     def to_param(self) -> Dict:
         """Convert tool to function call format."""
         return {
@@ -129,6 +129,8 @@ class Bash(BaseTool):
         "required": ["command"],
     }
 
+    parallel_safe: bool = False  # Commands share one shell session
+
     _session: Optional[_BashSession] = None
 
     async def execute(
@@ -0,0 +1,410 @@
+import asyncio
+import time
+import weakref
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from browser_use import Browser as BrowserUseBrowser
+from browser_use import BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+from app.config import BrowserSettings, config
+from app.logger import logger
+
+
+def create_browser() -> BrowserUseBrowser:
+    """Creates a browser configured from the [browser] settings.
+
+    Returns:
+        BrowserUseBrowser: Browser that launches Chromium on first use.
+    """
+    browser_config_kwargs = {"headless": False, "disable_security": True}
+
+    if config.browser_config:
+        from browser_use.browser.browser import ProxySettings
+
+        # handle proxy settings.
+        if config.browser_config.proxy and config.browser_config.proxy.server:
+            browser_config_kwargs["proxy"] = ProxySettings(
+                server=config.browser_config.proxy.server,
+                username=config.browser_config.proxy.username,
+                password=config.browser_config.proxy.password,
+            )
+
+        browser_attrs = [
+            "headless",
+            "disable_security",
+            "extra_chromium_args",
+            "chrome_instance_path",
+            "wss_url",
+            "cdp_url",
+        ]
+
+        for attr in browser_attrs:
+            value = getattr(config.browser_config, attr, None)
+            if value is not None:
+                if not isinstance(value, list) or value:
+                    browser_config_kwargs[attr] = value
+
+    return BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
+
+
+def create_context_config() -> BrowserContextConfig:
+    """Creates the configuration for new browser contexts.
+
+    Returns:
+        BrowserContextConfig: Context configuration.
+    """
+    # if there is context config in the config, use it.
+    if (
+        config.browser_config
+        and hasattr(config.browser_config, "new_context_config")
+        and config.browser_config.new_context_config
+    ):
+        return config.browser_config.new_context_config
+    if is_text_first():
+        # Don't wait for the network to settle after actions
+        return BrowserContextConfig(
+            minimum_wait_page_load_time=0.1,
+            wait_for_network_idle_page_load_time=0.25,
+            maximum_wait_page_load_time=2,
+        )
+    return BrowserContextConfig()
+
+
+TEXT_FIRST_BLOCKED_TYPES = {"image", "media", "font"}
+
+
+def is_text_first() -> bool:
+    """Whether the text-first page-load profile is enabled."""
+    return bool(
+        config.browser_config and config.browser_config.load_profile == "text_first"
+    )
+
+
+def page_load_state() -> str:
+    """Load state to wait for after navigation under the configured profile."""
+    return "domcontentloaded" if is_text_first() else "load"
+
+
+class NetworkStats:
+    """Bytes transferred and requests blocked in one browser context."""
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.requests = 0
+        self.blocked = 0
+
+    def snapshot(self) -> Tuple[float, int, int]:
+        return time.perf_counter(), self.bytes_received, self.blocked
+
+    def log_since(self, action: str, snapshot: Tuple[float, int, int]) -> None:
+        """Log load time, bytes and blocked requests since `snapshot`."""
+        start, received, blocked = snapshot
+        logger.info(
+            f"🌐 {action}: {time.perf_counter() - start:.2f}s, "
+            f"{(self.bytes_received - received) / 1024:.1f} KB transferred, "
+            f"{self.blocked - blocked} requests blocked"
+        )
+
+
+_network_stats: "weakref.WeakKeyDictionary[BrowserContext, NetworkStats]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_network_stats(context: BrowserContext) -> Optional[NetworkStats]:
+    """Returns the network stats of a context set up by `apply_network_profile`."""
+    return _network_stats.get(context)
+
+
+def is_blocked_domain(url: str, blocked_domains: Set[str]) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return any(
+        host == domain or host.endswith(f".{domain}") for domain in blocked_domains
+    )
+
+
+async def apply_network_profile(context: BrowserContext) -> NetworkStats:
+    """Installs request blocking and transfer accounting on a context.
+
+    Requests are aborted by resource type (plus images, media and fonts in
+    the text-first profile) and by domain, including subdomains.
+
+    Args:
+        context: Browser context to configure.
+
+    Returns:
+        NetworkStats: Counters updated as the context loads pages.
+    """
+    stats = _network_stats.get(context)
+    if stats is not None:
+        return stats
+
+    settings = config.browser_config or BrowserSettings()
+    blocked_types = set(settings.blocked_resource_types)
+    if is_text_first():
+        blocked_types |= TEXT_FIRST_BLOCKED_TYPES
+    blocked_domains = {domain.lower() for domain in settings.blocked_domains}
+
+    stats = NetworkStats()
+    _network_stats[context] = stats
+    playwright_context = (await context.get_session()).context
+
+    async def on_request_finished(request) -> None:
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats.requests += 1
+        stats.bytes_received += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    playwright_context.on("requestfinished", on_request_finished)
+
+    if blocked_types or blocked_domains:
+
+        async def route_request(route) -> None:
+            request = route.request
+            if request.resource_type in blocked_types or is_blocked_domain(
+                request.url, blocked_domains
+            ):
+                stats.blocked += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await playwright_context.route("**/*", route_request)
+
+    return stats
+
+
+class BrowserContextPool:
+    """Pool of isolated browser contexts on one shared browser process.
+
+    Agents lease a context instead of launching their own Chromium. Contexts
+    are never handed to a second agent: a released context is closed so no
+    cookies or storage leak between leases, and fresh pre-warmed contexts
+    are kept ready instead. Idle contexts, and finally the browser itself,
+    are closed after `idle_timeout` seconds without use.
+
+    Attributes:
+        max_contexts: Maximum number of open contexts, leased or idle.
+        min_idle: Pre-warmed contexts kept ready while the pool is in use.
+        idle_timeout: Seconds before idle contexts and the browser are closed.
+    """
+
+    def __init__(
+        self, max_contexts: int = 4, min_idle: int = 1, idle_timeout: float = 300.0
+    ):
+        """Initializes the browser context pool.
+
+        Args:
+            max_contexts: Maximum number of open contexts.
+            min_idle: Pre-warmed contexts kept ready.
+            idle_timeout: Seconds before idle resources are closed.
+        """
+        self.max_contexts = max_contexts
+        self.min_idle = min(min_idle, max_contexts)
+        self.idle_timeout = idle_timeout
+
+        self._browser: Optional[BrowserUseBrowser] = None
+        self._idle: Deque[Tuple[BrowserContext, float]] = deque()
+        self._leased: Set[BrowserContext] = set()
+        self._creating = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._last_used = 0.0
+
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._total_wait = 0.0
+        self._reaped = 0
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        """Resets the pool if it was used from a different event loop.
+
+        Playwright objects are tied to the loop that created them, so state
+        from a previous `asyncio.run` cannot be reused.
+
+        Returns:
+            asyncio.AbstractEventLoop: The running loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._browser = None
+            self._idle.clear()
+            self._leased.clear()
+            self._creating = 0
+            self._slots = asyncio.Semaphore(self.max_contexts)
+            self._refill_task = None
+            self._reaper_task = None
+        return loop
+
+    def _get_browser(self) -> BrowserUseBrowser:
+        if self._browser is None:
+            self._browser = create_browser()
+            self._reaper_task = asyncio.create_task(self._reap())
+        return self._browser
+
+    async def _new_context(self) -> BrowserContext:
+        """Creates a context and opens its first page.
+
+        Returns:
+            BrowserContext: Ready-to-use context.
+        """
+        context = await self._get_browser().new_context(create_context_config())
+        await apply_network_profile(context)
+        await context.get_current_page()
+        return context
+
+    async def acquire(self) -> BrowserContext:
+        """Leases a context, waiting if `max_contexts` are already leased.
+
+        Returns:
+            BrowserContext: Context reserved for the caller until `release`.
+        """
+        loop = self._bind_loop()
+        start = loop.time()
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                self._hits += 1
+                context, _ = self._idle.popleft()
+            else:
+                self._misses += 1
+                # Count the creation so the reaper keeps the browser open
+                self._creating += 1
+                self._last_used = loop.time()
+                try:
+                    context = await self._new_context()
+                finally:
+                    self._creating -= 1
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self._total_wait += loop.time() - start
+        self._last_used = loop.time()
+        self._leased.add(context)
+        self._schedule_refill()
+        return context
+
+    async def release(self, context: BrowserContext) -> None:
+        """Returns a leased context. It is closed rather than reused.
+
+        Args:
+            context: Context obtained from `acquire`.
+        """
+        if context not in self._leased:
+            await self._close_context(context)
+            return
+
+        self._leased.discard(context)
+        self._slots.release()
+        self._last_used = self._loop.time()
+        await self._close_context(context)
+        self._schedule_refill()
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        """Pre-warms contexts up to `min_idle` within `max_contexts`."""
+        while (
+            len(self._idle) + self._creating < self.min_idle
+            and len(self._idle) + len(self._leased) + self._creating < self.max_contexts
+        ):
+            self._creating += 1
+            try:
+                context = await self._new_context()
+            except Exception as e:
+                logger.warning(f"Failed to pre-warm browser context: {e}")
+                return
+            finally:
+                self._creating -= 1
+            self._idle.append((context, self._loop.time()))
+
+    async def _reap(self) -> None:
+        """Closes idle contexts, then the browser, once unused for a while."""
+        while self._browser is not None:
+            await asyncio.sleep(self.idle_timeout / 2)
+            now = self._loop.time()
+            while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                context, _ = self._idle.popleft()
+                self._reaped += 1
+                await self._close_context(context)
+
+            if (
+                not self._idle
+                and not self._leased
+                and not self._creating
+                and now - self._last_used > self.idle_timeout
+            ):
+                logger.info("Closing idle shared browser")
+                browser, self._browser = self._browser, None
+                await browser.close()
+
+    @staticmethod
+    async def _close_context(context: BrowserContext) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {e}")
+
+    async def cleanup(self) -> None:
+        """Closes all contexts and the shared browser."""
+        for task in (self._refill_task, self._reaper_task):
+            if task and not task.done():
+                task.cancel()
+
+        contexts = [context for context, _ in self._idle] + list(self._leased)
+        self._idle.clear()
+        self._leased.clear()
+        for context in contexts:
+            await self._close_context(context)
+
+        if self._browser is not None:
+            browser, self._browser = self._browser, None
+            await browser.close()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Gets pool statistics.
+
+        Returns:
+            Dict[str, float]: Lease, pre-warm and reaping counters.
+        """
+        acquired = self._hits + self._misses
+        return {
+            "leased": len(self._leased),
+            "idle": len(self._idle),
+            "max_contexts": self.max_contexts,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / acquired if acquired else 0.0,
+            "avg_wait": self._total_wait / acquired if acquired else 0.0,
+            "reaped": self._reaped,
+        }
+
+
+_BROWSER_POOL: Optional[BrowserContextPool] = None
+
+
+def get_browser_pool() -> Optional[BrowserContextPool]:
+    """Returns the process-wide context pool, or None if pooling is disabled."""
+    global _BROWSER_POOL
+    settings = config.browser_config
+    if not settings or settings.context_pool_size <= 0:
+        return None
+    if _BROWSER_POOL is None:
+        _BROWSER_POOL = BrowserContextPool(
+            max_contexts=settings.context_pool_size,
+            min_idle=settings.context_pool_min_idle,
+            idle_timeout=settings.context_pool_idle_timeout,
+        )
+    return _BROWSER_POOL
@@ -1,18 +1,31 @@
 import asyncio
 import base64
+import hashlib
+import io
 import json
-from typing import Generic, Optional, TypeVar
+from typing import Generic, Optional, Tuple, TypeVar
 
 from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.context import BrowserContext
 from browser_use.dom.service import DomService
-from pydantic import Field, field_validator
+from PIL import Image
+from pydantic import Field, PrivateAttr, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
-from app.config import config
+from app.cache import LRUCache, make_cache_key
+from app.config import BrowserSettings, config
 from app.llm import LLM
+from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
+from app.tool.browser_pool import (
+    BrowserContextPool,
+    apply_network_profile,
+    create_browser,
+    create_context_config,
+    get_browser_pool,
+    get_network_stats,
+    page_load_state,
+)
 from app.tool.web_search import WebSearch
 
 
@@ -33,9 +46,75 @@ Key capabilities include:
 Note: When using element indices, refer to the numbered elements shown in the current browser state.
 """
 
+EXTRACTION_PROMPT = """\
+Your task is to extract the content of the page. You will be given a page and a goal, and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format.
+Extraction goal: {goal}
+
+Page content:
+{content}
+"""
+
+MERGE_EXTRACTIONS_PROMPT = """\
+The page was too long to read at once, so it was extracted in parts. Merge these partial extractions into one, removing duplicates and keeping every relevant detail:
+
+{extractions}
+"""
+
+# Define extraction function schema
+EXTRACTION_FUNCTION = {
+    "type": "function",
+    "function": {
+        "name": "extract_content",
+        "description": "Extract specific information from a webpage based on a goal",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "extracted_content": {
+                    "type": "object",
+                    "description": "The content extracted from the page according to the goal",
+                    "properties": {
+                        "text": {
+                            "type": "string",
+                            "description": "Text content extracted from the page",
+                        },
+                        "metadata": {
+                            "type": "object",
+                            "description": "Additional metadata about the extracted content",
+                            "properties": {
+                                "source": {
+                                    "type": "string",
+                                    "description": "Source of the extracted content",
+                                }
+                            },
+                        },
+                    },
+                }
+            },
+            "required": ["extracted_content"],
+        },
+    },
+}
+
+# Markdown of recently extracted pages, keyed by URL and DOM hash
+_markdown_cache = LRUCache(max_entries=32)
+
 Context = TypeVar("Context")
 
 
+def limit_screenshot_size(
+    screenshot: bytes, max_dimension: Optional[int], quality: int
+) -> Tuple[bytes, Tuple[int, int]]:
+    """Downscale a JPEG screenshot to `max_dimension` and return it with its size."""
+    image = Image.open(io.BytesIO(screenshot))
+    if not max_dimension or max(image.size) <= max_dimension:
+        return screenshot, image.size
+
+    image.thumbnail((max_dimension, max_dimension))
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue(), image.size
+
+
 class BrowserUseTool(BaseTool, Generic[Context]):
     name: str = "browser_use"
     description: str = _BROWSER_DESCRIPTION
@@ -121,6 +200,8 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         },
     }
 
+    parallel_safe: bool = False  # Actions depend on shared page state
+
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
     browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
     context: Optional[BrowserContext] = Field(default=None, exclude=True)
@@ -132,6 +213,9 @@ class BrowserUseTool(BaseTool, Generic[Context]):
 
     llm: Optional[LLM] = Field(default_factory=LLM)
 
+    _last_screenshot_key: Optional[str] = PrivateAttr(default=None)
+    _pool: Optional[BrowserContextPool] = PrivateAttr(default=None)
+
     @field_validator("parameters", mode="before")
     def validate_parameters(cls, v: dict, info: ValidationInfo) -> dict:
         if not v:
@@ -140,49 +224,17 @@ class BrowserUseTool(BaseTool, Generic[Context]):
 
     async def _ensure_browser_initialized(self) -> BrowserContext:
         """Ensure browser and context are initialized."""
-        if self.browser is None:
-            browser_config_kwargs = {"headless": False, "disable_security": True}
-
-            if config.browser_config:
-                from browser_use.browser.browser import ProxySettings
-
-                # handle proxy settings.
-                if config.browser_config.proxy and config.browser_config.proxy.server:
-                    browser_config_kwargs["proxy"] = ProxySettings(
-                        server=config.browser_config.proxy.server,
-                        username=config.browser_config.proxy.username,
-                        password=config.browser_config.proxy.password,
-                    )
-
-                browser_attrs = [
-                    "headless",
-                    "disable_security",
-                    "extra_chromium_args",
-                    "chrome_instance_path",
-                    "wss_url",
-                    "cdp_url",
-                ]
-
-                for attr in browser_attrs:
-                    value = getattr(config.browser_config, attr, None)
-                    if value is not None:
-                        if not isinstance(value, list) or value:
-                            browser_config_kwargs[attr] = value
-
-            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
-
         if self.context is None:
-            context_config = BrowserContextConfig()
-
-            # if there is context config in the config, use it.
-            if (
-                config.browser_config
-                and hasattr(config.browser_config, "new_context_config")
-                and config.browser_config.new_context_config
-            ):
-                context_config = config.browser_config.new_context_config
-
-            self.context = await self.browser.new_context(context_config)
+            pool = get_browser_pool()
+            if pool is not None:
+                # Lease an isolated context on the shared browser process
+                self.context = await pool.acquire()
+                self._pool = pool
+            else:
+                if self.browser is None:
+                    self.browser = create_browser()
+                self.context = await self.browser.new_context(create_context_config())
+                await apply_network_profile(self.context)
             self.dom_service = DomService(await self.context.get_current_page())
 
         return self.context
@@ -221,8 +273,12 @@ class BrowserUseTool(BaseTool, Generic[Context]):
             ToolResult with the action's output or error
         """
         async with self.lock:
+            network_stats, snapshot = None, None
             try:
                 context = await self._ensure_browser_initialized()
+                network_stats = get_network_stats(context)
+                if network_stats:
+                    snapshot = network_stats.snapshot()
 
                 # Get max content length from config
                 max_content_length = getattr(
@@ -236,8 +292,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                             error="URL is required for 'go_to_url' action"
                         )
                     page = await context.get_current_page()
-                    await page.goto(url)
-                    await page.wait_for_load_state()
+                    await page.goto(url, wait_until=page_load_state())
                     return ToolResult(output=f"Navigated to {url}")
 
                 elif action == "go_back":
@@ -262,8 +317,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                     url_to_navigate = first_search_result.url
 
                     page = await context.get_current_page()
-                    await page.goto(url_to_navigate)
-                    await page.wait_for_load_state()
+                    await page.goto(url_to_navigate, wait_until=page_load_state())
 
                     return search_response
 
@@ -379,64 +433,19 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                         )
 
                     page = await context.get_current_page()
-                    import markdownify
-
-                    content = markdownify.markdownify(await page.content())
-
-                    prompt = f"""\
-Your task is to extract the content of the page. You will be given a page and a goal, and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format.
-Extraction goal: {goal}
-
-Page content:
-{content[:max_content_length]}
-"""
-                    messages = [{"role": "system", "content": prompt}]
-
-                    # Define extraction function schema
-                    extraction_function = {
-                        "type": "function",
-                        "function": {
-                            "name": "extract_content",
-                            "description": "Extract specific information from a webpage based on a goal",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {
-                                    "extracted_content": {
-                                        "type": "object",
-                                        "description": "The content extracted from the page according to the goal",
-                                        "properties": {
-                                            "text": {
-                                                "type": "string",
-                                                "description": "Text content extracted from the page",
-                                            },
-                                            "metadata": {
-                                                "type": "object",
-                                                "description": "Additional metadata about the extracted content",
-                                                "properties": {
-                                                    "source": {
-                                                        "type": "string",
-                                                        "description": "Source of the extracted content",
-                                                    }
-                                                },
-                                            },
-                                        },
-                                    }
-                                },
-                                "required": ["extracted_content"],
-                            },
-                        },
-                    }
+                    content = await self._page_markdown(page)
 
-                    # Use LLM to extract content with required function calling
-                    response = await self.llm.ask_tool(
-                        messages,
-                        tools=[extraction_function],
-                        tool_choice="required",
-                    )
+                    settings = config.browser_config or BrowserSettings()
+                    if settings.chunked_extraction:
+                        extracted_content = await self._extract_chunked(
+                            goal, content, settings
+                        )
+                    else:
+                        extracted_content = await self._extract_with_llm(
+                            goal, content[:max_content_length]
+                        )
 
-                    if response and response.tool_calls:
-                        args = json.loads(response.tool_calls[0].function.arguments)
-                        extracted_content = args.get("extracted_content", {})
+                    if extracted_content is not None:
                         return ToolResult(
                             output=f"Extracted from page:\n{extracted_content}\n"
                         )
@@ -451,7 +460,7 @@ Page content:
                         )
                     await context.switch_to_tab(tab_id)
                     page = await context.get_current_page()
-                    await page.wait_for_load_state()
+                    await page.wait_for_load_state(page_load_state())
                     return ToolResult(output=f"Switched to tab {tab_id}")
 
                 elif action == "open_tab":
@@ -475,6 +484,79 @@ Page content:
 
             except Exception as e:
                 return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
+            finally:
+                if snapshot:
+                    network_stats.log_since(action, snapshot)
+
+    async def _page_markdown(self, page) -> str:
+        """Convert the page to markdown, cached per URL and DOM content."""
+        import markdownify
+
+        html = await page.content()
+        key = make_cache_key(page.url, hashlib.sha1(html.encode("utf-8")).hexdigest())
+        content = _markdown_cache.get(key)
+        if content is None:
+            content = await asyncio.to_thread(markdownify.markdownify, html)
+            _markdown_cache.set(key, content)
+        return content
+
+    async def _extract_with_llm(self, goal: str, content: str) -> Optional[dict]:
+        """Run a single extraction call over `content`."""
+        prompt = EXTRACTION_PROMPT.format(goal=goal, content=content)
+        messages = [{"role": "system", "content": prompt}]
+
+        # Use LLM to extract content with required function calling
+        response = await self.llm.ask_tool(
+            messages,
+            tools=[EXTRACTION_FUNCTION],
+            tool_choice="required",
+        )
+
+        if response and response.tool_calls:
+            args = json.loads(response.tool_calls[0].function.arguments)
+            return args.get("extracted_content", {})
+        return None
+
+    async def _extract_chunked(
+        self, goal: str, content: str, settings: BrowserSettings
+    ) -> Optional[dict]:
+        """
+        Map-reduce extraction over the whole page.
+
+        The markdown is split into token-sized chunks that are extracted
+        concurrently (the LLM's rate limiter bounds the fan-out), then the
+        partial results are merged with one more call.
+        """
+        tokens = self.llm.tokenizer.encode(content)
+        size = settings.extraction_chunk_tokens
+        chunks = [
+            self.llm.tokenizer.decode(tokens[i : i + size])
+            for i in range(0, len(tokens), size)
+        ][: settings.extraction_max_chunks]
+        if len(chunks) <= 1:
+            return await self._extract_with_llm(goal, content)
+
+        logger.info(f"Extracting '{goal}' from {len(chunks)} page chunks")
+        results = await asyncio.gather(
+            *(self._extract_with_llm(goal, chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+        partials = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Chunk extraction failed: {result}")
+            elif result:
+                partials.append(result)
+        if len(partials) <= 1:
+            return partials[0] if partials else None
+
+        merged = "\n\n".join(
+            f"Part {i}:\n{json.dumps(partial, ensure_ascii=False)}"
+            for i, partial in enumerate(partials, 1)
+        )
+        return await self._extract_with_llm(
+            goal, MERGE_EXTRACTIONS_PROMPT.format(extractions=merged)
+        )
 
     async def get_current_state(
         self, context: Optional[BrowserContext] = None
@@ -498,29 +580,32 @@ Page content:
             elif hasattr(ctx, "config") and hasattr(ctx.config, "browser_window_size"):
                 viewport_height = ctx.config.browser_window_size.get("height", 0)
 
+            interactive_elements = (
+                state.element_tree.clickable_elements_to_string()
+                if state.element_tree
+                else ""
+            )
+
             # Take a screenshot for the state
             page = await ctx.get_current_page()
 
             await page.bring_to_front()
-            await page.wait_for_load_state()
+            await page.wait_for_load_state(page_load_state())
 
-            screenshot = await page.screenshot(
-                full_page=True, animations="disabled", type="jpeg", quality=100
+            screenshot = await self._take_screenshot(
+                page,
+                state.url,
+                getattr(state, "pixels_above", 0),
+                interactive_elements,
             )
 
-            screenshot = base64.b64encode(screenshot).decode("utf-8")
-
             # Build the state info with all required fields
             state_info = {
                 "url": state.url,
                 "title": state.title,
                 "tabs": [tab.model_dump() for tab in state.tabs],
                 "help": "[0], [1], [2], etc., represent clickable indices corresponding to the elements listed. Clicking on these indices will navigate to or interact with the respective content behind them.",
-                "interactive_elements": (
-                    state.element_tree.clickable_elements_to_string()
-                    if state.element_tree
-                    else ""
-                ),
+                "interactive_elements": interactive_elements,
                 "scroll_info": {
                     "pixels_above": getattr(state, "pixels_above", 0),
                     "pixels_below": getattr(state, "pixels_below", 0),
@@ -532,26 +617,79 @@ Page content:
             }
 
             return ToolResult(
-                output=json.dumps(state_info, indent=4, ensure_ascii=False),
+                output=json.dumps(state_info, ensure_ascii=False),
                 base64_image=screenshot,
             )
         except Exception as e:
             return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
+    async def _take_screenshot(
+        self, page, url: str, pixels_above: int, interactive_elements: str
+    ) -> Optional[str]:
+        """
+        Capture a state screenshot according to the configured policy.
+
+        Returns the base64 JPEG, or None when the page is unchanged since the
+        previous screenshot (same URL, scroll position and elements).
+        """
+        settings = config.browser_config or BrowserSettings()
+
+        key = hashlib.sha1(
+            f"{url}\0{pixels_above}\0{interactive_elements}".encode("utf-8")
+        ).hexdigest()
+        if settings.screenshot_skip_unchanged and key == self._last_screenshot_key:
+            logger.debug(f"Page unchanged, skipping screenshot of {url}")
+            return None
+
+        screenshot = await page.screenshot(
+            full_page=settings.screenshot_full_page,
+            animations="disabled",
+            type="jpeg",
+            quality=settings.screenshot_quality,
+        )
+        screenshot, (width, height) = await asyncio.to_thread(
+            limit_screenshot_size,
+            screenshot,
+            settings.screenshot_max_dimension,
+            settings.screenshot_quality,
+        )
+        self._last_screenshot_key = key
+
+        if self.llm:
+            tokens = self.llm.token_counter.count_image(
+                {"detail": "high", "dimensions": (width, height)}
+            )
+            logger.info(
+                f"📸 Screenshot {width}x{height}, {len(screenshot) // 1024} KB, ~{tokens} image tokens"
+            )
+        return base64.b64encode(screenshot).decode("utf-8")
+
+    def clone(self) -> "BrowserUseTool":
+        """Copy this tool for another agent, without its browser or page state."""
+        return type(self)(llm=self.llm)
+
     async def cleanup(self):
         """Clean up browser resources."""
         async with self.lock:
             if self.context is not None:
-                await self.context.close()
+                if self._pool is not None:
+                    await self._pool.release(self.context)
+                    self._pool = None
+                else:
+                    await self.context.close()
                 self.context = None
                 self.dom_service = None
+            self._last_screenshot_key = None
             if self.browser is not None:
                 await self.browser.close()
                 self.browser = None
 
     def __del__(self):
         """Ensure cleanup when object is destroyed."""
-        if self.browser is not None or self.context is not None:
+        # Pooled contexts are bound to the pool's event loop; the pool reaps them
+        if self.browser is not None or (
+            self.context is not None and self._pool is None
+        ):
             try:
                 asyncio.run(self.cleanup())
             except RuntimeError:
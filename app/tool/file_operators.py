@@ -1,8 +1,9 @@
 """File operation interfaces and implementations for local and sandbox environments."""
 
 import asyncio
+import shlex
 from pathlib import Path
-from typing import Optional, Protocol, Tuple, Union, runtime_checkable
+from typing import Literal, Optional, Protocol, Tuple, Union, runtime_checkable
 
 from app.config import SandboxSettings
 from app.exceptions import ToolError
@@ -10,6 +11,7 @@ from app.sandbox.client import SANDBOX_CLIENT
 
 
 PathLike = Union[str, Path]
+PathType = Literal["file", "directory"]
 
 
 @runtime_checkable
@@ -32,6 +34,10 @@ class FileOperator(Protocol):
         """Check if path exists."""
         ...
 
+    async def get_path_type(self, path: PathLike) -> Optional[PathType]:
+        """Return whether path is a file or directory, or None if missing."""
+        ...
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -66,6 +72,13 @@ class LocalFileOperator(FileOperator):
         """Check if path exists."""
         return Path(path).exists()
 
+    async def get_path_type(self, path: PathLike) -> Optional[PathType]:
+        """Return whether path is a file or directory, or None if missing."""
+        path = Path(path)
+        if path.is_dir():
+            return "directory"
+        return "file" if path.exists() else None
+
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
     ) -> Tuple[int, str, str]:
@@ -123,18 +136,28 @@ class SandboxFileOperator(FileOperator):
     async def is_directory(self, path: PathLike) -> bool:
         """Check if path points to a directory in sandbox."""
         await self._ensure_sandbox_initialized()
-        result = await self.sandbox_client.run_command(
-            f"test -d {path} && echo 'true' || echo 'false'"
+        result = await self.sandbox_client.exec_command(
+            f"test -d {shlex.quote(str(path))}"
         )
-        return result.strip() == "true"
+        return result.exit_code == 0
 
     async def exists(self, path: PathLike) -> bool:
         """Check if path exists in sandbox."""
         await self._ensure_sandbox_initialized()
-        result = await self.sandbox_client.run_command(
-            f"test -e {path} && echo 'true' || echo 'false'"
+        result = await self.sandbox_client.exec_command(
+            f"test -e {shlex.quote(str(path))}"
+        )
+        return result.exit_code == 0
+
+    async def get_path_type(self, path: PathLike) -> Optional[PathType]:
+        """Return whether path is a file or directory in sandbox, in one round trip."""
+        await self._ensure_sandbox_initialized()
+        quoted = shlex.quote(str(path))
+        result = await self.sandbox_client.exec_command(
+            f"if test -d {quoted}; then echo directory; "
+            f"elif test -e {quoted}; then echo file; fi"
         )
-        return result.strip() == "true"
+        return result.stdout.strip() or None
 
     async def run_command(
         self, cmd: str, timeout: Optional[float] = 120.0
@@ -142,14 +165,10 @@ class SandboxFileOperator(FileOperator):
         """Run a command in sandbox environment."""
         await self._ensure_sandbox_initialized()
         try:
-            stdout = await self.sandbox_client.run_command(
+            result = await self.sandbox_client.exec_command(
                 cmd, timeout=int(timeout) if timeout else None
             )
-            return (
-                0,  # Always return 0 since we don't have explicit return code from sandbox
-                stdout,
-                "",  # No stderr capture in the current sandbox implementation
-            )
+            return result.exit_code, result.stdout, result.stderr
         except TimeoutError as exc:
             raise TimeoutError(
                 f"Command '{cmd}' timed out after {timeout} seconds in sandbox"
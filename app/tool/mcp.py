@@ -1,11 +1,21 @@
+import asyncio
+import hashlib
+import json
 from contextlib import AsyncExitStack
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
-from mcp.types import ListToolsResult, TextContent
-
+from mcp.types import (
+    ListToolsResult,
+    ServerNotification,
+    TextContent,
+    Tool,
+    ToolListChangedNotification,
+)
+
+from app.config import config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.tool_collection import ToolCollection
@@ -17,6 +27,7 @@ class MCPClientTool(BaseTool):
     session: Optional[ClientSession] = None
     server_id: str = ""  # Add server identifier
     original_name: str = ""
+    schema_hash: str = ""  # Content hash of the server's tool definition
 
     async def execute(self, **kwargs) -> ToolResult:
         """Execute the tool by making a remote call to the MCP server."""
@@ -40,90 +51,266 @@ class MCPClients(ToolCollection):
     """
 
     sessions: Dict[str, ClientSession] = {}
-    exit_stacks: Dict[str, AsyncExitStack] = {}
     description: str = "MCP client tools for server interaction"
 
     def __init__(self):
         super().__init__()  # Initialize with empty tools list
         self.name = "mcp"  # Keep name for backward compatibility
-
-    async def connect_sse(self, server_url: str, server_id: str = "") -> None:
+        self.sessions = {}
+        self._connections: Dict[str, Tuple[asyncio.Task, asyncio.Event]] = {}
+        # Schema hashes per server and tool, and a version bumped on any change
+        self._tool_hashes: Dict[str, Dict[str, str]] = {}
+        self.tools_version = 0
+        self.poll_interval = config.mcp_config.tools_poll_interval
+        self.max_poll_interval = config.mcp_config.tools_poll_max_interval
+
+    async def connect_sse(
+        self, server_url: str, server_id: str = "", timeout: Optional[float] = None
+    ) -> None:
         """Connect to an MCP server using SSE transport."""
         if not server_url:
             raise ValueError("Server URL is required.")
 
-        server_id = server_id or server_url
+        async def open_session(exit_stack: AsyncExitStack) -> ClientSession:
+            streams = await exit_stack.enter_async_context(sse_client(url=server_url))
+            return await exit_stack.enter_async_context(ClientSession(*streams))
 
-        # Always ensure clean disconnection before new connection
-        if server_id in self.sessions:
-            await self.disconnect(server_id)
-
-        exit_stack = AsyncExitStack()
-        self.exit_stacks[server_id] = exit_stack
-
-        streams_context = sse_client(url=server_url)
-        streams = await exit_stack.enter_async_context(streams_context)
-        session = await exit_stack.enter_async_context(ClientSession(*streams))
-        self.sessions[server_id] = session
-
-        await self._initialize_and_list_tools(server_id)
+        await self._connect(server_id or server_url, open_session, timeout)
 
     async def connect_stdio(
-        self, command: str, args: List[str], server_id: str = ""
+        self,
+        command: str,
+        args: List[str],
+        server_id: str = "",
+        timeout: Optional[float] = None,
     ) -> None:
         """Connect to an MCP server using stdio transport."""
         if not command:
             raise ValueError("Server command is required.")
 
-        server_id = server_id or command
+        async def open_session(exit_stack: AsyncExitStack) -> ClientSession:
+            server_params = StdioServerParameters(command=command, args=args)
+            read, write = await exit_stack.enter_async_context(
+                stdio_client(server_params)
+            )
+            return await exit_stack.enter_async_context(ClientSession(read, write))
 
-        # Always ensure clean disconnection before new connection
-        if server_id in self.sessions:
-            await self.disconnect(server_id)
+        await self._connect(server_id or command, open_session, timeout)
 
-        exit_stack = AsyncExitStack()
-        self.exit_stacks[server_id] = exit_stack
+    def is_connected(self, server_id: str) -> bool:
+        """Whether a server is connected or still connecting."""
+        connection = self._connections.get(server_id)
+        return connection is not None and not connection[0].done()
 
-        server_params = StdioServerParameters(command=command, args=args)
-        stdio_transport = await exit_stack.enter_async_context(
-            stdio_client(server_params)
-        )
-        read, write = stdio_transport
-        session = await exit_stack.enter_async_context(ClientSession(read, write))
-        self.sessions[server_id] = session
+    async def _connect(
+        self,
+        server_id: str,
+        open_session: Callable[[AsyncExitStack], Awaitable[ClientSession]],
+        timeout: Optional[float],
+    ) -> None:
+        """Open a connection in a task that owns it until disconnect.
 
-        await self._initialize_and_list_tools(server_id)
+        The SSE and stdio transports run anyio task groups, which must be
+        closed by the task that opened them. Giving every connection its own
+        task also lets several servers connect concurrently.
+        """
+        # Always ensure clean disconnection before new connection
+        if server_id in self._connections:
+            await self.disconnect(server_id)
 
-    async def _initialize_and_list_tools(self, server_id: str) -> None:
-        """Initialize session and populate tool map."""
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(
+            self._hold_connection(server_id, open_session, ready, stop)
+        )
+        self._connections[server_id] = (task, stop)
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except BaseException:
+            # Don't wait for the transport to shut down; a hung server process
+            # would otherwise hold the caller past its timeout
+            self._connections.pop(server_id, None)
+            ready.cancel()
+            task.cancel()
+            session = self.sessions.get(server_id)
+            if session is not None:
+                self._forget_session(server_id, session)
+            raise
+
+    async def _hold_connection(
+        self,
+        server_id: str,
+        open_session: Callable[[AsyncExitStack], Awaitable[ClientSession]],
+        ready: asyncio.Future,
+        stop: asyncio.Event,
+    ) -> None:
+        """Connect, list tools, then keep the tools in sync until stopped."""
+        session = None
+        try:
+            async with AsyncExitStack() as exit_stack:
+                session = await open_session(exit_stack)
+                self.sessions[server_id] = session
+                notifies = await self._initialize_and_list_tools(server_id)
+                if not ready.done():
+                    ready.set_result(None)
+                await self._watch_tools(server_id, session, notifies, stop)
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.error(f"Connection to MCP server {server_id} closed: {e}")
+        finally:
+            if session is not None:
+                self._forget_session(server_id, session)
+
+    def _forget_session(self, server_id: str, session: ClientSession) -> None:
+        """Drop a closed session and the tools it provided."""
+        if self.sessions.get(server_id) is session:
+            del self.sessions[server_id]
+            self._tool_hashes.pop(server_id, None)
+        tool_map = {k: v for k, v in self.tool_map.items() if v.session is not session}
+        if len(tool_map) != len(self.tool_map):
+            self.tool_map = tool_map
+            self.tools = tuple(tool_map.values())
+            self.tools_version += 1
+
+    async def _initialize_and_list_tools(self, server_id: str) -> bool:
+        """Initialize session and populate tool map.
+
+        Returns whether the server sends tools/list_changed notifications.
+        """
         session = self.sessions.get(server_id)
         if not session:
             raise RuntimeError(f"Session not initialized for server {server_id}")
 
-        await session.initialize()
+        result = await session.initialize()
+        await self._refresh_server_tools(server_id, session)
+        logger.info(
+            f"Connected to server {server_id} with tools: {list(self._tool_hashes.get(server_id, {}))}"
+        )
+        tools_capability = result.capabilities.tools
+        return bool(tools_capability and tools_capability.listChanged)
+
+    @staticmethod
+    def _schema_hash(tool: Tool) -> str:
+        definition = json.dumps(tool.model_dump(mode="json"), sort_keys=True)
+        return hashlib.sha256(definition.encode()).hexdigest()
+
+    async def _refresh_server_tools(
+        self, server_id: str, session: ClientSession
+    ) -> bool:
+        """Re-list one server's tools, rebuilding them only if a hash changed.
+
+        Returns whether the server's tools changed.
+        """
         response = await session.list_tools()
+        hashes = {tool.name: self._schema_hash(tool) for tool in response.tools}
+        if self.sessions.get(server_id) is not session:
+            return False  # Disconnected while listing
+        if hashes == self._tool_hashes.get(server_id):
+            return False
 
+        tool_map = {k: v for k, v in self.tool_map.items() if v.session is not session}
         # Create proper tool objects for each server tool
         for tool in response.tools:
-            original_name = tool.name
-            tool_name = f"mcp_{server_id}_{original_name}"
-            tool_name = self._sanitize_tool_name(tool_name)
-
-            server_tool = MCPClientTool(
+            tool_name = self._sanitize_tool_name(f"mcp_{server_id}_{tool.name}")
+            tool_map[tool_name] = MCPClientTool(
                 name=tool_name,
                 description=tool.description,
                 parameters=tool.inputSchema,
                 session=session,
                 server_id=server_id,
-                original_name=original_name,
+                original_name=tool.name,
+                schema_hash=hashes[tool.name],
             )
-            self.tool_map[tool_name] = server_tool
 
-        # Update tools tuple
-        self.tools = tuple(self.tool_map.values())
-        logger.info(
-            f"Connected to server {server_id} with tools: {[tool.name for tool in response.tools]}"
+        if server_id in self._tool_hashes:
+            logger.info(f"Tools changed on MCP server {server_id}")
+        self._tool_hashes[server_id] = hashes
+        self.tool_map = tool_map
+        self.tools = tuple(tool_map.values())
+        self.tools_version += 1
+        return True
+
+    async def _watch_tools(
+        self,
+        server_id: str,
+        session: ClientSession,
+        notifies: bool,
+        stop: asyncio.Event,
+    ) -> None:
+        """Keep a server's tools in sync until stopped or the server goes away."""
+        changed = asyncio.Event()
+        reader = asyncio.create_task(self._read_notifications(session, changed))
+        syncer = asyncio.create_task(
+            self._sync_tools(server_id, session, changed, notifies)
         )
+        stopped = asyncio.create_task(stop.wait())
+        tasks = (reader, syncer, stopped)
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if reader.done():
+                logger.warning(f"MCP server {server_id} closed the connection")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _read_notifications(
+        session: ClientSession, changed: asyncio.Event
+    ) -> None:
+        """Drain the session's incoming messages, flagging tool list changes.
+
+        The session blocks on undelivered notifications, so they must be read
+        even when unused. Tools are re-listed by `_sync_tools` rather than here,
+        since the response can't arrive while this reader is waiting on it.
+        """
+        async for message in session.incoming_messages:
+            if isinstance(message, ServerNotification) and isinstance(
+                message.root, ToolListChangedNotification
+            ):
+                changed.set()
+            elif isinstance(message, Exception):
+                logger.warning(f"Error from MCP server: {message}")
+
+    async def _sync_tools(
+        self,
+        server_id: str,
+        session: ClientSession,
+        changed: asyncio.Event,
+        notifies: bool,
+    ) -> None:
+        """Re-list tools on change notifications, or poll with backoff.
+
+        Servers that advertise list_changed notifications are never polled.
+        For the others the interval doubles while the tools are unchanged,
+        up to `max_poll_interval`.
+        """
+        interval = self.poll_interval
+        while True:
+            if notifies or self.poll_interval <= 0:
+                await changed.wait()
+            else:
+                try:
+                    await asyncio.wait_for(changed.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+            changed.clear()
+
+            try:
+                updated = await self._refresh_server_tools(server_id, session)
+            except Exception as e:
+                logger.warning(f"Failed to list tools of MCP server {server_id}: {e}")
+                updated = False
+            if updated:
+                interval = self.poll_interval
+            else:
+                interval = min(interval * 2, self.max_poll_interval)
 
     def _sanitize_tool_name(self, name: str) -> str:
         """Sanitize tool name to match MCPClientTool requirements."""
@@ -145,50 +332,34 @@ class MCPClients(ToolCollection):
         return sanitized
 
     async def list_tools(self) -> ListToolsResult:
-        """List all available tools."""
-        tools_result = ListToolsResult(tools=[])
-        for session in self.sessions.values():
-            response = await session.list_tools()
-            tools_result.tools += response.tools
-        return tools_result
+        """List all available tools, querying the servers concurrently."""
+        responses = await asyncio.gather(
+            *(session.list_tools() for session in self.sessions.values())
+        )
+        return ListToolsResult(
+            tools=[tool for response in responses for tool in response.tools]
+        )
 
     async def disconnect(self, server_id: str = "") -> None:
         """Disconnect from a specific MCP server or all servers if no server_id provided."""
         if server_id:
-            if server_id in self.sessions:
+            connection = self._connections.pop(server_id, None)
+            if connection:
+                task, stop = connection
+                # The owning task closes the transport and removes the tools
+                stop.set()
                 try:
-                    exit_stack = self.exit_stacks.get(server_id)
-
-                    # Close the exit stack which will handle session cleanup
-                    if exit_stack:
-                        try:
-                            await exit_stack.aclose()
-                        except RuntimeError as e:
-                            if "cancel scope" in str(e).lower():
-                                logger.warning(
-                                    f"Cancel scope error during disconnect from {server_id}, continuing with cleanup: {e}"
-                                )
-                            else:
-                                raise
-
-                    # Clean up references
-                    self.sessions.pop(server_id, None)
-                    self.exit_stacks.pop(server_id, None)
-
-                    # Remove tools associated with this server
-                    self.tool_map = {
-                        k: v
-                        for k, v in self.tool_map.items()
-                        if v.server_id != server_id
-                    }
-                    self.tools = tuple(self.tool_map.values())
+                    await task
                     logger.info(f"Disconnected from MCP server {server_id}")
                 except Exception as e:
                     logger.error(f"Error disconnecting from server {server_id}: {e}")
         else:
             # Disconnect from all servers in a deterministic order
-            for sid in sorted(list(self.sessions.keys())):
+            for sid in sorted(list(self._connections.keys())):
                 await self.disconnect(sid)
+            if self.tool_map:
+                self.tools_version += 1
             self.tool_map = {}
             self.tools = tuple()
+            self._tool_hashes.clear()
             logger.info("Disconnected from all MCP servers")
@@ -48,6 +48,11 @@ class PlanningTool(BaseTool):
                 "type": "array",
                 "items": {"type": "string"},
             },
+            "step_dependencies": {
+                "description": "Optional list with one entry per step, each a list of 0-based indices of earlier steps that step depends on. Steps whose dependencies are completed may run in parallel. If omitted, steps run in order. Used with create and update commands.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
             "step_index": {
                 "description": "Index of the step to update (0-based). Required for mark_step command.",
                 "type": "integer",
@@ -66,6 +71,8 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
+    parallel_safe: bool = False  # Commands mutate shared plan state
+
     plans: dict = {}  # Dictionary to store plans by plan_id
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
@@ -78,6 +85,7 @@ class PlanningTool(BaseTool):
         plan_id: Optional[str] = None,
         title: Optional[str] = None,
         steps: Optional[List[str]] = None,
+        step_dependencies: Optional[List[List[int]]] = None,
         step_index: Optional[int] = None,
         step_status: Optional[
             Literal["not_started", "in_progress", "completed", "blocked"]
@@ -93,15 +101,16 @@ class PlanningTool(BaseTool):
         - plan_id: Unique identifier for the plan
         - title: Title for the plan (used with create command)
         - steps: List of steps for the plan (used with create command)
+        - step_dependencies: Indices of earlier steps each step depends on (used with create and update commands)
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, step_dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, step_dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -118,7 +127,11 @@ class PlanningTool(BaseTool):
             )
 
     def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Create a new plan with the given ID, title, and steps."""
         if not plan_id:
@@ -141,6 +154,9 @@ class PlanningTool(BaseTool):
                 "Parameter `steps` must be a non-empty list of strings for command: create"
             )
 
+        if step_dependencies is not None:
+            self._validate_dependencies(steps, step_dependencies)
+
         # Create a new plan with initialized step statuses
         plan = {
             "plan_id": plan_id,
@@ -148,6 +164,7 @@ class PlanningTool(BaseTool):
             "steps": steps,
             "step_statuses": ["not_started"] * len(steps),
             "step_notes": [""] * len(steps),
+            "step_dependencies": step_dependencies,
         }
 
         self.plans[plan_id] = plan
@@ -158,7 +175,11 @@ class PlanningTool(BaseTool):
         )
 
     def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Update an existing plan with new title or steps."""
         if not plan_id:
@@ -202,10 +223,42 @@ class PlanningTool(BaseTool):
             plan["step_statuses"] = new_statuses
             plan["step_notes"] = new_notes
 
+            # Drop dependencies that no longer fit the new step list
+            old_dependencies = plan.get("step_dependencies")
+            if step_dependencies is None and old_dependencies is not None:
+                step_dependencies = [
+                    [dep for dep in deps if dep < i]
+                    for i, deps in enumerate(old_dependencies[: len(steps)])
+                ]
+                step_dependencies += [[]] * (len(steps) - len(step_dependencies))
+
+        if step_dependencies is not None:
+            self._validate_dependencies(plan["steps"], step_dependencies)
+            plan["step_dependencies"] = step_dependencies
+
         return ToolResult(
             output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
         )
 
+    @staticmethod
+    def _validate_dependencies(
+        steps: List[str], step_dependencies: List[List[int]]
+    ) -> None:
+        """Validate that each step only depends on earlier steps."""
+        if not isinstance(step_dependencies, list) or len(step_dependencies) != len(
+            steps
+        ):
+            raise ToolError(
+                "Parameter `step_dependencies` must be a list with one entry per step"
+            )
+        for i, deps in enumerate(step_dependencies):
+            if not isinstance(deps, list) or not all(
+                isinstance(dep, int) and 0 <= dep < i for dep in deps
+            ):
+                raise ToolError(
+                    f"Invalid dependencies for step {i}: {deps}. Steps may only depend on earlier steps."
+                )
+
     def _list_plans(self) -> ToolResult:
         """List all available plans."""
         if not self.plans:
@@ -345,7 +398,8 @@ class PlanningTool(BaseTool):
         output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
         output += "Steps:\n"
 
-        # Add each step with its status and notes
+        # Add each step with its status, notes and dependencies
+        dependencies = plan.get("step_dependencies") or [[]] * total_steps
         for i, (step, status, notes) in enumerate(
             zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
         ):
@@ -357,6 +411,8 @@ class PlanningTool(BaseTool):
             }.get(status, "[ ]")
 
             output += f"{i}. {status_symbol} {step}\n"
+            if dependencies[i]:
+                output += f"   Depends on: {', '.join(map(str, dependencies[i]))}\n"
             if notes:
                 output += f"   Notes: {notes}\n"
 
@@ -1,16 +1,262 @@
+import asyncio
+import atexit
+import importlib
 import multiprocessing
+import os
 import sys
+import uuid
 from io import StringIO
-from typing import Dict
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import Field, PrivateAttr, model_validator
 
 from app.tool.base import BaseTool
 
 
+def _new_globals() -> dict:
+    if isinstance(__builtins__, dict):
+        return {"__builtins__": __builtins__}
+    return {"__builtins__": __builtins__.__dict__.copy()}
+
+
+def _run_code(code: str, safe_globals: dict) -> Dict:
+    original_stdout = sys.stdout
+    try:
+        output_buffer = StringIO()
+        sys.stdout = output_buffer
+        exec(code, safe_globals, safe_globals)
+        return {"observation": output_buffer.getvalue(), "success": True}
+    except Exception as e:
+        return {"observation": str(e), "success": False}
+    finally:
+        sys.stdout = original_stdout
+
+
+def _capture_process_state() -> Tuple[str, List[str], Dict[str, str]]:
+    return os.getcwd(), list(sys.path), dict(os.environ)
+
+
+def _restore_process_state(state: Tuple[str, List[str], Dict[str, str]]) -> None:
+    """Undo the cwd, sys.path and environment changes of a stateless call."""
+    cwd, path, environ = state
+    try:
+        os.chdir(cwd)
+    except OSError:
+        pass
+    sys.path[:] = path
+    if os.environ != environ:
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+def _worker_main(conn: Connection, preload: Sequence[str]) -> None:
+    """Worker loop: runs (code, persistent) requests received over the pipe."""
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    baseline = _capture_process_state()
+    conn.send(_READY)
+
+    namespace = None
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        code, persistent = request
+        if persistent:
+            if namespace is None:
+                namespace = _new_globals()
+            safe_globals = namespace
+        else:
+            safe_globals = _new_globals()
+        result = _run_code(code, safe_globals)
+        if not persistent:
+            _restore_process_state(baseline)
+        conn.send(result)
+
+
+_READY = "ready"
+
+
+class PythonWorker:
+    """A pre-started worker process connected through a pipe.
+
+    The worker reports when it has finished pre-importing, and call timeouts
+    only start counting from then, so a cold start is not charged to the
+    first snippet.
+    """
+
+    # Upper bound on process spawn plus pre-imports
+    startup_timeout: float = 60.0
+
+    def __init__(self, preload: Sequence[str]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, tuple(preload)), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    async def run(self, code: str, timeout: float, persistent: bool = False) -> Dict:
+        """Runs code in the worker, raising TimeoutError if it does not finish."""
+        self.conn.send((code, persistent))
+        if not self.ready:
+            if not await asyncio.to_thread(self.conn.poll, self.startup_timeout):
+                raise TimeoutError
+            self.conn.recv()  # The ready message
+            self.ready = True
+        if not await asyncio.to_thread(self.conn.poll, timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(1)
+                if self.process.is_alive():
+                    self.process.kill()
+                    self.process.join()
+
+
+class PythonWorkerPool:
+    """Pool of pre-forked Python workers with heavy modules pre-imported.
+
+    Stateless calls are served by any idle worker, each with fresh globals;
+    the worker's cwd, sys.path and environment are restored after each
+    call, but changes to already imported modules persist in that worker.
+    Calls for a session are pinned to a dedicated worker whose globals
+    persist until the session is closed. Workers are killed and replaced
+    when a call times out or crashes them.
+
+    When no worker is idle, one is spawned for the call and the pool is
+    topped back up to `size` workers once the call has started. Workers
+    beyond `size` are killed when released.
+    """
+
+    def __init__(self, size: int = 2, preload: Sequence[str] = ("numpy", "pandas")):
+        self.size = size
+        self.preload = tuple(preload)
+        self._idle: List[PythonWorker] = []
+        self._sessions: Dict[str, PythonWorker] = {}
+        self._busy = 0
+        self._refill_handle: Optional[asyncio.Handle] = None
+
+    def _spawn(self) -> PythonWorker:
+        return PythonWorker(self.preload)
+
+    def _acquire(self) -> PythonWorker:
+        self._idle = [worker for worker in self._idle if worker.is_alive()]
+        # Oldest first, so freshly spawned workers get time to pre-import
+        worker = self._idle.pop(0) if self._idle else self._spawn()
+        self._busy += 1
+        self._schedule_refill()
+        return worker
+
+    def _release(self, worker: PythonWorker) -> None:
+        self._busy -= 1
+        if len(self._idle) < self.size:
+            self._idle.append(worker)
+        else:
+            worker.kill()
+
+    def _schedule_refill(self) -> None:
+        """Tops the pool up to `size` workers after the current call has started."""
+        if self._refill_handle is None:
+            self._refill_handle = asyncio.get_running_loop().call_soon(self._refill)
+
+    def _refill(self) -> None:
+        self._refill_handle = None
+        while len(self._idle) + self._busy < self.size:
+            self._idle.append(self._spawn())
+
+    async def run(
+        self, code: str, timeout: float, session_id: Optional[str] = None
+    ) -> Dict:
+        """Runs code in a worker and returns its observation and success status."""
+        if session_id:
+            worker = self._sessions.get(session_id)
+            if worker is None or not worker.is_alive():
+                worker = self._sessions[session_id] = self._spawn()
+        else:
+            worker = self._acquire()
+
+        try:
+            result = await worker.run(code, timeout, persistent=bool(session_id))
+        except TimeoutError:
+            result = {
+                "observation": f"Execution timeout after {timeout} seconds",
+                "success": False,
+            }
+        except (EOFError, OSError) as e:
+            result = {"observation": f"Python worker crashed: {e}", "success": False}
+        except asyncio.CancelledError:
+            self._discard(worker, session_id)
+            raise
+        else:
+            if not session_id:
+                self._release(worker)
+            return result
+
+        self._discard(worker, session_id)
+        return result
+
+    def _discard(self, worker: PythonWorker, session_id: Optional[str]) -> None:
+        """Kills a stuck or dead worker and replaces it, dropping session state."""
+        worker.kill()
+        if session_id:
+            self._sessions.pop(session_id, None)
+        else:
+            self._busy -= 1
+            self._schedule_refill()
+
+    def close_session(self, session_id: str) -> None:
+        """Stops the worker holding a session's namespace."""
+        worker = self._sessions.pop(session_id, None)
+        if worker:
+            worker.kill()
+
+    def shutdown(self) -> None:
+        for worker in self._idle + list(self._sessions.values()):
+            worker.kill()
+        self._idle.clear()
+        self._sessions.clear()
+        if self._refill_handle:
+            self._refill_handle.cancel()
+            self._refill_handle = None
+
+
+_WORKER_POOL: Optional[PythonWorkerPool] = None
+
+
+def get_worker_pool() -> PythonWorkerPool:
+    """Returns the process-wide worker pool, starting it on first use."""
+    global _WORKER_POOL
+    if _WORKER_POOL is None:
+        _WORKER_POOL = PythonWorkerPool()
+        atexit.register(_WORKER_POOL.shutdown)
+    return _WORKER_POOL
+
+
 class PythonExecute(BaseTool):
     """A tool for executing Python code with timeout and safety restrictions."""
 
     name: str = "python_execute"
-    description: str = "Executes Python code string. Note: Only print outputs are visible, function return values are not captured. Use print statements to see results."
+    description: str = "Executes Python code string. Note: Only print outputs are visible, function return values are not captured. Use print statements to see results. Calls share worker processes, so avoid modifying imported modules."
     parameters: dict = {
         "type": "object",
         "properties": {
@@ -21,20 +267,19 @@ class PythonExecute(BaseTool):
         },
         "required": ["code"],
     }
+    persistent_namespace: bool = Field(
+        False,
+        description="Keep variables between calls of this tool instance in a dedicated worker",
+    )
 
-    def _run_code(self, code: str, result_dict: dict, safe_globals: dict) -> None:
-        original_stdout = sys.stdout
-        try:
-            output_buffer = StringIO()
-            sys.stdout = output_buffer
-            exec(code, safe_globals, safe_globals)
-            result_dict["observation"] = output_buffer.getvalue()
-            result_dict["success"] = True
-        except Exception as e:
-            result_dict["observation"] = str(e)
-            result_dict["success"] = False
-        finally:
-            sys.stdout = original_stdout
+    _session_id: str = PrivateAttr(default_factory=lambda: uuid.uuid4().hex)
+
+    @model_validator(mode="after")
+    def _serialize_stateful_calls(self) -> "PythonExecute":
+        # Calls sharing a namespace depend on each other's order
+        if self.persistent_namespace:
+            self.parallel_safe = False
+        return self
 
     async def execute(
         self,
@@ -51,25 +296,10 @@ class PythonExecute(BaseTool):
         Returns:
             Dict: Contains 'output' with execution output or error message and 'success' status.
         """
+        session_id = self._session_id if self.persistent_namespace else None
+        return await get_worker_pool().run(code, timeout, session_id=session_id)
 
-        with multiprocessing.Manager() as manager:
-            result = manager.dict({"observation": "", "success": False})
-            if isinstance(__builtins__, dict):
-                safe_globals = {"__builtins__": __builtins__}
-            else:
-                safe_globals = {"__builtins__": __builtins__.__dict__.copy()}
-            proc = multiprocessing.Process(
-                target=self._run_code, args=(code, result, safe_globals)
-            )
-            proc.start()
-            proc.join(timeout)
-
-            # timeout process
-            if proc.is_alive():
-                proc.terminate()
-                proc.join(1)
-                return {
-                    "observation": f"Execution timeout after {timeout} seconds",
-                    "success": False,
-                }
-            return dict(result)
+    async def cleanup(self) -> None:
+        """Releases the worker holding this tool's namespace."""
+        if self.persistent_namespace and _WORKER_POOL is not None:
+            _WORKER_POOL.close_session(self._session_id)
@@ -1,13 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
+from urllib.parse import quote_plus
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 from app.logger import logger
 from app.tool.search.base import SearchItem, WebSearchEngine
 
 
 ABSTRACT_MAX_LENGTH = 300
+RESULTS_PER_PAGE = 10
+MAX_PARALLEL_PAGES = 5
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/68.0.3440.106 Safari/537.36",
@@ -43,11 +48,17 @@ class BingSearchEngine(WebSearchEngine):
         super().__init__(**data)
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_maxsize=MAX_PARALLEL_PAGES)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _search_sync(self, query: str, num_results: int = 10) -> List[SearchItem]:
         """
         Synchronous Bing search implementation to retrieve search results.
 
+        Result pages are requested concurrently using their `first=` offsets,
+        then merged in rank order and deduplicated by URL.
+
         Args:
             query (str): The search query to submit to Bing.
             num_results (int, optional): Maximum number of results to return. Defaults to 10.
@@ -59,23 +70,50 @@ class BingSearchEngine(WebSearchEngine):
             return []
 
         list_result = []
-        first = 1
-        next_url = BING_SEARCH_URL + query
+        seen_urls = set()
+        page = 0
 
         while len(list_result) < num_results:
-            data, next_url = self._parse_html(
-                next_url, rank_start=len(list_result), first=first
+            # Bing pages are not always full, so top up in further batches
+            missing = num_results - len(list_result)
+            batch = range(
+                page, page + min(-(-missing // RESULTS_PER_PAGE), MAX_PARALLEL_PAGES)
             )
-            if data:
-                list_result.extend(data)
-            if not next_url:
+            page += len(batch)
+            pages = self._fetch_pages(query, batch)
+            found = len(list_result)
+
+            for data, _ in pages:
+                for item in data:
+                    if item.url not in seen_urls:
+                        seen_urls.add(item.url)
+                        list_result.append(item)
+
+            # Stop once Bing runs out of pages or only repeats earlier results
+            if len(list_result) == found or any(
+                not data or not next_url for data, next_url in pages
+            ):
                 break
-            first += 10
 
         return list_result[:num_results]
 
+    def _fetch_pages(
+        self, query: str, pages: range
+    ) -> List[Tuple[List[SearchItem], Optional[str]]]:
+        """Fetch and parse result pages concurrently, in page order."""
+        urls = [
+            f"{BING_SEARCH_URL}{quote_plus(query)}&first={page * RESULTS_PER_PAGE + 1}"
+            for page in pages
+        ]
+        rank_starts = [page * RESULTS_PER_PAGE for page in pages]
+        if len(urls) == 1:
+            return [self._parse_html(urls[0], rank_starts[0])]
+
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            return list(executor.map(self._parse_html, urls, rank_starts))
+
     def _parse_html(
-        self, url: str, rank_start: int = 0, first: int = 1
+        self, url: str, rank_start: int = 0
     ) -> Tuple[List[SearchItem], str]:
         """
         Parse Bing search result HTML to extract search results and the next page URL.
@@ -12,6 +12,7 @@ from app.tool.file_operators import (
     FileOperator,
     LocalFileOperator,
     PathLike,
+    PathType,
     SandboxFileOperator,
 )
 
@@ -98,6 +99,8 @@ class StrReplaceEditor(BaseTool):
         },
         "required": ["command", "path"],
     }
+    parallel_safe: bool = False  # Edits may depend on earlier edits
+
     _file_history: DefaultDict[PathLike, List[str]] = defaultdict(list)
     _local_operator: LocalFileOperator = LocalFileOperator()
     _sandbox_operator: SandboxFileOperator = SandboxFileOperator()
@@ -128,11 +131,13 @@ class StrReplaceEditor(BaseTool):
         operator = self._get_operator()
 
         # Validate path and command combination
-        await self.validate_path(command, Path(path), operator)
+        path_type = await self.validate_path(command, Path(path), operator)
 
         # Execute the appropriate command
         if command == "view":
-            result = await self.view(path, view_range, operator)
+            result = await self.view(
+                path, view_range, operator, is_dir=path_type == "directory"
+            )
         elif command == "create":
             if file_text is None:
                 raise ToolError("Parameter `file_text` is required for command: create")
@@ -165,43 +170,50 @@ class StrReplaceEditor(BaseTool):
 
     async def validate_path(
         self, command: str, path: Path, operator: FileOperator
-    ) -> None:
-        """Validate path and command combination based on execution environment."""
+    ) -> Optional[PathType]:
+        """Validate path and command combination based on execution environment.
+
+        Returns the path type so callers don't have to query it again.
+        """
         # Check if path is absolute
         if not path.is_absolute():
             raise ToolError(f"The path {path} is not an absolute path")
 
+        # Existence and type are resolved in a single operator call
+        path_type = await operator.get_path_type(path)
+
         # Only check if path exists for non-create commands
         if command != "create":
-            if not await operator.exists(path):
+            if path_type is None:
                 raise ToolError(
                     f"The path {path} does not exist. Please provide a valid path."
                 )
 
             # Check if path is a directory
-            is_dir = await operator.is_directory(path)
-            if is_dir and command != "view":
+            if path_type == "directory" and command != "view":
                 raise ToolError(
                     f"The path {path} is a directory and only the `view` command can be used on directories"
                 )
 
         # Check if file exists for create command
-        elif command == "create":
-            exists = await operator.exists(path)
-            if exists:
-                raise ToolError(
-                    f"File already exists at: {path}. Cannot overwrite files using command `create`."
-                )
+        elif path_type is not None:
+            raise ToolError(
+                f"File already exists at: {path}. Cannot overwrite files using command `create`."
+            )
+
+        return path_type
 
     async def view(
         self,
         path: PathLike,
         view_range: Optional[List[int]] = None,
         operator: FileOperator = None,
+        is_dir: Optional[bool] = None,
     ) -> CLIResult:
         """Display file or directory content."""
         # Determine if path is a directory
-        is_dir = await operator.is_directory(path)
+        if is_dir is None:
+            is_dir = await operator.is_directory(path)
 
         if is_dir:
             # Directory handling
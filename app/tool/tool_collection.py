@@ -1,11 +1,24 @@
 """Collection classes for managing multiple tools."""
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from app.exceptions import ToolError
 from app.logger import logger
 from app.tool.base import BaseTool, ToolFailure, ToolResult
 
 
+class ToolParams(list):
+    """Serialized tool schemas, with their token cost per tokenizer.
+
+    An LLM records the cost under its tokenizer's name the first time the
+    list is sent, so an unchanged tool set is only tokenized once per
+    tokenizer, even when LLMs with different encodings share it.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.token_counts: Dict[str, int] = {}
+
+
 class ToolCollection:
     """A collection of defined tools."""
 
@@ -19,8 +32,24 @@ class ToolCollection:
     def __iter__(self):
         return iter(self.tools)
 
+    @property
+    def tools(self) -> Tuple[BaseTool, ...]:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: Tuple[BaseTool, ...]) -> None:
+        # Any change to the tool set invalidates the serialized schemas
+        self._tools = tools
+        self._params = None
+
     def to_params(self) -> List[Dict[str, Any]]:
-        return [tool.to_param() for tool in self.tools]
+        """Return the tool schemas, serialized once per tool set.
+
+        The returned list is shared between calls and must not be mutated.
+        """
+        if self._params is None:
+            self._params = ToolParams(tool.to_param() for tool in self.tools)
+        return self._params
 
     async def execute(
         self, *, name: str, tool_input: Dict[str, Any] = None
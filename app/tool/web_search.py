@@ -1,12 +1,15 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.config import config
+from app.cache import TieredCache, make_cache_key
+from app.config import PROJECT_ROOT, SearchSettings, config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.search import (
@@ -19,6 +22,9 @@ from app.tool.search import (
 from app.tool.search.base import SearchItem
 
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
 class SearchResult(BaseModel):
     """Represents a single search result returned by a search engine."""
 
@@ -48,6 +54,20 @@ class SearchMetadata(BaseModel):
     total_results: int = Field(description="Total number of results found")
     language: str = Field(description="Language code used for the search")
     country: str = Field(description="Country code used for the search")
+    engine: Optional[str] = Field(
+        default=None, description="The search engine that answered the query"
+    )
+    cached: bool = Field(
+        default=False, description="Whether the results came from the search cache"
+    )
+    cache_hits: int = Field(default=0, description="Search cache hits so far")
+    cache_misses: int = Field(default=0, description="Search cache misses so far")
+    content_cache_hits: int = Field(
+        default=0, description="Page content cache hits so far"
+    )
+    content_cache_misses: int = Field(
+        default=0, description="Page content cache misses so far"
+    )
 
 
 class SearchResponse(ToolResult):
@@ -98,59 +118,241 @@ class SearchResponse(ToolResult):
                     f"- Country: {self.metadata.country}",
                 ]
             )
+            if self.metadata.engine:
+                result_text.append(f"- Engine: {self.metadata.engine}")
 
         self.output = "\n".join(result_text)
         return self
 
 
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+def extract_text(html: str, max_chars: int = 10000) -> Optional[str]:
+    """Extract the readable text of an HTML page."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove script and style elements
+    for script in soup(["script", "style", "header", "footer", "nav"]):
+        script.extract()
+
+    # Get text content and clean up whitespace
+    text = soup.get_text(separator="\n", strip=True)
+    text = " ".join(text.split())
+    return text[:max_chars] if text else None
+
+
 class WebContentFetcher:
-    """Utility class for fetching web content."""
+    """Async fetcher for web page content over a shared connection pool."""
 
-    @staticmethod
-    async def fetch_content(url: str, timeout: int = 10) -> Optional[str]:
+    def __init__(
+        self,
+        max_connections: int = 20,
+        per_host_limit: int = 4,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_chars: int = 10000,
+    ):
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._client_loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _download(self, url: str) -> Optional[str]:
+        """Stream an HTML page, stopping at `max_bytes`."""
+        client = self._get_client()
+        async with self._host_limit(url):
+            async with client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    logger.warning(
+                        f"Failed to fetch content from {url}: HTTP {response.status_code}"
+                    )
+                    return None
+
+                # Skip PDFs, images and other binaries before downloading them
+                content_type = response.headers.get("content-type", "")
+                mime_type = content_type.split(";")[0].strip().lower()
+                if mime_type and mime_type not in HTML_CONTENT_TYPES:
+                    logger.info(f"Skipping {url}: unsupported content type {mime_type}")
+                    return None
+
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes :]
+                        break
+                return body.decode(response.encoding or "utf-8", errors="replace")
+
+    async def fetch_content(self, url: str, timeout: int = 10) -> Optional[str]:
         """
         Fetch and extract the main content from a webpage.
 
         Args:
             url: The URL to fetch content from
-            timeout: Request timeout in seconds
+            timeout: Overall timeout in seconds, including the wait for a connection
 
         Returns:
             Extracted text content or None if fetching fails
         """
-        headers = {
-            "WebSearch": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-
         try:
-            # Use asyncio to run requests in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: requests.get(url, headers=headers, timeout=timeout)
-            )
-
-            if response.status_code != 200:
-                logger.warning(
-                    f"Failed to fetch content from {url}: HTTP {response.status_code}"
-                )
+            html = await asyncio.wait_for(self._download(url), timeout)
+            if not html:
                 return None
 
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Parse off the event loop so large pages don't stall other tasks
+            return await asyncio.to_thread(extract_text, html, self.max_chars)
 
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
+        except Exception as e:
+            logger.warning(f"Error fetching content from {url}: {e!r}")
+            return None
 
-            # Get text content
-            text = soup.get_text(separator="\n", strip=True)
+    async def close(self) -> None:
+        """Close the pooled client if it belongs to the running event loop."""
+        client, self._client = self._client, None
+        if client is not None and self._client_loop is asyncio.get_running_loop():
+            await client.aclose()
 
-            # Clean up whitespace and limit size (100KB max)
-            text = " ".join(text.split())
-            return text[:10000] if text else None
 
-        except Exception as e:
-            logger.warning(f"Error fetching content from {url}: {e}")
-            return None
+def _create_cache(
+    max_entries: int, ttl: int, path: Optional[str]
+) -> Optional[TieredCache]:
+    if max_entries <= 0 or ttl <= 0:
+        return None
+    return TieredCache.create(
+        max_entries=max_entries, ttl=ttl, path=PROJECT_ROOT / path if path else None
+    )
+
+
+_SEARCH_CACHES: Optional[Tuple[Optional[TieredCache], Optional[TieredCache]]] = None
+
+
+def get_search_caches() -> Tuple[Optional[TieredCache], Optional[TieredCache]]:
+    """Returns the process-wide (search results, page content) caches.
+
+    They are shared by every WebSearch instance, so agents issuing the same
+    query reuse each other's results. A cache is None when disabled.
+    """
+    global _SEARCH_CACHES
+    if _SEARCH_CACHES is None:
+        settings = config.search_config or SearchSettings()
+        _SEARCH_CACHES = (
+            _create_cache(settings.cache_size, settings.cache_ttl, settings.cache_path),
+            _create_cache(
+                settings.content_cache_size,
+                settings.content_cache_ttl,
+                settings.content_cache_path,
+            ),
+        )
+    return _SEARCH_CACHES
+
+
+_CONTENT_FETCHER: Optional[WebContentFetcher] = None
+
+
+def get_content_fetcher() -> WebContentFetcher:
+    """Returns the process-wide content fetcher.
+
+    Every WebSearch instance, including the one owned by BrowserUseTool, shares
+    its connection pool. Entrypoints close it on shutdown.
+    """
+    global _CONTENT_FETCHER
+    if _CONTENT_FETCHER is None:
+        _CONTENT_FETCHER = WebContentFetcher()
+    return _CONTENT_FETCHER
+
+
+class EngineLatencyStats:
+    """Rolling per-engine latency samples, used to tune the hedge delay.
+
+    Engines with fewer than `min_samples` samples are treated as answering
+    in the configured hedge delay.
+    """
+
+    def __init__(self, window: int = 100, min_samples: int = 5):
+        self.latencies: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.min_samples = min_samples
+
+    def record(self, engine: str, latency: float, success: bool) -> None:
+        self.latencies[engine].append(latency)
+        if not success:
+            self.failures[engine] += 1
+
+    def expected_latency(self, engine: str, default: float) -> float:
+        """Return the engine's p50 latency, or `default` without enough samples"""
+        samples = self.latencies.get(engine)
+        if not samples or len(samples) < self.min_samples:
+            return default
+        return sorted(samples)[len(samples) // 2]
+
+    def hedge_delay(self, engine: str, max_delay: float) -> float:
+        """Seconds to wait on an engine before hedging, capped at `max_delay`"""
+        return min(self.expected_latency(engine, max_delay), max_delay)
+
+    def rank(self, engines: List[str], default: float) -> List[str]:
+        """Order fallbacks by failure rate and p50 latency.
+
+        The first (preferred) engine keeps its place. Fallbacks that fail more
+        often than they succeed go last; the others are ordered by expected
+        latency, with unmeasured engines keeping their configured order.
+        """
+
+        def score(engine: str) -> Tuple[bool, float]:
+            samples = len(self.latencies.get(engine) or ())
+            mostly_failing = (
+                samples >= self.min_samples
+                and self.failures.get(engine, 0) * 2 > samples
+            )
+            return mostly_failing, self.expected_latency(engine, default)
+
+        return engines[:1] + sorted(engines[1:], key=score)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return sample count, failures and p50/p90 latency per engine"""
+        stats = {}
+        for engine, samples in self.latencies.items():
+            ordered = sorted(samples)
+            stats[engine] = {
+                "count": len(ordered),
+                "failures": self.failures[engine],
+                "p50": ordered[len(ordered) // 2],
+                "p90": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+            }
+        return stats
+
+
+engine_latency = EngineLatencyStats()
 
 
 class WebSearch(BaseTool):
@@ -196,7 +398,9 @@ class WebSearch(BaseTool):
         "duckduckgo": DuckDuckGoSearchEngine(),
         "bing": BingSearchEngine(),
     }
-    content_fetcher: WebContentFetcher = WebContentFetcher()
+    content_fetcher: WebContentFetcher = Field(
+        default_factory=get_content_fetcher, exclude=True
+    )
 
     async def execute(
         self,
@@ -248,25 +452,35 @@ class WebSearch(BaseTool):
 
         search_params = {"lang": lang, "country": country}
 
+        # Entries are keyed by the preferred engine; each cached result keeps
+        # the engine that actually answered in its `source`
+        search_cache, _ = get_search_caches()
+        cache_key = make_cache_key(
+            self._get_engine_order()[0], query, lang, country, num_results
+        )
+        cached = search_cache.get(cache_key) if search_cache else None
+        if cached:
+            results = [SearchResult(**result) for result in cached]
+            logger.info(f"🔎 Using cached {results[0].source} results for '{query}'")
+            return await self._build_response(
+                query,
+                results,
+                search_params,
+                fetch_content,
+                cached=True,
+            )
+
         # Try searching with retries when all engines fail
         for retry_count in range(max_retries + 1):
             results = await self._try_all_engines(query, num_results, search_params)
 
             if results:
-                # Fetch content if requested
-                if fetch_content:
-                    results = await self._fetch_content_for_results(results)
-
-                # Return a successful structured response
-                return SearchResponse(
-                    status="success",
-                    query=query,
-                    results=results,
-                    metadata=SearchMetadata(
-                        total_results=len(results),
-                        language=lang,
-                        country=country,
-                    ),
+                if search_cache:
+                    search_cache.set(
+                        cache_key, [result.model_dump() for result in results]
+                    )
+                return await self._build_response(
+                    query, results, search_params, fetch_content
                 )
 
             if retry_count < max_retries:
@@ -287,21 +501,63 @@ class WebSearch(BaseTool):
             results=[],
         )
 
+    async def _build_response(
+        self,
+        query: str,
+        results: List[SearchResult],
+        search_params: Dict[str, Any],
+        fetch_content: bool,
+        cached: bool = False,
+    ) -> SearchResponse:
+        """Build a successful response, fetching page content if requested."""
+        if fetch_content:
+            results = await self._fetch_content_for_results(results)
+
+        search_cache, content_cache = get_search_caches()
+        search_stats = search_cache.stats() if search_cache else {}
+        content_stats = content_cache.stats() if content_cache else {}
+        return SearchResponse(
+            status="success",
+            query=query,
+            results=results,
+            metadata=SearchMetadata(
+                total_results=len(results),
+                language=search_params["lang"],
+                country=search_params["country"],
+                engine=results[0].source if results else None,
+                cached=cached,
+                cache_hits=search_stats.get("hits", 0),
+                cache_misses=search_stats.get("misses", 0),
+                content_cache_hits=content_stats.get("hits", 0),
+                content_cache_misses=content_stats.get("misses", 0),
+            ),
+        )
+
     async def _try_all_engines(
         self, query: str, num_results: int, search_params: Dict[str, Any]
     ) -> List[SearchResult]:
         """Try all search engines in the configured order."""
         engine_order = self._get_engine_order()
+        hedge_delay = config.search_config.hedge_delay if config.search_config else None
+        if hedge_delay is not None:
+            return await self._race_engines(
+                engine_latency.rank(engine_order, hedge_delay),
+                query,
+                num_results,
+                search_params,
+                hedge_delay,
+            )
+
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-            search_items = await self._perform_search_with_engine(
-                engine, query, num_results, search_params
+            search_items = await self._search_with_engine(
+                engine_name, query, num_results, search_params
             )
 
             if not search_items:
+                failed_engines.append(engine_name.capitalize())
                 continue
 
             if failed_engines:
@@ -309,23 +565,112 @@ class WebSearch(BaseTool):
                     f"Search successful with {engine_name.capitalize()} after trying: {', '.join(failed_engines)}"
                 )
 
-            # Transform search items into structured results
-            return [
-                SearchResult(
-                    position=i + 1,
-                    url=item.url,
-                    title=item.title
-                    or f"Result {i+1}",  # Ensure we always have a title
-                    description=item.description or "",
-                    source=engine_name,
-                )
-                for i, item in enumerate(search_items)
-            ]
+            return self._to_results(engine_name, search_items)
 
         if failed_engines:
             logger.error(f"All search engines failed: {', '.join(failed_engines)}")
         return []
 
+    async def _race_engines(
+        self,
+        engine_order: List[str],
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+        hedge_delay: float,
+    ) -> List[SearchResult]:
+        """Run engines as a hedged race and return the first non-empty result.
+
+        The next engine starts when the running ones have not answered within
+        the p50 latency of the last started engine (at most `hedge_delay`
+        seconds), or as soon as one of them fails. Remaining searches are
+        cancelled once a winner is found.
+
+        Engines are synchronous and run in executor threads, so cancelling a
+        losing search only stops waiting for it: a request already sent is
+        not aborted and its thread runs to completion.
+        """
+        remaining = list(engine_order)
+        pending: Dict[asyncio.Task, str] = {}
+        delay = hedge_delay
+
+        def launch_next() -> None:
+            nonlocal delay
+            engine_name = remaining.pop(0)
+            delay = engine_latency.hedge_delay(engine_name, hedge_delay)
+            logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
+            task = asyncio.create_task(
+                self._search_with_engine(engine_name, query, num_results, search_params)
+            )
+            pending[task] = engine_name
+
+        launch_next()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    engine_name = pending.pop(task)
+                    search_items = task.result()
+                    if search_items:
+                        return self._to_results(engine_name, search_items)
+
+                # Hedge on timeout, and replace every engine that came back empty
+                for _ in range(max(len(done), 1)):
+                    if remaining:
+                        launch_next()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        logger.error(f"All search engines failed: {', '.join(engine_order)}")
+        return []
+
+    async def _search_with_engine(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchItem]:
+        """Search with one engine, recording its latency. Returns [] on failure.
+
+        Searches cancelled after losing a race are not recorded: their elapsed
+        time only says the engine was slower than the winner.
+        """
+        start = time.perf_counter()
+        try:
+            search_items = await self._perform_search_with_engine(
+                self._search_engine[engine_name], query, num_results, search_params
+            )
+        except Exception as e:
+            logger.warning(f"{engine_name.capitalize()} search failed: {e}")
+            search_items = []
+        engine_latency.record(
+            engine_name, time.perf_counter() - start, bool(search_items)
+        )
+        return search_items
+
+    @staticmethod
+    def _to_results(
+        engine_name: str, search_items: List[SearchItem]
+    ) -> List[SearchResult]:
+        """Transform search items into structured results."""
+        return [
+            SearchResult(
+                position=i + 1,
+                url=item.url,
+                title=item.title or f"Result {i+1}",  # Ensure we always have a title
+                description=item.description or "",
+                source=engine_name,
+            )
+            for i, item in enumerate(search_items)
+        ]
+
     async def _fetch_content_for_results(
         self, results: List[SearchResult]
     ) -> List[SearchResult]:
@@ -352,7 +697,12 @@ class WebSearch(BaseTool):
     async def _fetch_single_result_content(self, result: SearchResult) -> SearchResult:
         """Fetch content for a single search result."""
         if result.url:
-            content = await self.content_fetcher.fetch_content(result.url)
+            _, content_cache = get_search_caches()
+            content = content_cache.get(result.url) if content_cache else None
+            if content is None:
+                content = await self.content_fetcher.fetch_content(result.url)
+                if content and content_cache:
+                    content_cache.set(result.url, content)
             if content:
                 result.raw_content = content
         return result
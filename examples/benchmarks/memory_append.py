@@ -0,0 +1,66 @@
+"""
+Microbenchmark for appending to agent memory over long histories.
+
+Compares the previous list-based trimming (rebuilding the list on every
+append once `max_messages` is exceeded) with the deque-backed Memory.
+
+Usage:
+    python -m examples.benchmarks.memory_append --messages 10000
+"""
+import argparse
+import time
+from typing import Callable, List
+
+from app.schema import Memory, Message
+
+
+def list_memory(messages: List[Message], max_messages: int) -> None:
+    history: List[Message] = []
+    for message in messages:
+        history.append(message)
+        if len(history) > max_messages:
+            history = history[-max_messages:]
+
+
+def buffer_memory(messages: List[Message], max_messages: int) -> None:
+    memory = Memory(max_messages=max_messages)
+    for message in messages:
+        memory.add_message(message)
+
+
+def agent_style(messages: List[Message], max_messages: int) -> None:
+    # Mirrors `agent.messages += [msg]`, which assigns the buffer back
+    memory = Memory(max_messages=max_messages)
+    for message in messages:
+        memory.messages += [message]
+
+
+def timed(func: Callable, messages: List[Message], max_messages: int) -> float:
+    start = time.perf_counter()
+    func(messages, max_messages)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    messages = [Message.user_message(f"message {i}") for i in range(args.messages)]
+    for max_messages in (100, 1_000, args.messages):
+        for name, func in (
+            ("list trim", list_memory),
+            ("MessageBuffer", buffer_memory),
+            ("agent +=", agent_style),
+        ):
+            best = min(timed(func, messages, max_messages) for _ in range(args.repeat))
+            print(
+                f"max_messages={max_messages:<6} {name:14} "
+                f"total={best * 1000:8.2f}ms "
+                f"per_append={best / args.messages * 1e6:6.2f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Microbenchmark for per-command latency of sandbox terminal sessions.
+
+Runs trivial commands through a DockerSandbox terminal session and reports
+latency percentiles. Requires a running Docker daemon.
+
+Usage:
+    python -m examples.benchmarks.sandbox_exec_latency --runs 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.config import SandboxSettings
+from app.sandbox.core.sandbox import DockerSandbox
+
+
+COMMANDS = ["echo hello", "true", "pwd"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def bench(runs: int, warmup: int, image: str) -> None:
+    sandbox = DockerSandbox(SandboxSettings(image=image))
+    await sandbox.create()
+    try:
+        for command in COMMANDS:
+            for _ in range(warmup):
+                await sandbox.run_command(command)
+
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await sandbox.run_command(command)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            print(
+                f"{command!r:14} runs={runs} "
+                f"mean={statistics.mean(samples):.2f}ms "
+                f"p50={percentile(samples, 50):.2f}ms "
+                f"p95={percentile(samples, 95):.2f}ms "
+                f"max={max(samples):.2f}ms"
+            )
+    finally:
+        await sandbox.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100, help="Timed runs per command")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed warmup runs")
+    parser.add_argument("--image", default="python:3.12-slim", help="Sandbox image")
+    args = parser.parse_args()
+    asyncio.run(bench(args.runs, args.warmup, args.image))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,11 @@ import argparse
 import asyncio
 
 from app.agent.manus import Manus
+from app.config import config
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
+from app.tool.browser_pool import get_browser_pool
+from app.tool.web_search import get_content_fetcher
 
 
 async def main():
@@ -16,6 +20,9 @@ async def main():
     # Create and initialize Manus agent
     agent = await Manus.create()
     try:
+        if config.sandbox.use_sandbox:
+            await SANDBOX_CLIENT.warm()
+
         # Use command line prompt if provided, otherwise ask for input
         prompt = args.prompt if args.prompt else input("Enter your prompt: ")
         if not prompt.strip():
@@ -30,6 +37,11 @@ async def main():
     finally:
         # Ensure agent resources are cleaned up before exiting
         await agent.cleanup()
+        await SANDBOX_CLIENT.shutdown()
+        browser_pool = get_browser_pool()
+        if browser_pool is not None:
+            await browser_pool.cleanup()
+        await get_content_fetcher().close()
 
 
 if __name__ == "__main__":
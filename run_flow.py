@@ -6,6 +6,9 @@ from app.agent.manus import Manus
 from app.config import config
 from app.flow.flow_factory import FlowFactory, FlowType
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
+from app.tool.browser_pool import get_browser_pool
+from app.tool.web_search import get_content_fetcher
 
 
 async def run_flow():
@@ -15,6 +18,9 @@ async def run_flow():
     if config.run_flow_config.use_data_analysis_agent:
         agents["data_analysis"] = DataAnalysis()
     try:
+        if config.sandbox.use_sandbox:
+            await SANDBOX_CLIENT.warm()
+
         prompt = input("Enter your prompt: ")
 
         if prompt.strip().isspace() or not prompt:
@@ -46,6 +52,12 @@ async def run_flow():
         logger.info("Operation cancelled by user.")
     except Exception as e:
         logger.error(f"Error: {str(e)}")
+    finally:
+        await SANDBOX_CLIENT.shutdown()
+        browser_pool = get_browser_pool()
+        if browser_pool is not None:
+            await browser_pool.cleanup()
+        await get_content_fetcher().close()
 
 
 if __name__ == "__main__":
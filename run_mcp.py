@@ -6,6 +6,7 @@ import sys
 from app.agent.mcp import MCPAgent
 from app.config import config
 from app.logger import logger
+from app.sandbox.client import SANDBOX_CLIENT
 
 
 class MCPRunner:
@@ -63,6 +64,7 @@ class MCPRunner:
     async def cleanup(self) -> None:
         """Clean up agent resources."""
         await self.agent.cleanup()
+        await SANDBOX_CLIENT.shutdown()
         logger.info("Session ended")
 
 
@@ -95,6 +97,8 @@ async def run_mcp() -> None:
 
     try:
         await runner.initialize(args.connection, args.server_url)
+        if config.sandbox.use_sandbox:
+            await SANDBOX_CLIENT.warm()
 
         if args.prompt:
             await runner.run_single_prompt(args.prompt)
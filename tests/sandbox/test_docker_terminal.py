@@ -81,6 +81,31 @@ class TestAsyncDockerizedTerminal:
         assert "First" in cmd1
         assert "Second" in cmd2
 
+    @pytest.mark.asyncio
+    async def test_exec_command_result(self, terminal):
+        """Test exit codes and separated stdout/stderr."""
+        result = await terminal.exec_command("echo out; echo err >&2; false")
+        assert result.exit_code == 1
+        assert result.stdout == "out\n"
+        assert result.stderr == "err\n"
+
+        result = await terminal.exec_command("test -d /workspace")
+        assert result.exit_code == 0
+        assert result.stdout == ""
+
+    @pytest.mark.asyncio
+    async def test_session_usable_after_timeout(self, docker_container):
+        """Test that output of a timed out command does not leak into the next one."""
+        terminal = AsyncDockerizedTerminal(docker_container, default_timeout=1)
+        await terminal.init()
+        try:
+            with pytest.raises(TimeoutError):
+                await terminal.run_command("sleep 5; echo stale")
+            result = await terminal.exec_command("echo fresh")
+            assert result.stdout == "fresh\n"
+        finally:
+            await terminal.close()
+
     @pytest.mark.asyncio
     async def test_session_cleanup(self, docker_container):
         """Test proper cleanup of resources."""
@@ -0,0 +1,103 @@
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+
+from app.config import SandboxSettings
+from app.sandbox.client import create_sandbox_client
+from app.sandbox.core.manager import SandboxManager
+from app.sandbox.core.pool import SandboxPool
+
+
+@pytest.fixture
+def config() -> SandboxSettings:
+    """Creates a sandbox configuration for pooled sandboxes."""
+    return SandboxSettings(image="python:3.12-slim", work_dir="/workspace")
+
+
+@pytest_asyncio.fixture(scope="function")
+async def pool(config) -> AsyncGenerator[SandboxPool, None]:
+    """Creates a warmed sandbox pool."""
+    pool = SandboxPool(min_size=1, max_size=2)
+    await pool.warm(config)
+    try:
+        yield pool
+    finally:
+        await pool.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_pool_hit_and_recycle(pool, config):
+    """Tests that warm sandboxes are reused and their work_dir is wiped."""
+    sandbox = await pool.acquire(config)
+    assert pool.get_stats()["pool_hits"] == 1
+
+    await sandbox.write_file("/workspace/leftover.txt", "data")
+    await sandbox.write_file("/tmp/leftover.txt", "data")
+    await sandbox.run_command("export LEFTOVER=1 && mkdir -p /srv/x && cd /srv/x")
+    await pool.release(sandbox)
+
+    reused = await pool.acquire(config)
+    listing = await reused.run_command("ls -A /workspace /tmp")
+    assert "leftover.txt" not in listing
+    assert (await reused.run_command("pwd")).strip() == "/workspace"
+    assert (await reused.run_command("echo ${LEFTOVER:-unset}")).strip() == "unset"
+    await pool.release(reused)
+
+    stats = pool.get_stats()
+    assert stats["pool_misses"] == 0
+    assert stats["pool_hit_rate"] == 1.0
+    assert stats["pool_recycled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_profiles_are_separate(pool, config):
+    """Tests that sandboxes are only reused for identical settings."""
+    other = config.model_copy(update={"memory_limit": "256m"})
+    sandbox = await pool.acquire(other)
+    try:
+        assert pool.get_stats()["pool_misses"] == 1
+    finally:
+        await pool.release(sandbox)
+
+
+@pytest.mark.asyncio
+async def test_manager_reports_pool_stats(config):
+    """Tests manager integration with the pool."""
+    pool = SandboxPool(min_size=1, max_size=1)
+    async with SandboxManager(max_sandboxes=2, pool=pool) as manager:
+        sandbox_id = await manager.create_sandbox(config)
+        await manager.delete_sandbox(sandbox_id)
+
+        stats = manager.get_stats()
+        assert stats["pool_misses"] == 1
+        assert stats["pool_recycled"] + stats["pool_discarded"] == 1
+        assert stats["pool_idle"] <= pool.max_size
+
+
+@pytest.mark.asyncio
+async def test_client_warm_makes_first_create_a_hit():
+    """Tests that warming the client pre-starts the default profile."""
+    pool = SandboxPool(min_size=1, max_size=1)
+    client = create_sandbox_client(pool)
+    try:
+        await client.warm()
+        assert pool.get_stats()["pool_idle"] == 1
+
+        await client.create(SandboxSettings())
+        assert pool.get_stats()["pool_hits"] == 1
+    finally:
+        await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_client_shutdown_drains_pool(config):
+    """Tests that shutting down the client destroys pooled sandboxes."""
+    pool = SandboxPool(min_size=1, max_size=1)
+    client = create_sandbox_client(pool)
+    await client.create(config)
+    await client.cleanup()
+    assert pool.get_stats()["pool_idle"] >= 1
+
+    await client.shutdown()
+    assert pool.get_stats()["pool_idle"] == 0
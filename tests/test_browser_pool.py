@@ -0,0 +1,189 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import BrowserSettings
+from app.tool import browser_pool
+from app.tool.browser_pool import BrowserContextPool, apply_network_profile
+
+
+class FakePlaywrightContext:
+    def __init__(self):
+        self.handlers = {}
+        self.router = None
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def route(self, pattern, handler):
+        self.router = handler
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.session = SimpleNamespace(context=FakePlaywrightContext())
+
+    async def get_session(self):
+        return self.session
+
+    async def get_current_page(self):
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    instances = 0
+
+    def __init__(self):
+        FakeBrowser.instances += 1
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self, config):
+        await asyncio.sleep(0)
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_browser(monkeypatch):
+    FakeBrowser.instances = 0
+    monkeypatch.setattr(browser_pool, "create_browser", FakeBrowser)
+
+
+@pytest.mark.asyncio
+async def test_contexts_share_one_browser_and_are_not_reused():
+    """Tests leasing isolated contexts from one pre-warmed browser."""
+    pool = BrowserContextPool(max_contexts=2, min_idle=1)
+    first = await pool.acquire()
+    await asyncio.sleep(0.01)  # let the pool pre-warm a context
+    second = await pool.acquire()
+
+    assert first is not second
+    assert FakeBrowser.instances == 1
+    assert pool.get_stats()["hits"] == 1
+
+    # A third lease waits until a context is released
+    third = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+    assert not third.done()
+
+    await pool.release(first)
+    assert first.closed
+    assert await third is not first
+
+    await pool.cleanup()
+    assert second.closed
+
+
+@pytest.mark.asyncio
+async def test_idle_contexts_and_browser_are_reaped():
+    """Tests closing idle contexts and the browser after the timeout."""
+    pool = BrowserContextPool(max_contexts=2, min_idle=1, idle_timeout=0.05)
+    context = await pool.acquire()
+    browser = pool._browser
+    await pool.release(context)
+
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if browser.closed:
+            break
+
+    assert browser.closed
+    assert pool.get_stats()["idle"] == 0
+    assert pool.get_stats()["reaped"] == 1
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+@pytest.mark.asyncio
+async def test_network_profile_blocks_and_counts(monkeypatch):
+    """Tests blocking by resource type and domain, and byte accounting."""
+    settings = BrowserSettings(
+        load_profile="text_first",
+        blocked_resource_types=["stylesheet"],
+        blocked_domains=["tracker.test"],
+    )
+    monkeypatch.setattr(
+        browser_pool, "config", SimpleNamespace(browser_config=settings)
+    )
+    context = FakeContext()
+    stats = await apply_network_profile(context)
+    assert await apply_network_profile(context) is stats
+    assert browser_pool.page_load_state() == "domcontentloaded"
+
+    playwright_context = context.session.context
+    outcomes = {}
+    for url, resource_type in [
+        ("https://a.test/", "document"),
+        ("https://a.test/logo.png", "image"),
+        ("https://a.test/style.css", "stylesheet"),
+        ("https://cdn.tracker.test/t.js", "script"),
+        ("https://nottracker.test/app.js", "script"),
+    ]:
+        route = FakeRoute(url, resource_type)
+        await playwright_context.router(route)
+        outcomes[url] = route.outcome
+
+    assert [outcome == "aborted" for outcome in outcomes.values()] == [
+        False,
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert stats.blocked == 3
+
+    async def sizes():
+        return {"responseBodySize": 1000, "responseHeadersSize": 24}
+
+    await playwright_context.handlers["requestfinished"](SimpleNamespace(sizes=sizes))
+    assert (stats.requests, stats.bytes_received) == (1, 1024)
+
+
+@pytest.mark.asyncio
+async def test_reaper_waits_for_contexts_being_created():
+    """Tests that a lease after a long idle period keeps the browser open."""
+    pool = BrowserContextPool(max_contexts=2, min_idle=0, idle_timeout=0.05)
+    await pool.release(await pool.acquire())
+    await asyncio.sleep(0.04)
+
+    creating = asyncio.Event()
+    new_context = FakeBrowser.new_context
+
+    async def slow_new_context(self, config):
+        creating.set()
+        await asyncio.sleep(0.2)
+        return await new_context(self, config)
+
+    FakeBrowser.new_context = slow_new_context
+    try:
+        lease = asyncio.create_task(pool.acquire())
+        await creating.wait()
+        browser = pool._browser
+        context = await lease
+    finally:
+        FakeBrowser.new_context = new_context
+    assert not browser.closed
+
+    await pool.release(context)
+    await asyncio.sleep(0.2)
+    assert browser.closed
@@ -0,0 +1,101 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.config import BrowserSettings
+from app.tool.browser_use_tool import BrowserUseTool, limit_screenshot_size
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class FakePage:
+    def __init__(self, width: int = 3000, height: int = 1000):
+        self.size = (width, height)
+        self.calls = []
+
+    async def screenshot(self, **kwargs):
+        self.calls.append(kwargs)
+        return make_jpeg(*self.size)
+
+
+def test_limit_screenshot_size():
+    """Tests downscaling to the longest-side limit."""
+    data, size = limit_screenshot_size(make_jpeg(3000, 1000), 1500, 75)
+    assert size == (1500, 500)
+    assert Image.open(io.BytesIO(data)).size == (1500, 500)
+
+    small = make_jpeg(800, 600)
+    assert limit_screenshot_size(small, 1500, 75) == (small, (800, 600))
+
+
+@pytest.mark.asyncio
+async def test_screenshot_skipped_when_page_unchanged():
+    """Tests viewport capture and skipping repeated screenshots."""
+    tool = BrowserUseTool(llm=None)
+    page = FakePage()
+
+    assert await tool._take_screenshot(page, "https://a.test", 0, "[0]<a>")
+    assert page.calls[0]["full_page"] is False
+    assert await tool._take_screenshot(page, "https://a.test", 0, "[0]<a>") is None
+    assert await tool._take_screenshot(page, "https://a.test", 500, "[0]<a>")
+    assert len(page.calls) == 2
+
+
+class WordTokenizer:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class FakeExtractionLLM:
+    tokenizer = WordTokenizer()
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ask_tool(self, messages, tools=None, tool_choice=None):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        text = "merged" if "partial extractions" in prompt else prompt.split()[-1]
+        arguments = json.dumps({"extracted_content": {"text": text}})
+        return SimpleNamespace(
+            tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments=arguments))]
+        )
+
+
+class FakeContentPage:
+    url = "https://a.test"
+    content_calls = 0
+
+    async def content(self):
+        self.content_calls += 1
+        return "<p>" + " ".join(f"w{i}" for i in range(25)) + "</p>"
+
+
+@pytest.mark.asyncio
+async def test_chunked_extraction_maps_and_reduces():
+    """Tests per-chunk extraction, the merge call and the markdown cache."""
+    llm = FakeExtractionLLM()
+    tool = BrowserUseTool.model_construct(llm=llm)
+    page = FakeContentPage()
+    settings = BrowserSettings(
+        chunked_extraction=True, extraction_chunk_tokens=10, extraction_max_chunks=2
+    )
+
+    content = await tool._page_markdown(page)
+    assert await tool._page_markdown(page) == content
+
+    result = await tool._extract_chunked("goal", content, settings)
+    assert result == {"text": "merged"}
+    # Two chunk calls, capped by extraction_max_chunks, then one merge call
+    assert len(llm.prompts) == 3
+    assert llm.prompts[0].rstrip().endswith("w9")
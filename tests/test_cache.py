@@ -0,0 +1,57 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.cache import LRUCache, SQLiteCache, TieredCache, make_cache_key
+
+
+def test_make_cache_key_is_canonical():
+    """Tests that key order in dicts does not change the cache key."""
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key("ask", [1]) != make_cache_key("ask_tool", [1])
+
+
+def test_lru_eviction_and_ttl():
+    """Tests LRU eviction order and TTL expiry."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    expiring = LRUCache(max_entries=2, ttl=0.01)
+    expiring.set("a", 1)
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_sqlite_size_eviction(tmp_path: Path):
+    """Tests that the disk tier stays under its byte budget."""
+    cache = SQLiteCache(tmp_path / "cache.sqlite", max_bytes=100)
+    for i in range(10):
+        cache.set(str(i), "x" * 30)
+    assert len(cache) == 3
+    assert cache.get("9") == "x" * 30
+    assert cache.get("0") is None
+
+
+@pytest.mark.parametrize("with_disk", [False, True])
+def test_tiered_cache_stats(tmp_path: Path, with_disk: bool):
+    """Tests hit/miss counters and promotion from the disk tier."""
+    path = tmp_path / "cache.sqlite" if with_disk else None
+    cache = TieredCache.create(max_entries=4, path=path)
+    assert cache.get("k") is None
+    cache.set("k", {"content": "hi"})
+    assert cache.get("k") == {"content": "hi"}
+
+    if with_disk:
+        cache.memory.clear()
+        assert cache.get("k") == {"content": "hi"}
+        assert cache.disk_hits == 1
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == (2 if with_disk else 1)
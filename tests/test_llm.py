@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.exceptions import StreamedToolCallError
+from app.llm import LLM
+
+
+def chunk(content=None, tool_calls=None) -> SimpleNamespace:
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def call_delta(index, id=None, name=None, arguments=None) -> SimpleNamespace:
+    function = SimpleNamespace(name=name, arguments=arguments)
+    return SimpleNamespace(index=index, id=id, function=function)
+
+
+def fake_llm(chunks, yielded, error=None) -> SimpleNamespace:
+    """Stands in for LLM, serving `chunks` as the streamed response."""
+
+    async def stream():
+        for item in chunks:
+            yielded.append(item)
+            yield item
+        if error:
+            raise error
+
+    async def create_completion(input_tokens, **params):
+        return stream()
+
+    return SimpleNamespace(
+        _create_completion=create_completion,
+        _is_complete_arguments=LLM._is_complete_arguments,
+        update_token_count=lambda *args: None,
+        count_tokens=lambda text: len(text or ""),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_assembles_deltas_and_fires_each_completed_call():
+    """Tests delta assembly and that calls are handed off as they complete."""
+    chunks = [
+        chunk("Let me ", [call_delta(0, "a", "search", '{"q": ')]),
+        chunk("check", [call_delta(0, arguments='"x"}')]),
+        chunk(tool_calls=[call_delta(1, "b", "open", '{"url": "u"')]),
+        chunk(tool_calls=[call_delta(1, arguments=', "n": 1}')]),
+        chunk(),
+    ]
+    yielded, fired = [], []
+
+    message = await LLM._ask_tool_stream(
+        fake_llm(chunks, yielded),
+        {},
+        0,
+        lambda call: fired.append((call.id, len(yielded))),
+    )
+
+    assert message.content == "Let me check"
+    assert [
+        (c.id, c.function.name, c.function.arguments) for c in message.tool_calls
+    ] == [
+        ("a", "search", '{"q": "x"}'),
+        ("b", "open", '{"url": "u", "n": 1}'),
+    ]
+    # Each call fires on the chunk that completes its arguments
+    assert fired == [("a", 2), ("b", 4)]
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_handoff_is_not_retryable():
+    """Tests that a dropped stream after a started call raises StreamedToolCallError."""
+    chunks = [chunk(tool_calls=[call_delta(0, "a", "search", "{}")])]
+    fired = []
+
+    with pytest.raises(StreamedToolCallError):
+        await LLM._ask_tool_stream(
+            fake_llm(chunks, [], error=ConnectionError("reset")),
+            {},
+            0,
+            lambda call: fired.append(call.id),
+        )
+    assert fired == ["a"]
@@ -0,0 +1,245 @@
+import asyncio
+import sys
+import textwrap
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent import manus as manus_module
+from app.agent.manus import Manus
+from app.agent.mcp import MCPAgent
+from app.config import MCPServerConfig, MCPSettings
+from app.schema import Memory
+from app.tool import Terminate, ToolCollection
+from app.tool.mcp import MCPClients
+
+
+SERVER = textwrap.dedent(
+    """
+    import sys, time
+    from mcp.server.fastmcp import FastMCP
+
+    time.sleep(float(sys.argv[1]))
+    mcp = FastMCP("test")
+
+    @mcp.tool()
+    def echo(text: str) -> str:
+        \"\"\"Echo text.\"\"\"
+        return text
+
+    mcp.run()
+    """
+)
+
+
+DYNAMIC_SERVER = textwrap.dedent(
+    """
+    import sys
+    import anyio
+    from mcp.server.fastmcp import Context, FastMCP
+    from mcp.server.lowlevel import NotificationOptions
+    from mcp.server.stdio import stdio_server
+
+    notify = sys.argv[1] == "notify"
+    mcp = FastMCP("dynamic")
+
+    def extra(text: str) -> str:
+        \"\"\"Extra tool.\"\"\"
+        return text
+
+    @mcp.tool()
+    async def add_extra(ctx: Context) -> str:
+        \"\"\"Register the extra tool.\"\"\"
+        mcp.add_tool(extra)
+        if notify:
+            await ctx.session.send_tool_list_changed()
+        return "added"
+
+    async def main():
+        server = mcp._mcp_server
+        options = server.create_initialization_options(
+            NotificationOptions(tools_changed=notify)
+        )
+        async with stdio_server() as (read, write):
+            await server.run(read, write, options)
+
+    anyio.run(main)
+    """
+)
+
+
+@pytest.fixture
+def server_script(tmp_path):
+    path = tmp_path / "server.py"
+    path.write_text(SERVER)
+    return str(path)
+
+
+@pytest.fixture
+def dynamic_server_script(tmp_path):
+    path = tmp_path / "dynamic_server.py"
+    path.write_text(DYNAMIC_SERVER)
+    return str(path)
+
+
+async def wait_for_tool(clients: MCPClients, name: str, timeout: float = 10) -> None:
+    deadline = time.perf_counter() + timeout
+    while name not in clients.tool_map:
+        assert time.perf_counter() < deadline, f"{name} never appeared"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_isolate_failures(server_script):
+    """Tests concurrent stdio connects with a timeout and a broken server."""
+    clients = MCPClients()
+    results = await asyncio.gather(
+        clients.connect_stdio(sys.executable, [server_script, "0"], "a", timeout=20),
+        clients.connect_stdio(sys.executable, [server_script, "0"], "b", timeout=20),
+        clients.connect_stdio(sys.executable, [server_script, "30"], "slow", timeout=1),
+        clients.connect_stdio("/nonexistent/server", [], "broken", timeout=5),
+        return_exceptions=True,
+    )
+
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], asyncio.TimeoutError)
+    assert isinstance(results[3], Exception)
+    assert sorted(clients.sessions) == ["a", "b"]
+    assert sorted(clients.tool_map) == ["mcp_a_echo", "mcp_b_echo"]
+
+    result = await clients.tool_map["mcp_a_echo"].execute(text="hi")
+    assert result.output == "hi"
+
+    await clients.disconnect("a")
+    assert list(clients.tool_map) == ["mcp_b_echo"]
+    await clients.disconnect()
+    assert not clients.sessions and not clients.tools
+
+
+@pytest.mark.asyncio
+async def test_manus_waits_only_for_required_servers(monkeypatch):
+    """Tests that optional servers keep connecting in the background."""
+    settings = MCPSettings(
+        servers={
+            "fast": MCPServerConfig(type="sse", url="http://fast"),
+            "slow": MCPServerConfig(type="sse", url="http://slow"),
+        },
+        required_servers=["fast"],
+    )
+    monkeypatch.setattr(manus_module, "config", SimpleNamespace(mcp_config=settings))
+    connected = []
+
+    async def fake_connect(server_id, server_config, timeout):
+        await asyncio.sleep(0.5 if server_id == "slow" else 0)
+        connected.append(server_id)
+
+    agent = SimpleNamespace(
+        mcp_clients=MCPClients(),
+        _mcp_connect_tasks={},
+        _connect_configured_server=fake_connect,
+    )
+
+    start = time.perf_counter()
+    await Manus.initialize_mcp_servers(agent)
+    assert connected == ["fast"]
+    assert time.perf_counter() - start < 0.4
+
+    await agent._mcp_connect_tasks["slow"]
+    assert connected == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_borrowed_mcp_clients_stay_connected():
+    """Tests that an agent sharing another's MCPClients leaves it connected."""
+    disconnected = []
+
+    async def fake_disconnect(server_id=""):
+        disconnected.append(server_id)
+
+    pending = asyncio.create_task(asyncio.sleep(10))
+    agent = SimpleNamespace(
+        browser_context_helper=None,
+        _mcp_connect_tasks={"slow": pending},
+        _initialized=True,
+        _owns_mcp_clients=False,
+        disconnect_mcp_server=fake_disconnect,
+    )
+
+    await Manus.cleanup(agent)
+    assert pending.cancelled() and not agent._mcp_connect_tasks
+    assert disconnected == [] and not agent._initialized
+
+    agent._initialized, agent._owns_mcp_clients = True, True
+    await Manus.cleanup(agent)
+    assert disconnected == [""]
+
+
+@pytest.mark.asyncio
+async def test_tool_list_changed_notification(dynamic_server_script):
+    """Tests that notifying servers update tools without polling."""
+    clients = MCPClients()
+    clients.poll_interval = 0
+    await clients.connect_stdio(
+        sys.executable, [dynamic_server_script, "notify"], "dyn", timeout=20
+    )
+    agent = SimpleNamespace(
+        mcp_clients=clients, tool_hashes={}, _tools_version=-1, memory=Memory()
+    )
+    assert await MCPAgent._refresh_tools(agent) == (["mcp_dyn_add_extra"], [])
+    assert await MCPAgent._refresh_tools(agent) == ([], [])
+
+    manus = SimpleNamespace(
+        mcp_clients=clients,
+        available_tools=ToolCollection(Terminate()),
+        _mcp_tools_version=-1,
+    )
+    Manus._sync_mcp_tools(manus)
+    assert list(manus.available_tools.tool_map) == ["terminate", "mcp_dyn_add_extra"]
+
+    await clients.tool_map["mcp_dyn_add_extra"].execute()
+    await wait_for_tool(clients, "mcp_dyn_extra")
+    assert await MCPAgent._refresh_tools(agent) == (["mcp_dyn_extra"], [])
+    assert agent.memory.messages[-1].content.endswith("mcp_dyn_extra")
+
+    Manus._sync_mcp_tools(manus)
+    assert "mcp_dyn_extra" in manus.available_tools.tool_map
+    assert (
+        manus.available_tools.get_tool("mcp_dyn_extra")
+        is clients.tool_map["mcp_dyn_extra"]
+    )
+
+    await clients.disconnect()
+    Manus._sync_mcp_tools(manus)
+    assert list(manus.available_tools.tool_map) == ["terminate"]
+
+
+@pytest.mark.asyncio
+async def test_polling_backs_off_for_servers_without_notifications(
+    dynamic_server_script,
+):
+    """Tests polling and that unchanged listings keep the tools version."""
+    clients = MCPClients()
+    clients.poll_interval, clients.max_poll_interval = 0.05, 0.2
+    await clients.connect_stdio(
+        sys.executable, [dynamic_server_script, "poll"], "dyn", timeout=20
+    )
+    session = clients.sessions["dyn"]
+    list_tools, calls = session.list_tools, []
+
+    async def counting_list_tools():
+        calls.append(time.perf_counter())
+        return await list_tools()
+
+    session.list_tools = counting_list_tools
+    version = clients.tools_version
+    await asyncio.sleep(0.8)
+    assert clients.tools_version == version
+    # Intervals double up to the cap: 0.05, 0.1, 0.2, 0.2, ...
+    assert 3 <= len(calls) <= 6
+
+    await clients.tool_map["mcp_dyn_add_extra"].execute()
+    await wait_for_tool(clients, "mcp_dyn_extra")
+    assert clients.tools_version == version + 1
+    await clients.disconnect()
+    assert clients.tools_version == version + 2
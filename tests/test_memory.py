@@ -0,0 +1,177 @@
+import pytest
+
+from app.llm import TokenCounter
+from app.schema import Function, Memory, Message, Role, ToolCall
+
+
+class FakeLLM:
+    """Stands in for LLM.ask when summarizing memory."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ask(self, messages, system_msgs=None, stream=True):
+        self.prompts.append(messages[0].content)
+        return "summary"
+
+
+def count_words(message: dict) -> int:
+    return len((message.get("content") or "").split()) + 1
+
+
+def build_memory(**kwargs) -> Memory:
+    memory = Memory(token_counter=count_words, **kwargs)
+    memory.add_message(Message.system_message("system prompt"))
+    for i in range(5):
+        memory.add_message(Message.user_message("word " * 20))
+        memory.add_message(
+            Message.from_tool_calls(
+                [ToolCall(id=f"call_{i}", function=Function(name="t", arguments="{}"))]
+            )
+        )
+        memory.add_message(
+            Message.tool_message("result " * 10, name="t", tool_call_id=f"call_{i}")
+        )
+    return memory
+
+
+def test_token_count_tracks_changes():
+    """Tests the running token total across appends and replacement."""
+    memory = build_memory()
+    total = memory.token_count
+    memory.messages += [Message.user_message("one two")]
+    assert memory.token_count == total + 3
+
+    memory.messages = memory.messages[:1]
+    assert memory.token_count == 3
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_system_and_tool_pairs():
+    """Tests that compaction summarizes older spans only."""
+    memory = build_memory(token_budget=50, keep_recent=1)
+    llm = FakeLLM()
+
+    assert await memory.compact(llm)
+    assert llm.prompts
+
+    roles = [message.role for message in memory.messages]
+    assert roles == [Role.SYSTEM, Role.USER, Role.ASSISTANT, Role.TOOL]
+    assert memory.messages[1].content.endswith("summary")
+    assert memory.messages[3].tool_call_id == "call_4"
+
+
+@pytest.mark.asyncio
+async def test_compact_skips_when_recent_messages_exceed_budget():
+    """Tests that compaction is not retried when it can't get under budget."""
+    memory = build_memory(token_budget=50, keep_recent=1)
+    llm = FakeLLM()
+    assert await memory.compact(llm)
+    calls = len(llm.prompts)
+
+    # The latest message alone is over budget: re-summarizing the previous
+    # summary and the messages that aged out can't help
+    memory.add_message(Message.user_message("word " * 60))
+    assert not await memory.compact(llm)
+    assert len(llm.prompts) == calls
+
+
+@pytest.mark.asyncio
+async def test_compact_within_budget_is_noop():
+    """Tests that memory under budget is left untouched."""
+    memory = build_memory(token_budget=10_000)
+    assert not await memory.compact(FakeLLM())
+    assert len(memory.messages) == 16
+
+
+def test_message_buffer_evicts_oldest():
+    """Tests bounded append and the list operations used on memory."""
+    memory = Memory(max_messages=3)
+    for i in range(5):
+        memory.add_message(Message.user_message(str(i)))
+
+    assert [message.content for message in memory.messages] == ["2", "3", "4"]
+    assert memory.messages[-1].content == "4"
+    assert [message.content for message in memory.messages[-2:]] == ["3", "4"]
+
+    memory.messages += [Message.user_message("5")]
+    assert [message.content for message in memory.messages] == ["3", "4", "5"]
+
+    combined = [Message.system_message("s")] + memory.messages
+    assert isinstance(combined, list) and len(combined) == 4
+
+    memory.messages = [Message.user_message(str(i)) for i in range(10)]
+    assert len(memory.messages) == 3
+
+
+def test_token_count_follows_eviction():
+    """Tests that evicted messages leave the running token total."""
+    memory = Memory(max_messages=2, token_counter=count_words)
+    memory.add_message(Message.user_message("a b c"))
+    memory.add_message(Message.user_message("a"))
+    assert memory.token_count == 6
+    memory.add_message(Message.user_message("a b"))
+    assert memory.token_count == 5
+
+
+def test_repeated_tool_calls_are_indexed():
+    """Tests detection of identical tool calls with reformatted arguments."""
+    memory = Memory(max_messages=6)
+    for arguments in ['{"a": 1, "b": 2}', '{"b":2,"a":1}', '{ "a": 1, "b": 2 }']:
+        memory.add_message(
+            Message.from_tool_calls(
+                [ToolCall(id="c", function=Function(name="t", arguments=arguments))]
+            )
+        )
+        memory.add_message(Message.tool_message("ok", name="t", tool_call_id="c"))
+    assert memory.count_repeated_tool_calls() == 2
+
+    # Evicting the oldest call lowers the count
+    memory.add_message(Message.user_message("next"))
+    assert memory.count_repeated_tool_calls() == 1
+
+    memory.add_message(Message.assistant_message("same"))
+    memory.add_message(Message.assistant_message("same"))
+    assert memory.count_duplicates(memory.messages[-1]) == 1
+    assert memory.count_repeated_tool_calls() == 0
+
+
+def test_only_consecutive_tool_calls_count_as_repeated():
+    """Tests that identical calls spread across a session are not a loop."""
+
+    def call(name: str) -> Message:
+        return Message.from_tool_calls(
+            [ToolCall(id="c", function=Function(name=name, arguments="{}"))]
+        )
+
+    memory = Memory()
+    for name in ["scroll_down", "click", "scroll_down", "click", "scroll_down"]:
+        memory.add_message(call(name))
+        memory.add_message(Message.tool_message("ok", name=name, tool_call_id="c"))
+    assert memory.count_repeated_tool_calls() == 0
+
+    memory.add_message(call("scroll_down"))
+    memory.add_message(call("scroll_down"))
+    assert memory.count_repeated_tool_calls() == 2
+
+    # Rebuilding the index after replacement keeps the trailing run
+    memory.messages = list(memory.messages)
+    assert memory.count_repeated_tool_calls() == 2
+
+
+def test_memory_weighing_shares_the_token_cache():
+    """Tests that messages weighed by Memory are not tokenized again."""
+
+    class WordTokenizer:
+        def encode(self, text):
+            return text.split()
+
+    counter = TokenCounter(WordTokenizer())
+    memory = Memory(token_counter=counter.count_cached_message)
+    memory.add_message(Message.user_message("hello there"))
+    memory.add_message(Message.assistant_message("hi"))
+    assert memory.token_count > 0
+    assert counter.cache_misses == 2
+
+    counter.count_message_tokens(memory.to_dict_list())
+    assert (counter.cache_hits, counter.cache_misses) == (2, 2)
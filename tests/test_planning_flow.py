@@ -0,0 +1,182 @@
+import asyncio
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pydantic import model_validator
+
+from app.agent.base import BaseAgent
+from app.flow.planning import PlanningFlow, PlanStepStatus
+from app.schema import AgentState
+from app.tool import PlanningTool
+
+
+class FakeExecutor(BaseAgent):
+    """Runs plan steps from a script instead of an LLM.
+
+    `script` maps a step index to its duration in seconds, "fail" to raise,
+    or "finish" to end the flow.
+    """
+
+    name: str = "fake"
+    llm: Any = None
+    script: Any  # Shared with the test
+    log: Any
+
+    @model_validator(mode="after")
+    def initialize_agent(self) -> "FakeExecutor":
+        return self
+
+    async def step(self) -> str:
+        return ""
+
+    async def run(self, request: Optional[str] = None) -> str:
+        index = int(re.search(r"working on step (\d+)", request).group(1))
+        action = self.script.get(index, 0.01)
+        self.log.append(("start", index, self))
+        try:
+            if action == "fail":
+                raise RuntimeError("step failed")
+            if action == "finish":
+                self.state = AgentState.FINISHED
+            else:
+                await asyncio.sleep(action)
+        finally:
+            self.log.append(("end", index, self))
+        return f"step {index} done"
+
+
+async def build_flow(
+    steps: int,
+    dependencies: Optional[List[List[int]]],
+    script: Optional[Dict[int, Any]] = None,
+    max_parallel_steps: int = 3,
+) -> SimpleNamespace:
+    log = []
+    executor = FakeExecutor(script=script or {}, log=log)
+    planning_tool = PlanningTool()
+    await planning_tool.execute(
+        command="create",
+        plan_id="plan",
+        title="Test plan",
+        steps=[f"Step {i}" for i in range(steps)],
+        step_dependencies=dependencies,
+    )
+
+    async def ask(**kwargs) -> str:
+        return "summary"
+
+    flow = PlanningFlow.model_construct(
+        agents={"fake": executor},
+        primary_agent_key="fake",
+        executor_keys=["fake"],
+        planning_tool=planning_tool,
+        active_plan_id="plan",
+        current_step_index=None,
+        max_parallel_steps=max_parallel_steps,
+        llm=SimpleNamespace(ask=ask),
+    )
+    return SimpleNamespace(flow=flow, executor=executor, log=log)
+
+
+def events(log) -> List[tuple]:
+    return [(event, index) for event, index, _ in log]
+
+
+def peak_running(log) -> int:
+    running = peak = 0
+    for event, _, _ in log:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    return peak
+
+
+def statuses(flow: PlanningFlow) -> List[str]:
+    return flow.planning_tool.plans["plan"]["step_statuses"]
+
+
+@pytest.mark.asyncio
+async def test_plan_without_dependencies_runs_in_order():
+    """Tests that plans without step_dependencies stay sequential."""
+    setup = await build_flow(3, None)
+
+    await setup.flow._execute_ready_steps()
+
+    assert events(setup.log) == [
+        ("start", 0),
+        ("end", 0),
+        ("start", 1),
+        ("end", 1),
+        ("start", 2),
+        ("end", 2),
+    ]
+    assert statuses(setup.flow) == [PlanStepStatus.COMPLETED.value] * 3
+
+
+@pytest.mark.asyncio
+async def test_dependents_start_after_their_dependencies():
+    """Tests that independent steps overlap and dependents wait for them."""
+    setup = await build_flow(3, [[], [], [0, 1]], script={0: 0.05, 1: 0.01})
+
+    await setup.flow._execute_ready_steps()
+
+    assert events(setup.log) == [
+        ("start", 0),
+        ("start", 1),
+        ("end", 1),
+        ("end", 0),
+        ("start", 2),
+        ("end", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_max_parallel_steps_caps_running_steps():
+    """Tests that no more than max_parallel_steps steps run at once."""
+    setup = await build_flow(5, [[]] * 5, max_parallel_steps=2)
+
+    await setup.flow._execute_ready_steps()
+
+    assert peak_running(setup.log) == 2
+    assert statuses(setup.flow) == [PlanStepStatus.COMPLETED.value] * 5
+
+
+@pytest.mark.asyncio
+async def test_blocked_step_holds_back_dependents_only():
+    """Tests that a failed step blocks its dependents without hanging the loop."""
+    setup = await build_flow(3, [[], [0], []], script={0: "fail"})
+
+    await asyncio.wait_for(setup.flow._execute_ready_steps(), timeout=5)
+
+    assert statuses(setup.flow) == [
+        PlanStepStatus.BLOCKED.value,
+        PlanStepStatus.NOT_STARTED.value,
+        PlanStepStatus.COMPLETED.value,
+    ]
+    assert ("start", 1) not in events(setup.log)
+
+
+@pytest.mark.asyncio
+async def test_busy_executor_is_cloned():
+    """Tests that concurrent steps get their own executor."""
+    setup = await build_flow(2, [[], []], script={0: 0.02, 1: 0.02})
+
+    await setup.flow._execute_ready_steps()
+
+    agents = [agent for event, _, agent in setup.log if event == "start"]
+    assert agents[0] is setup.executor
+    assert agents[1] is not setup.executor
+    assert isinstance(agents[1], FakeExecutor)
+    assert agents[1].script is setup.executor.script
+
+
+@pytest.mark.asyncio
+async def test_finished_step_awaits_cancelled_steps():
+    """Tests that steps cancelled by a finishing step clean up before returning."""
+    setup = await build_flow(2, [[], []], script={0: "finish", 1: 10})
+
+    result = await setup.flow._execute_ready_steps()
+
+    assert "step 0 done" in result
+    assert ("end", 1) in events(setup.log)
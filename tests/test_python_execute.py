@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.tool.python_execute import PythonWorkerPool
+
+
+@pytest.fixture
+def slow_import(tmp_path, monkeypatch):
+    (tmp_path / "slow_module.py").write_text("import time\ntime.sleep(1.5)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return "slow_module"
+
+
+@pytest.mark.asyncio
+async def test_timeout_starts_after_worker_is_ready(slow_import):
+    """Tests that a cold start is not charged to the first call's timeout."""
+    pool = PythonWorkerPool(size=1, preload=(slow_import,))
+    try:
+        result = await pool.run("print('hi')", timeout=1)
+        assert result == {"observation": "hi\n", "success": True}
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stateless_calls_restore_process_state(tmp_path):
+    """Tests that cwd, sys.path and environment don't leak between calls."""
+    pool = PythonWorkerPool(size=1, preload=())
+    try:
+        code = (
+            "import os, sys\n"
+            "print(os.getcwd(), len(sys.path), os.environ.get('LEAK'))\n"
+            f"os.chdir({str(tmp_path)!r}); sys.path.append('x'); os.environ['LEAK'] = '1'"
+        )
+        first = await pool.run(code, timeout=5)
+        second = await pool.run(code, timeout=5)
+        assert first["success"] and first["observation"] == second["observation"]
+        assert first["observation"].endswith("None\n")
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_empty_pool_spawns_one_worker_per_call(monkeypatch):
+    """Tests that calls only wait for their own worker and the pool refills later."""
+    pool = PythonWorkerPool(size=2, preload=())
+    spawned = []
+    spawn = pool._spawn
+
+    def counting_spawn():
+        spawned.append(spawn())
+        return spawned[-1]
+
+    monkeypatch.setattr(pool, "_spawn", counting_spawn)
+    try:
+        results = await asyncio.gather(
+            *(pool.run("print('hi')", timeout=5) for _ in range(3))
+        )
+        assert all(result["success"] for result in results)
+        # One worker per concurrent call, not a full pool for each of them
+        assert len(spawned) == 3
+        # The extra worker is killed on release
+        assert len(pool._idle) == 2
+
+        # A crashed worker is replaced in the background
+        result = await pool.run("import os; os._exit(1)", timeout=5)
+        assert not result["success"]
+        assert len(spawned) == 3 and len(pool._idle) == 1
+        await asyncio.sleep(0)
+        assert len(spawned) == 4 and len(pool._idle) == 2
+    finally:
+        pool.shutdown()
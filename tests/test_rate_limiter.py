@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.rate_limiter import RateLimiter, TokenBucket, parse_reset_duration
+
+
+def test_parse_reset_duration():
+    """Tests provider reset formats, in seconds."""
+    assert parse_reset_duration("6m0s") == 360.0
+    assert parse_reset_duration("20ms") == pytest.approx(0.02)
+    assert parse_reset_duration("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset_duration("0.5") == 0.5
+    assert parse_reset_duration("soon") is None
+    assert parse_reset_duration(None) is None
+
+
+def test_token_bucket_wait_time_and_overrun():
+    """Tests refill waits, capped requests and negative balances."""
+    bucket = TokenBucket(60)  # One token per second
+    assert bucket.wait_time(60) == 0.0
+
+    bucket.consume(60)
+    assert bucket.wait_time(30) == pytest.approx(30.0, abs=0.1)
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.wait_time(600) == pytest.approx(60.0, abs=0.1)
+
+    # Overruns go negative and must be paid back before the next request
+    bucket.consume(30)
+    assert bucket.tokens == pytest.approx(-30.0, abs=0.1)
+    assert bucket.wait_time(1) == pytest.approx(31.0, abs=0.1)
+
+
+def test_update_from_headers_tightens_and_pauses():
+    """Tests that provider headers shrink buckets and pause on exhaustion."""
+    limiter = RateLimiter(requests_per_minute=100)
+    limiter.update_from_headers(
+        {
+            "x-ratelimit-limit-requests": "50",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-limit-tokens": "1000",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "6m0s",
+        }
+    )
+
+    assert limiter.request_bucket.capacity == 50
+    assert limiter.request_bucket.tokens == pytest.approx(10.0, abs=0.1)
+    # A token limit reported by the provider creates the missing bucket
+    assert limiter.token_bucket.capacity == 1000
+    assert limiter.token_bucket.tokens == pytest.approx(0.0, abs=0.1)
+    assert limiter.stats()["paused_for"] == pytest.approx(360.0, abs=1.0)
+
+    # A looser limit never raises the configured capacity
+    limiter.update_from_headers({"x-ratelimit-limit-requests": "500"})
+    assert limiter.request_bucket.capacity == 50
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_is_honoured():
+    """Tests that no more than max_concurrency requests are in flight."""
+    limiter = RateLimiter(max_concurrency=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        await limiter.acquire()
+        try:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+        finally:
+            limiter.release()
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_released_when_waiter_is_cancelled():
+    """Tests that a request cancelled while waiting gives its slot back."""
+    limiter = RateLimiter(requests_per_minute=1, max_concurrency=1)
+    await limiter.acquire()
+    limiter.release()
+
+    # The request bucket is empty, so this waiter holds the slot while sleeping
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.in_flight == 0
+    assert not limiter._slots.locked()
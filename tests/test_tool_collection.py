@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+from app.tool.base import BaseTool, ToolResult
+from app.tool.tool_collection import ToolCollection
+
+
+class EchoTool(BaseTool):
+    description: str = "Echo the input."
+    parameters: dict = {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs) -> ToolResult:
+        return ToolResult(output="ok")
+
+
+def test_to_params_is_cached_until_tools_change():
+    """Tests that tool schemas are serialized once per tool set."""
+    tools = ToolCollection(EchoTool(name="a"))
+    params = tools.to_params()
+    assert tools.to_params() is params
+
+    params.token_counts["cl100k_base"] = 7
+    tools.add_tool(EchoTool(name="a"))
+    assert tools.to_params() is params
+
+    tools.add_tools(EchoTool(name="b"))
+    refreshed = tools.to_params()
+    assert refreshed is not params
+    assert refreshed.token_counts == {}
+    assert [p["function"]["name"] for p in refreshed] == ["a", "b"]
+
+    # Reassigning the tuple, as MCPClients does, also invalidates
+    tools.tools = tools.tools[:1]
+    assert len(tools.to_params()) == 1
+
+
+def test_tool_token_cost_is_cached_per_tokenizer():
+    """Tests that LLMs with different tokenizers don't share a cached cost."""
+    from app.llm import LLM
+
+    def fake_llm(name: str, per_tool: int) -> SimpleNamespace:
+        return SimpleNamespace(
+            tokenizer=SimpleNamespace(name=name),
+            model=name,
+            count_tokens=lambda text: per_tool,
+        )
+
+    params = ToolCollection(EchoTool(name="a"), EchoTool(name="b")).to_params()
+    assert LLM.count_tools_tokens(fake_llm("cl100k_base", 3), params) == 6
+    assert LLM.count_tools_tokens(fake_llm("o200k_base", 5), params) == 10
+    # Cached: a changed per-tool cost is not recomputed for a known tokenizer
+    assert LLM.count_tools_tokens(fake_llm("cl100k_base", 100), params) == 6
+    assert params.token_counts == {"cl100k_base": 6, "o200k_base": 10}
+
+
+def test_clone_keeps_configuration_and_drops_sessions():
+    """Tests copying tools for a concurrently running agent."""
+    from app.tool.bash import Bash
+    from app.tool.python_execute import PythonExecute
+
+    tool = EchoTool(name="configured", description="Custom.")
+    clone = tool.clone()
+    assert clone is not tool
+    assert (clone.name, clone.description) == ("configured", "Custom.")
+
+    bash = Bash()
+    bash._session = object()
+    assert bash.clone()._session is None
+
+    python = PythonExecute()
+    assert python.clone()._session_id != python._session_id
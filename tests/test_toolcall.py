@@ -0,0 +1,179 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Tuple
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.exceptions import StreamedToolCallError
+from app.schema import Function, Role, ToolCall
+from app.tool.base import BaseTool, ToolResult
+from app.tool.tool_collection import ToolCollection
+
+
+class WaitTool(BaseTool):
+    """Blocks until `release` is set, recording starts and cancellations."""
+
+    description: str = "Wait for the test."
+    parameters: dict = {"type": "object", "properties": {}}
+    log: Any  # Shared with the test; a list field would be copied
+    release: asyncio.Event
+
+    async def execute(self, **kwargs) -> ToolResult:
+        self.log.append(f"start {self.name}")
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.log.append(f"cancel {self.name}")
+            raise
+        self.log.append(f"end {self.name}")
+        return ToolResult(output=self.name)
+
+
+def call(id: str, name: str) -> ToolCall:
+    return ToolCall(id=id, function=Function(name=name, arguments="{}"))
+
+
+def build_agent(log, release, llm=None) -> ToolCallAgent:
+    tools = ToolCollection(
+        WaitTool(name="read", log=log, release=release),
+        WaitTool(name="write", log=log, release=release, parallel_safe=False),
+    )
+    return ToolCallAgent.model_construct(
+        available_tools=tools,
+        llm=llm or SimpleNamespace(stream_tool_calls=False),
+        next_step_prompt=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_streamed_calls_stop_at_the_first_unsafe_call():
+    """Tests that only the leading run of parallel-safe calls starts early."""
+    log, release = [], asyncio.Event()
+    agent = build_agent(log, release)
+
+    agent._start_tool_call(call("a", "read"))
+    agent._start_tool_call(call("b", "write"))
+    agent._start_tool_call(call("c", "read"))
+    assert list(agent._pending_tool_tasks) == ["a"]
+    await agent._await_cancelled_tool_tasks()
+
+    # An unsafe call with nothing running before it may start, but is a barrier
+    agent._start_tool_call(call("d", "write"))
+    agent._start_tool_call(call("e", "read"))
+    assert list(agent._pending_tool_tasks) == ["d"]
+    await agent._await_cancelled_tool_tasks()
+    assert not agent._pending_tool_tasks
+
+
+@pytest.mark.asyncio
+async def test_think_recovers_from_a_dropped_tool_call_stream():
+    """Tests that a failed stream cancels early tools without ending the run."""
+    log, release = [], asyncio.Event()
+
+    async def ask_tool(on_stream_start, on_tool_call, **kwargs):
+        on_stream_start()
+        on_tool_call(call("a", "read"))
+        while not log:
+            await asyncio.sleep(0)
+        raise StreamedToolCallError("connection reset")
+
+    llm = SimpleNamespace(stream_tool_calls=True, ask_tool=ask_tool)
+    agent = build_agent(log, release, llm)
+
+    assert await agent.think() is False
+    assert log == ["start read", "cancel read"]
+    assert not agent._pending_tool_tasks
+    assert agent.memory.messages[-1].role == Role.ASSISTANT
+    assert "connection reset" in agent.memory.messages[-1].content
+
+
+class SleepTool(BaseTool):
+    """Sleeps for `delay` seconds, tracking how many calls run at once."""
+
+    description: str = "Sleep for the test."
+    parameters: dict = {"type": "object", "properties": {}}
+    state: Any  # Shared with the test
+
+    async def execute(self, delay: float = 0.01, **kwargs) -> ToolResult:
+        self.state.log.append(f"start {self.name}")
+        self.state.active += 1
+        self.state.peak = max(self.state.peak, self.state.active)
+        await asyncio.sleep(delay)
+        self.state.active -= 1
+        self.state.log.append(f"end {self.name}")
+        return ToolResult(output=self.name, base64_image=f"image of {self.name}")
+
+
+def sleep_call(id: str, name: str, delay: float = 0.01) -> ToolCall:
+    return ToolCall(
+        id=id, function=Function(name=name, arguments=f'{{"delay": {delay}}}')
+    )
+
+
+def build_sleep_agent(**kwargs) -> Tuple[ToolCallAgent, SimpleNamespace]:
+    state = SimpleNamespace(log=[], active=0, peak=0)
+    tools = ToolCollection(
+        *(SleepTool(name=name, state=state) for name in ("a", "b", "c", "d", "e")),
+        SleepTool(name="unsafe", state=state, parallel_safe=False),
+    )
+    agent = ToolCallAgent.model_construct(
+        available_tools=tools, llm=SimpleNamespace(), **kwargs
+    )
+    return agent, state
+
+
+@pytest.mark.asyncio
+async def test_parallel_safe_calls_overlap_and_keep_call_order():
+    """Tests that results and images are recorded in tool_call order."""
+    agent, state = build_sleep_agent()
+    # The first call finishes last
+    agent.tool_calls = [
+        sleep_call("1", "a", delay=0.05),
+        sleep_call("2", "b"),
+        sleep_call("3", "c"),
+    ]
+
+    await agent.act()
+
+    assert state.peak == 3
+    assert state.log[:3] == ["start a", "start b", "start c"]
+    tool_messages = [m for m in agent.memory.messages if m.role == Role.TOOL]
+    assert [m.tool_call_id for m in tool_messages] == ["1", "2", "3"]
+    assert [m.base64_image for m in tool_messages] == [
+        "image of a",
+        "image of b",
+        "image of c",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unsafe_call_is_a_barrier():
+    """Tests that an unsafe call waits for earlier calls and blocks later ones."""
+    agent, state = build_sleep_agent()
+    agent.tool_calls = [
+        sleep_call("1", "a"),
+        sleep_call("2", "b"),
+        sleep_call("3", "unsafe"),
+        sleep_call("4", "c"),
+    ]
+
+    await agent.act()
+
+    unsafe = state.log.index("start unsafe")
+    assert set(state.log[:unsafe]) == {"start a", "start b", "end a", "end b"}
+    assert state.log[unsafe + 1 :] == ["end unsafe", "start c", "end c"]
+
+
+@pytest.mark.asyncio
+async def test_max_parallel_tools_caps_concurrency():
+    """Tests that no more than max_parallel_tools calls run at once."""
+    agent, state = build_sleep_agent(max_parallel_tools=2)
+    agent.tool_calls = [
+        sleep_call(str(i), name) for i, name in enumerate(["a", "b", "c", "d", "e"])
+    ]
+
+    await agent.act()
+
+    assert state.peak == 2
+    assert len(state.log) == 10
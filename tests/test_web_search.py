@@ -0,0 +1,201 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.cache import TieredCache
+from app.tool import web_search
+from app.tool.search import BingSearchEngine
+from app.tool.search.base import SearchItem
+from app.tool.web_search import (
+    SearchResult,
+    WebContentFetcher,
+    WebSearch,
+    engine_latency,
+    get_content_fetcher,
+)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    requested = []
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        if self.path == "/page":
+            body = b"<html><script>x()</script><p>Hello   world</p></html>"
+            content_type = "text/html; charset=utf-8"
+        elif self.path == "/big":
+            body = b"<p>" + b"a" * 100_000 + b"</p>"
+            content_type = "text/html"
+        elif self.path == "/file.pdf":
+            body = b"%PDF-1.4"
+            content_type = "application/pdf"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_content(server_url):
+    """Tests extraction, the byte cap and early abort on non-HTML content."""
+    fetcher = WebContentFetcher(max_bytes=1000)
+    try:
+        assert await fetcher.fetch_content(f"{server_url}/page") == "Hello world"
+        assert len(await fetcher.fetch_content(f"{server_url}/big")) < 1000
+        assert await fetcher.fetch_content(f"{server_url}/file.pdf") is None
+        assert await fetcher.fetch_content(f"{server_url}/missing") is None
+    finally:
+        await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_search_and_content_caches(monkeypatch):
+    """Tests that repeated queries and URLs are served from the caches."""
+    monkeypatch.setattr(
+        web_search,
+        "_SEARCH_CACHES",
+        (TieredCache.create(ttl=60), TieredCache.create(ttl=60)),
+    )
+    searches = []
+    fetches = []
+
+    async def fake_engines(self, query, num_results, search_params):
+        searches.append(query)
+        return [SearchResult(position=1, url="https://a.test", source="fake")]
+
+    async def fake_fetch(url, timeout=10):
+        fetches.append(url)
+        return "page text"
+
+    monkeypatch.setattr(WebSearch, "_try_all_engines", fake_engines)
+    tool = WebSearch()
+    monkeypatch.setattr(tool.content_fetcher, "fetch_content", fake_fetch)
+
+    first = await tool.execute("query", fetch_content=True, lang="en", country="us")
+    second = await tool.execute("query", fetch_content=True, lang="en", country="us")
+    other = await tool.execute("query", lang="fr", country="us")
+
+    assert searches == ["query", "query"]
+    assert fetches == ["https://a.test"]
+    assert not first.metadata.cached and second.metadata.cached
+    # Cache hits report the engine that answered, not the preferred one
+    assert second.metadata.engine == "fake"
+    assert "- Engine: fake" in second.output
+    assert second.results[0].raw_content == "page text"
+    assert (second.metadata.cache_hits, second.metadata.cache_misses) == (1, 1)
+    assert second.metadata.content_cache_hits == 1
+    assert not other.metadata.cached
+
+
+def test_search_tools_share_content_fetcher():
+    """Tests that every WebSearch, including the browser's, reuses one pool."""
+    from app.tool.browser_use_tool import BrowserUseTool
+
+    fetcher = get_content_fetcher()
+    browser_search = BrowserUseTool.model_fields["web_search_tool"].default_factory()
+    assert WebSearch().content_fetcher is fetcher
+    assert browser_search.content_fetcher is fetcher
+
+
+@pytest.mark.asyncio
+async def test_hedged_race_returns_first_result(monkeypatch):
+    """Tests that a slow primary engine is hedged and then cancelled."""
+    delays = {"google": 5.0, "duckduckgo": None, "baidu": 0.01, "bing": 0.01}
+    started = []
+    cancelled = []
+
+    async def fake_search(self, engine, query, num_results, search_params):
+        name = next(k for k, v in self._search_engine.items() if v is engine)
+        started.append(name)
+        if delays[name] is None:
+            raise RuntimeError("blocked")
+        try:
+            await asyncio.sleep(delays[name])
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return [SearchItem(title=name, url=f"https://{name}.test")]
+
+    monkeypatch.setattr(WebSearch, "_perform_search_with_engine", fake_search)
+    google_samples = len(engine_latency.latencies.get("google", ()))
+
+    results = await WebSearch()._race_engines(
+        ["google", "duckduckgo", "baidu", "bing"],
+        "query",
+        5,
+        {"lang": "en", "country": "us"},
+        hedge_delay=0.05,
+    )
+
+    assert results[0].source == "baidu"
+    # DuckDuckGo failing immediately starts Baidu without waiting for the delay
+    assert started == ["google", "duckduckgo", "baidu"]
+    assert cancelled == ["google"]
+    # The cancelled loser's cut-short run must not lower its latency estimate
+    assert len(engine_latency.latencies.get("google", ())) == google_samples
+    assert engine_latency.get_stats()["duckduckgo"]["failures"] >= 1
+
+
+def test_latency_stats_tune_hedge_delay_and_order():
+    """Tests that measured latencies shorten the hedge and reorder fallbacks."""
+    stats = web_search.EngineLatencyStats(min_samples=3)
+    for _ in range(3):
+        stats.record("google", 0.5, True)
+        stats.record("bing", 1.0, True)
+        stats.record("baidu", 0.1, False)
+
+    assert stats.hedge_delay("google", 2.0) == 0.5
+    assert stats.hedge_delay("google", 0.2) == 0.2
+    # Unmeasured engines wait the full configured delay
+    assert stats.hedge_delay("duckduckgo", 2.0) == 2.0
+    # The preferred engine stays first; failing fallbacks go last
+    assert stats.rank(["google", "baidu", "duckduckgo", "bing"], 2.0) == [
+        "google",
+        "bing",
+        "duckduckgo",
+        "baidu",
+    ]
+
+
+def test_bing_fetches_pages_concurrently(monkeypatch):
+    """Tests page offsets, rank-ordered merging and URL dedupe."""
+    requested = []
+
+    def fake_parse(self, url, rank_start=0):
+        requested.append(url)
+        # Each page repeats the last result of the previous page
+        items = [
+            SearchItem(title=str(i), url=f"https://r.test/{i}")
+            for i in range(max(rank_start - 1, 0), rank_start + 10)
+        ]
+        return items, "next"
+
+    monkeypatch.setattr(BingSearchEngine, "_parse_html", fake_parse)
+    items = BingSearchEngine().perform_search("a b", num_results=30)
+
+    assert [item.url for item in items] == [f"https://r.test/{i}" for i in range(30)]
+    assert sorted(url.rsplit("first=", 1)[1] for url in requested) == [
+        "1",
+        "11",
+        "21",
+    ]
+    assert requested[0].startswith("https://www.bing.com/search?q=a+b&")